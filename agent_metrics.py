@@ -0,0 +1,55 @@
+"""
+Agent Performance Metrics for Support Operations Reporting System
+STEP 4 of the pipeline: ticket counts per agent merged with effort data
+"""
+
+import pandas as pd
+
+AGENT_COUNT_KEYS = ['assigned_agent_id', 'hub', 'function', 'month']
+
+AGENT_PERFORMANCE_COLUMNS = [
+    'agent_id', 'hub', 'function', 'month',
+    'tickets_handled', 'total_working_hours', 'ticket_work_hours',
+    'utilization_pct', 'avg_hours_per_ticket'
+]
+
+
+def count_agent_tickets(tickets_df):
+    """Tickets handled per agent, hub, function and month.
+
+    The counts are additive, so counts from separate batches of tickets can be
+    combined with merge_agent_counts.
+    """
+    month = tickets_df['year_month'].astype(str).where(tickets_df['year_month'].notna())
+    counts = tickets_df.assign(month=month).groupby(AGENT_COUNT_KEYS, observed=True).size()
+    return counts.reset_index(name='tickets_handled')
+
+
+def merge_agent_counts(counts_list):
+    """Add up agent ticket counts from several batches"""
+    counts = pd.concat(counts_list, ignore_index=True)
+    if len(counts) == 0:
+        return counts
+    merged = counts.groupby(AGENT_COUNT_KEYS, observed=True)['tickets_handled'].sum()
+    return merged.reset_index()
+
+
+def compute_agent_performance(effort_df, agent_ticket_counts):
+    """Merge ticket counts with effort data and derive utilization"""
+    agent_performance = effort_df.merge(
+        agent_ticket_counts,
+        left_on=['agent_id', 'hub', 'function', 'month'],
+        right_on=['assigned_agent_id', 'hub', 'function', 'month'],
+        how='left'
+    )
+
+    agent_performance['tickets_handled'] = agent_performance['tickets_handled'].fillna(0)
+    agent_performance['utilization_pct'] = (
+        agent_performance['ticket_work_hours'] / agent_performance['total_working_hours'] * 100
+    ).round(2)
+    agent_performance['avg_hours_per_ticket'] = (
+        agent_performance['ticket_work_hours'] / agent_performance['tickets_handled']
+    ).replace([float('inf')], 0).round(2)
+
+    # Select columns
+    return agent_performance[AGENT_PERFORMANCE_COLUMNS]
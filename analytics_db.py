@@ -0,0 +1,437 @@
+"""
+Embedded Analytics Database for Support Operations Reporting System
+Tickets, KPIs and agent performance in one local SQL file for dashboard pushdown
+
+With `main.py --analytics-db` the written outputs are loaded into a single
+embedded database file next to them: DuckDB (outputs/analytics.duckdb) when
+the duckdb package is installed, otherwise the standard library's SQLite
+(outputs/analytics.sqlite). Tables:
+
+    tickets               the dashboard's ticket columns (app.TICKET_COLUMNS)
+    kpi_monthly_summary   as the CSV
+    agent_performance     as the CSV
+
+tickets is indexed on (year_month, hub, function) and on created_datetime. In
+DuckDB its rows are also stored in that key order, so the min/max zone maps
+of each row group skip everything outside a hub/function/date selection.
+
+The dashboard then never holds the tickets in memory: AnalyticsDB turns the
+sidebar selection into a WHERE clause and each view's groupbys into GROUP BY
+queries, and fetches only the aggregated rows. The view methods return the
+same dicts as app.prepare_*; only the final rounding and ordering of those
+small results happen in pandas, exactly as the in-memory views do them.
+
+The file is built under a .tmp name and renamed into place before the output
+manifest is written, so it is always listed with the outputs it was built
+from. Without --analytics-db a database left by an earlier run is removed.
+"""
+
+import os
+import sqlite3
+import threading
+
+import numpy as np
+import pandas as pd
+
+from bitmap_index import LRUCache, estimate_nbytes, DEFAULT_CACHE_BYTES, ALL_VALUES
+
+try:
+    import duckdb
+    DUCKDB_AVAILABLE = True
+except ImportError:
+    DUCKDB_AVAILABLE = False
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DUCKDB_FILE = "analytics.duckdb"
+SQLITE_FILE = "analytics.sqlite"
+DB_FILES = [DUCKDB_FILE, SQLITE_FILE]
+
+# SQL type of every ticket column in the database
+TICKET_SCHEMA = {
+    'ticket_id': 'VARCHAR',
+    'hub': 'VARCHAR',
+    'function': 'VARCHAR',
+    'channel': 'VARCHAR',
+    'priority': 'VARCHAR',
+    'category': 'VARCHAR',
+    'status': 'VARCHAR',
+    'created_datetime': 'TIMESTAMP',
+    'year_month': 'VARCHAR',
+    'resolution_time_hours': 'DOUBLE',
+    'sla_met': 'BOOLEAN',
+    'csat_score': 'DOUBLE',
+    'csat_has_score': 'BOOLEAN',
+    'is_backlog': 'BOOLEAN',
+}
+BOOLEAN_COLUMNS = [column for column, sql_type in TICKET_SCHEMA.items() if sql_type == 'BOOLEAN']
+
+# Storage order and index of the tickets table
+PARTITION_KEYS = ['year_month', 'hub', 'function']
+
+SUMMARY_TABLES = {
+    'kpi_monthly_summary': "kpi_monthly_summary.csv",
+    'agent_performance': "agent_performance.csv",
+}
+
+# Tickets per SQLite insert batch while building
+SQLITE_CHUNK_SIZE = 200_000
+
+VIEW_NAMES = ['overview', 'volume', 'sla', 'csat', 'management']
+
+
+def _quoted(column):
+    return f'"{column}"'
+
+
+def _sql_text(value):
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def database_file(output_dir):
+    """Path of the analytics database in output_dir (None when there is none)"""
+    for name in DB_FILES:
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def remove_analytics_db(output_dir):
+    """Delete a database left by an earlier run (it would describe older outputs)"""
+    for name in DB_FILES:
+        path = os.path.join(output_dir, name)
+        if os.path.exists(path):
+            os.remove(path)
+
+# ============================================================================
+# BUILDING
+# ============================================================================
+
+def _build_duckdb(output_dir, path):
+    columns = ",\n".join(
+        f"CAST({_quoted(column)} AS {sql_type}) AS {_quoted(column)}" for column, sql_type in TICKET_SCHEMA.items()
+    )
+    order = ", ".join(_quoted(key) for key in PARTITION_KEYS + ['created_datetime'])
+    source = _sql_text(os.path.join(output_dir, "tickets_master.csv"))
+
+    con = duckdb.connect(path)
+    try:
+        con.execute(f"""
+            CREATE TABLE tickets AS
+            SELECT {columns}
+            FROM read_csv({source}, header = true, all_varchar = true)
+            ORDER BY {order}
+        """)
+        for table, file_name in SUMMARY_TABLES.items():
+            frame = pd.read_csv(os.path.join(output_dir, file_name))
+            con.register('summary_frame', frame)
+            con.execute(f"CREATE TABLE {table} AS SELECT * FROM summary_frame")
+            con.unregister('summary_frame')
+        _create_indexes(con)
+        con.execute("CHECKPOINT")
+        return con.execute("SELECT COUNT(*) FROM tickets").fetchone()[0]
+    finally:
+        con.close()
+
+
+def _build_sqlite(output_dir, path):
+    con = sqlite3.connect(path)
+    try:
+        rows = 0
+        for chunk in pd.read_csv(os.path.join(output_dir, "tickets_master.csv"), usecols=list(TICKET_SCHEMA),
+                                 dtype={'year_month': str}, chunksize=SQLITE_CHUNK_SIZE):
+            chunk = chunk[list(TICKET_SCHEMA)]
+            # 1/0/NULL (SQLite has no boolean type)
+            for column in BOOLEAN_COLUMNS:
+                chunk[column] = chunk[column].map({True: 1, False: 0, 'True': 1, 'False': 0})
+            chunk.to_sql('tickets', con, if_exists='append', index=False,
+                          dtype={column: 'TEXT' if sql_type in ('VARCHAR', 'TIMESTAMP') else
+                                 'INTEGER' if sql_type == 'BOOLEAN' else 'REAL'
+                                 for column, sql_type in TICKET_SCHEMA.items()})
+            rows += len(chunk)
+        for table, file_name in SUMMARY_TABLES.items():
+            pd.read_csv(os.path.join(output_dir, file_name)).to_sql(table, con, index=False)
+        _create_indexes(con)
+        con.execute("ANALYZE")
+        con.commit()
+        return rows
+    finally:
+        con.close()
+
+
+def _create_indexes(con):
+    keys = ", ".join(_quoted(key) for key in PARTITION_KEYS)
+    con.execute(f"CREATE INDEX idx_tickets_partition ON tickets ({keys})")
+    con.execute("CREATE INDEX idx_tickets_created ON tickets (created_datetime)")
+
+
+def build_analytics_db(output_dir, engine=None):
+    """Load the written outputs into the analytics database.
+
+    engine: 'duckdb' or 'sqlite' (default: DuckDB when installed). Returns a
+    dict with 'path', 'engine' and 'tickets' (rows loaded).
+    """
+    engine = engine or ('duckdb' if DUCKDB_AVAILABLE else 'sqlite')
+    name = DUCKDB_FILE if engine == 'duckdb' else SQLITE_FILE
+    path = os.path.join(output_dir, name)
+    staging = path + ".tmp"
+    for stale in (staging, staging + ".wal"):
+        if os.path.exists(stale):
+            os.remove(stale)
+
+    build = _build_duckdb if engine == 'duckdb' else _build_sqlite
+    rows = build(output_dir, staging)
+
+    remove_analytics_db(output_dir)
+    os.replace(staging, path)
+    return {'path': path, 'engine': engine, 'tickets': rows}
+
+# ============================================================================
+# QUERIES
+# ============================================================================
+
+def _counts(frame, column):
+    """A value_counts() Series from (column, count) rows in sorted value order"""
+    counts = pd.Series(frame['count'].to_numpy(), index=pd.Index(frame[column], name=column), name='count')
+    return counts.sort_values(ascending=False)
+
+
+class AnalyticsDB:
+    """Read-only connection to the analytics database with memoized view queries"""
+
+    def __init__(self, path, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.path = path
+        self.engine = 'duckdb' if path.endswith(DUCKDB_FILE) else 'sqlite'
+        if self.engine == 'duckdb':
+            self._con = duckdb.connect(path, read_only=True)
+        else:
+            self._con = sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.cache = LRUCache(cache_bytes)
+
+    def close(self):
+        self._con.close()
+
+    def query(self, sql, params=()):
+        """Result of one SQL query as a DataFrame"""
+        if self.engine == 'duckdb':
+            # A cursor is a separate connection to the same database, safe to use per thread
+            cursor = self._con.cursor()
+            try:
+                return cursor.execute(sql, list(params)).df()
+            finally:
+                cursor.close()
+        with self._lock:
+            return pd.read_sql_query(sql, self._con, params=list(params))
+
+    def memoize(self, key, compute, *args):
+        """compute(*args), cached under `key` (as TicketFilter.memoize)"""
+        key = ('memo',) + tuple(key)
+        result = self.cache.get(key)
+        if result is None:
+            result = compute(*args)
+            self.cache.put(key, result, estimate_nbytes(result))
+        return result
+
+    def metadata(self):
+        """Hubs, functions and created_datetime range of the tickets (for the sidebar)"""
+        bounds = self.query("SELECT MIN(created_datetime) AS created_min, MAX(created_datetime) AS created_max "
+                            "FROM tickets").iloc[0]
+        return {
+            'hubs': self._distinct('hub'),
+            'functions': self._distinct('function'),
+            'created_min': str(bounds['created_min']),
+            'created_max': str(bounds['created_max']),
+        }
+
+    def _distinct(self, column):
+        column = _quoted(column)
+        values = self.query(f"SELECT DISTINCT {column} AS value FROM tickets WHERE {column} IS NOT NULL "
+                            f"ORDER BY value")
+        return values['value'].tolist()
+
+    def _where(self, start_date, end_date, hub, function, *conditions):
+        """WHERE clause and parameters of a sidebar selection (dates inclusive, "All" = no filter)"""
+        clauses, params = list(conditions), []
+        timestamp = "CAST(? AS TIMESTAMP)" if self.engine == 'duckdb' else "?"
+        if hub != ALL_VALUES:
+            clauses.append('"hub" = ?')
+            params.append(hub)
+        if function != ALL_VALUES:
+            clauses.append('"function" = ?')
+            params.append(function)
+        if start_date is not None:
+            clauses.append(f"created_datetime >= {timestamp}")
+            params.append(str(pd.Timestamp(start_date)))
+        if end_date is not None:
+            clauses.append(f"created_datetime < {timestamp}")
+            params.append(str(pd.Timestamp(end_date) + pd.Timedelta(days=1)))
+        return ("WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def _grouped(self, select, keys, selection, *conditions):
+        """SELECT keys, select ... GROUP BY keys ORDER BY keys over a selection (NULL keys dropped)"""
+        key_list = ", ".join(_quoted(key) for key in keys)
+        where, params = self._where(*selection, *conditions, *(f"{_quoted(key)} IS NOT NULL" for key in keys))
+        return self.query(f"SELECT {key_list}, {select} FROM tickets {where} GROUP BY {key_list} ORDER BY {key_list}",
+                          params)
+
+    def _value_counts(self, column, selection, *conditions):
+        return _counts(self._grouped("COUNT(*) AS count", [column], selection, *conditions), column)
+
+    def view(self, name, start_date=None, end_date=None, hub=ALL_VALUES, function=ALL_VALUES):
+        """Data of one dashboard view (VIEW_NAMES) for a sidebar selection, as app.prepare_<name>"""
+        return getattr(self, f"{name}_view")((start_date, end_date, hub, function))
+
+    # ------------------------------------------------------------------------
+    # Views
+    # ------------------------------------------------------------------------
+
+    def overview_view(self, selection):
+        where, params = self._where(*selection)
+        row = self.query(f"""
+            SELECT COUNT(*) AS total_tickets,
+                   COUNT(CASE WHEN is_backlog THEN 1 END) AS backlog_count,
+                   COUNT(CASE WHEN sla_met THEN 1 END) AS sla_met,
+                   COUNT(sla_met) AS sla_known,
+                   AVG(CASE WHEN csat_has_score THEN csat_score END) AS avg_csat,
+                   AVG(resolution_time_hours) AS avg_resolution,
+                   MIN(created_datetime) AS created_min,
+                   MAX(created_datetime) AS created_max
+            FROM tickets {where}
+        """, params).iloc[0]
+        return {
+            'total_tickets': int(row['total_tickets']),
+            'backlog_count': int(row['backlog_count']),
+            'sla_pct': row['sla_met'] / row['sla_known'] * 100 if row['sla_known'] > 0 else None,
+            'avg_csat': None if pd.isna(row['avg_csat']) else row['avg_csat'],
+            'avg_resolution': None if pd.isna(row['avg_resolution']) else row['avg_resolution'],
+            'created_min': pd.Timestamp(row['created_min']) if pd.notna(row['created_min']) else pd.NaT,
+            'created_max': pd.Timestamp(row['created_max']) if pd.notna(row['created_max']) else pd.NaT,
+        }
+
+    def volume_view(self, selection):
+        return {
+            'monthly_volume': self._grouped("COUNT(*) AS ticket_count", ['year_month', 'hub'], selection),
+            'hub_dist': self._value_counts('hub', selection),
+            'func_dist': self._value_counts('function', selection),
+            'top_categories': self._value_counts('category', selection).head(10),
+            'channel_dist': self._value_counts('channel', selection),
+            'priority_by_month': self._grouped("COUNT(*) AS count", ['year_month', 'priority'], selection),
+        }
+
+    def sla_view(self, selection):
+        groups = self._grouped(
+            "COUNT(CASE WHEN sla_met THEN 1 END) AS met, COUNT(*) AS resolved, "
+            "AVG(resolution_time_hours) AS avg_resolution, COUNT(ticket_id) AS ticket_count",
+            ['category'], selection, "sla_met IS NOT NULL"
+        )
+        category_sla = pd.DataFrame({
+            'SLA Compliance %': (groups['met'] / groups['resolved'] * 100).astype(float),
+            'Avg Resolution Time (hrs)': groups['avg_resolution'].astype(float),
+            'Ticket Count': groups['ticket_count'].astype('int64'),
+        }).set_axis(pd.Index(groups['category'], name='category')).round(2)
+        category_sla = category_sla[category_sla['Ticket Count'] >= 3]
+        return {
+            'category_sla': category_sla,
+            'worst_sla': category_sla.nsmallest(5, 'SLA Compliance %'),
+            'highest_resolution': category_sla.nlargest(5, 'Avg Resolution Time (hrs)'),
+        }
+
+    def csat_view(self, selection):
+        scored = "csat_has_score"
+        dist = self._grouped("COUNT(*) AS count", ['csat_score'], selection, scored)
+        if len(dist) == 0:
+            return None
+
+        by_category = self._grouped("AVG(csat_score) AS avg_csat, COUNT(csat_score) AS responses",
+                                    ['category'], selection, scored)
+        csat_by_category = pd.DataFrame({
+            'Avg CSAT': by_category['avg_csat'].astype(float),
+            'Response Count': by_category['responses'].astype('int64'),
+        }).set_axis(pd.Index(by_category['category'], name='category')).round(2)
+        csat_by_category = csat_by_category[csat_by_category['Response Count'] >= 3]
+
+        def mean_by(column):
+            means = self._grouped("AVG(csat_score) AS csat_score", [column], selection, scored)
+            return means.set_index(column)['csat_score'].astype(float).round(2)
+
+        scores = dist['csat_score'].to_numpy(float)
+        counts = dist['count'].to_numpy('int64')
+        return {
+            'csat_by_hub': mean_by('hub'),
+            'csat_by_function': mean_by('function'),
+            'csat_trend': self._grouped("AVG(csat_score) AS csat_score", ['year_month', 'hub'], selection, scored),
+            'csat_dist': pd.Series(counts, index=pd.Index(scores, name='csat_score'), name='count'),
+            'high_csat': counts[scores >= 4].sum(),
+            'medium_csat': counts[scores == 3].sum(),
+            'low_csat': counts[scores <= 2].sum(),
+            'top_10_categories': csat_by_category.nlargest(10, 'Avg CSAT'),
+        }
+
+    def management_view(self, selection):
+        months = self._grouped("COUNT(*) AS count", ['year_month'], selection)
+        # NaN without tickets, as max() of an empty column
+        last_month = months['year_month'].iloc[-1] if len(months) else np.nan
+        prev_total = int(months['count'].iloc[-2]) if len(months) >= 2 else None
+        in_month = f'"year_month" = {_sql_text(last_month)}' if len(months) else "1 = 0"
+
+        where, params = self._where(*selection, in_month)
+        row = self.query(f"""
+            SELECT COUNT(*) AS total,
+                   COUNT(CASE WHEN is_backlog THEN 1 END) AS backlog,
+                   COUNT(CASE WHEN sla_met THEN 1 END) AS sla_met,
+                   COUNT(sla_met) AS sla_known,
+                   AVG(CASE WHEN csat_has_score THEN csat_score END) AS avg_csat,
+                   AVG(resolution_time_hours) AS avg_res
+            FROM tickets {where}
+        """, params).iloc[0]
+        total = int(row['total'])
+
+        worst_category, worst_count = None, 0
+        if total > 0:
+            category_counts = self._value_counts('category', selection, in_month)
+            worst_category, worst_count = category_counts.idxmax(), category_counts.max()
+
+        hubs = self._grouped("COUNT(CASE WHEN sla_met THEN 1 END) AS met, COUNT(sla_met) AS known",
+                             ['hub'], selection, in_month)
+        known = hubs['known'].to_numpy()
+        hub_sla = pd.Series(
+            [met / n * 100 if n > 0 else 0 for met, n in zip(hubs['met'], known)],
+            index=pd.Index(hubs['hub'], name='hub'), dtype=float
+        )
+
+        cat_sla = None
+        if row['sla_known'] > 0:
+            categories = self._grouped("COUNT(CASE WHEN sla_met THEN 1 END) AS met, COUNT(*) AS resolved",
+                                       ['category'], selection, in_month, "sla_met IS NOT NULL")
+            cat_sla = pd.Series(
+                (categories['met'] / categories['resolved'] * 100).to_numpy(float),
+                index=pd.Index(categories['category'], name='category')
+            ).round(2).sort_values(ascending=False).head(5)
+
+        return {
+            'last_month': last_month,
+            'total': total,
+            'backlog': int(row['backlog']),
+            'sla': row['sla_met'] / row['sla_known'] * 100 if row['sla_known'] > 0 else 0,
+            'avg_csat': row['avg_csat'] if pd.notna(row['avg_csat']) else 0,
+            'avg_res': row['avg_res'] if pd.notna(row['avg_res']) else 0,
+            'worst_category': worst_category,
+            'worst_count': worst_count,
+            'prev_total': prev_total,
+            'hub_sla': hub_sla,
+            'cat_sla': cat_sla,
+        }
+
+    # ------------------------------------------------------------------------
+    # Summary tables
+    # ------------------------------------------------------------------------
+
+    def read_table(self, name):
+        """kpi_monthly_summary or agent_performance, as the CSV reads"""
+        if name not in SUMMARY_TABLES:
+            raise ValueError(f"unknown table: {name}")
+        return self.query(f"SELECT * FROM {name}")
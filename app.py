@@ -5,12 +5,33 @@ Interactive Streamlit Application with Required Dashboards
 Run with: streamlit run app.py
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import streamlit as st
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
 
+from columnar_store import (
+    load_metadata, read_tickets, read_table, STORE_DIR_NAME, TICKETS_DIR_NAME, METADATA_FILE
+)
+from rollup_cube import read_rollup_cube, index_cube, cube_lookup
+from quantile_sketch import read_sketches, index_sketches, sketch_quantiles
+from backlog_timeline import read_backlog_timeline, backlog_series, AGING_COLUMNS, AGING_LABELS
+from compact_schema import compact_tickets
+from analytics_db import AnalyticsDB, DB_FILES, DUCKDB_FILE, DUCKDB_AVAILABLE
+from excel_export import write_management_packs, XLSX_AVAILABLE
+from time_index import sort_by_created
+from bitmap_index import TicketFilter
+from pipeline import run_pipeline, INPUT_TICKETS, INPUT_EFFORT
+from render_profiler import RenderProfiler, render_panel
+from chart_reduction import top_n_bars, top_n_series, limit_points, WEBGL_THRESHOLD
+from output_manifest import (
+    ManifestMismatchError, read_manifest, artifact_fingerprint, files_match, verify_artifact, read_verified
+)
+
 # ============================================================================
 # PAGE CONFIGURATION
 # ============================================================================
@@ -77,49 +98,483 @@ st.markdown("""
 # HELPER FUNCTIONS
 # ============================================================================
 
+OUTPUT_DIR = "outputs"
+
+# Ticket frames kept per loader: the current output generation and the one a
+# session may still be on while main.py rewrites the outputs
+CACHED_TICKET_FRAMES = 2
+
+# Ticket columns the dashboard reads from the Parquet store (column pruning)
+TICKET_COLUMNS = [
+    'ticket_id', 'hub', 'function', 'channel', 'priority', 'category', 'status',
+    'created_datetime', 'year_month', 'resolution_time_hours', 'sla_met',
+    'csat_score', 'csat_has_score', 'is_backlog'
+]
+
+# Output files behind each dashboard artifact, relative to OUTPUT_DIR (manifest paths)
+STORE_ARTIFACTS = {
+    'metadata': f"{STORE_DIR_NAME}/{METADATA_FILE}",
+    'tickets': f"{STORE_DIR_NAME}/{TICKETS_DIR_NAME}",
+    'kpi_monthly_summary': f"{STORE_DIR_NAME}/kpi_monthly_summary.parquet",
+    'agent_performance': f"{STORE_DIR_NAME}/agent_performance.parquet",
+}
+CSV_ARTIFACTS = {
+    'tickets': "tickets_master.csv",
+    'kpi_monthly_summary': "kpi_monthly_summary.csv",
+    'agent_performance': "agent_performance.csv",
+    'cube': "kpi_rollup_cube.csv",
+    'sketches': "resolution_sketches.csv",
+    'backlog_timeline': "backlog_timeline.csv",
+}
+
+# Excel packs built for dashboard downloads (a dot-dir: not listed in the manifest)
+PACK_BUILD_DIR = ".exports"
+
+# Pack builds (futures and their results) kept for month/hub/function/generation
+# selections; an evicted one is simply built again when requested
+CACHED_PACK_BUILDS = 8
+
+# Every loader below takes the `generation` fingerprint of its artifact (from
+# the output manifest) as a cache key: a pipeline run invalidates only what it
+# changed, and the new value replaces the old one only once fully loaded. The
+# manifest itself is passed as `_manifest`, which Streamlit does not hash.
+
+def current_manifest():
+    """Manifest of the newest complete pipeline run that can be served.
+
+    While main.py is rewriting outputs the files no longer match the newest
+    manifest; the session keeps the generation it last loaded (still cached)
+    until the run finishes. None when main.py has not written a manifest.
+    """
+    manifest = read_manifest(OUTPUT_DIR)
+    if manifest is not None and not files_match(OUTPUT_DIR, manifest):
+        return st.session_state.get('manifest', manifest)
+    st.session_state['manifest'] = manifest
+    return manifest
+
 @st.cache_data
-def load_data():
-    """Load processed data files"""
-    try:
-        tickets = pd.read_csv("outputs/tickets_master.csv")
-        kpis = pd.read_csv("outputs/kpi_monthly_summary.csv")
-        agents = pd.read_csv("outputs/agent_performance.csv")
+def load_store_metadata(generation=None):
+    """Months, hubs, functions and date range of the Parquet store (None if absent)"""
+    return load_metadata(OUTPUT_DIR)
+
+@st.cache_resource(max_entries=CACHED_TICKET_FRAMES)
+def load_ticket_data(use_store, hub='All', function='All', start_date=None, end_date=None,
+                     generation=None, _manifest=None):
+    """Tickets sorted by created_datetime (see time_index); shared, read-only.
+
+    The dashboard reads every partition once per generation and filters in
+    memory (bitmap_index); hub/function/dates prune partitions for other callers.
+    """
+    if use_store:
+        verify_artifact(OUTPUT_DIR, _manifest, STORE_ARTIFACTS['tickets'])
+        tickets = read_tickets(
+            OUTPUT_DIR,
+            columns=TICKET_COLUMNS,
+            hubs=None if hub == 'All' else [hub],
+            functions=None if function == 'All' else [function],
+            start_date=start_date,
+            end_date=end_date
+        )
+        return sort_by_created(compact_tickets(tickets))
+
+    tickets = pd.read_csv(read_verified(OUTPUT_DIR, _manifest, CSV_ARTIFACTS['tickets']))
+
+    # Parse dates
+    tickets['created_datetime'] = pd.to_datetime(tickets['created_datetime'])
+    tickets['resolved_datetime'] = pd.to_datetime(tickets['resolved_datetime'])
+
+    # Ensure year_month is string for plotting
+    tickets['year_month'] = tickets['year_month'].astype(str)
+
+    return sort_by_created(compact_tickets(tickets[TICKET_COLUMNS]))
+
+@st.cache_resource
+def load_summary_table(use_store, name, generation=None, _manifest=None):
+    """kpi_monthly_summary or agent_performance; shared, read-only"""
+    if use_store:
+        verify_artifact(OUTPUT_DIR, _manifest, STORE_ARTIFACTS[name])
+        return read_table(OUTPUT_DIR, name)
+    return pd.read_csv(read_verified(OUTPUT_DIR, _manifest, CSV_ARTIFACTS[name]))
+
+def dashboard_tickets(tickets_df):
+    """Enriched pipeline tickets in the dashboard's layout: used columns, compact, sorted by creation"""
+    tickets = tickets_df[TICKET_COLUMNS].assign(year_month=tickets_df['year_month'].astype(str))
+    return sort_by_created(compact_tickets(tickets))
+
+@st.cache_resource
+def load_pipeline_results():
+    """Tickets, KPIs, agents, cube, resolution sketches and backlog timeline computed in-process.
+
+    Used when outputs/ has not been generated: the frames go straight into the
+    cache without being written and re-parsed.
+    """
+    result = run_pipeline(INPUT_TICKETS, INPUT_EFFORT)
+    return (
+        dashboard_tickets(result['tickets']),
+        result['kpi_summary'],
+        result['agent_performance'],
+        index_cube(result['kpi_cube']),
+        index_sketches(result['resolution_sketches']),
+        result['backlog_timeline'],
+    )
 
-        # Parse dates
-        tickets['created_datetime'] = pd.to_datetime(tickets['created_datetime'])
-        tickets['resolved_datetime'] = pd.to_datetime(tickets['resolved_datetime'])
+def pipeline_inputs_available():
+    return os.path.exists(INPUT_TICKETS) and os.path.exists(INPUT_EFFORT)
 
-        # Ensure year_month is string for plotting
-        tickets['year_month'] = tickets['year_month'].astype(str)
+def load_data(hub='All', function='All', start_date=None, end_date=None, manifest=None):
+    """Load processed data files (shared across reruns without copying; read-only)
 
+    With the Parquet store, only the columns used by the dashboard are read (and
+    only the partitions of hub/function/dates, when given). Otherwise the CSVs
+    are parsed.
+    Tickets are returned sorted by created_datetime (see time_index). Each
+    artifact is cached by its manifest fingerprint, so after a pipeline run
+    only the changed ones are reloaded. Without any outputs, the pipeline
+    runs in-process on the input files instead.
+    """
+    try:
+        use_store = load_store_metadata(artifact_fingerprint(manifest, STORE_ARTIFACTS['metadata'])) is not None
+        artifacts = STORE_ARTIFACTS if use_store else CSV_ARTIFACTS
+
+        tickets = load_ticket_data(
+            use_store, hub, function, start_date, end_date,
+            generation=artifact_fingerprint(manifest, artifacts['tickets']), _manifest=manifest
+        )
+        kpis, agents = (
+            load_summary_table(
+                use_store, name,
+                generation=artifact_fingerprint(manifest, artifacts[name]), _manifest=manifest
+            )
+            for name in ('kpi_monthly_summary', 'agent_performance')
+        )
         return tickets, kpis, agents, None
     except FileNotFoundError as e:
+        if pipeline_inputs_available():
+            tickets, kpis, agents = load_pipeline_results()[:3]
+            return tickets, kpis, agents, None
         return None, None, None, "Data files not found. Please run main.py first!"
+    except ManifestMismatchError as e:
+        return None, None, None, "Output files are being regenerated by main.py. Refresh in a moment."
     except Exception as e:
         return None, None, None, f"Error loading data: {str(e)}"
 
+@st.cache_data
+def load_rollup_cube(generation=None, _manifest=None):
+    """KPI rollup cube indexed by (year_month, hub, function) (None without outputs or inputs)"""
+    try:
+        return read_rollup_cube(OUTPUT_DIR, read_verified(OUTPUT_DIR, _manifest, CSV_ARTIFACTS['cube']))
+    except FileNotFoundError:
+        return load_pipeline_results()[3] if pipeline_inputs_available() else None
+
+@st.cache_resource
+def load_resolution_sketches(generation=None, _manifest=None):
+    """Resolution-time sketches rolled up for lookups; shared, read-only (None without outputs or inputs)"""
+    try:
+        return read_sketches(OUTPUT_DIR, read_verified(OUTPUT_DIR, _manifest, CSV_ARTIFACTS['sketches']))
+    except FileNotFoundError:
+        return load_pipeline_results()[4] if pipeline_inputs_available() else None
+
+@st.cache_resource
+def load_backlog_timeline(generation=None, _manifest=None):
+    """Daily open-ticket counts per hub/function/priority; shared, read-only (None without outputs or inputs)"""
+    try:
+        return read_backlog_timeline(OUTPUT_DIR, read_verified(OUTPUT_DIR, _manifest, CSV_ARTIFACTS['backlog_timeline']))
+    except FileNotFoundError:
+        return load_pipeline_results()[5] if pipeline_inputs_available() else None
+
+def analytics_db_name(manifest):
+    """Manifest path of the analytics database written by main.py --analytics-db (None without one)"""
+    if manifest is None:
+        return None
+    for name in DB_FILES:
+        if name in manifest['files'] and (name != DUCKDB_FILE or DUCKDB_AVAILABLE):
+            return name
+    return None
+
+@st.cache_resource
+def load_analytics_db(name, generation=None, _manifest=None):
+    """Read-only connection to the analytics database, with memoized view queries; shared"""
+    verify_artifact(OUTPUT_DIR, _manifest, name)
+    return AnalyticsDB(os.path.join(OUTPUT_DIR, name))
+
+@st.cache_resource
+def pack_builder():
+    """Single background thread that writes Excel packs off the render path; shared"""
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="excel-pack")
+
+@st.cache_resource(max_entries=CACHED_PACK_BUILDS)
+def build_management_pack(month, hub='All', function='All', generation=None):
+    """Future of the Excel pack of one month and selection, submitted once per output generation; shared"""
+    return pack_builder().submit(
+        write_management_packs, OUTPUT_DIR, [month], hub, function, os.path.join(OUTPUT_DIR, PACK_BUILD_DIR)
+    )
+
+@st.cache_resource(max_entries=CACHED_TICKET_FRAMES)
+def load_ticket_filter(generation=None, _manifest=None):
+    """Bitmap indexes and memoized filter results over all tickets of one output generation.
+
+    Every hub/function/date selection is answered by TicketFilter.select, so
+    there is one filter (and one LRU result cache) per generation.
+    """
+    tickets, _, _, error = load_data(manifest=_manifest)
+    return None if error else TicketFilter(tickets)
+
 def get_last_month_data(df):
     """Get data for the last complete month"""
     max_month = df['year_month'].max()
     return df[df['year_month'] == max_month]
 
+# ============================================================================
+# VIEW DATA PREPARATION
+# ============================================================================
+# Pure pandas, no Streamlit calls: main() runs only the active view's function
+# and memoizes its result per filter state (TicketFilter.memoize).
+
+VIEWS = [
+    "📊 Volume & Distribution",
+    "⏱️ SLA & Resolution Performance",
+    "⭐ CSAT Analysis",
+    "📋 Management Summary",
+    "📈 Detailed KPI Table"
+]
+
+def prepare_overview(tickets):
+    """Header KPIs for the filtered tickets (None where there is no data)"""
+    resolved = tickets[tickets['sla_met'].notna()]
+    with_csat = tickets[tickets['csat_has_score']]
+    resolved_tickets = tickets[tickets['resolution_time_hours'].notna()]
+    return {
+        'total_tickets': len(tickets),
+        'backlog_count': tickets['is_backlog'].sum(),
+        'sla_pct': (resolved['sla_met'].sum() / len(resolved)) * 100 if len(resolved) > 0 else None,
+        'avg_csat': with_csat['csat_score'].mean() if len(with_csat) > 0 else None,
+        'avg_resolution': resolved_tickets['resolution_time_hours'].mean() if len(resolved_tickets) > 0 else None,
+        'created_min': tickets['created_datetime'].min(),
+        'created_max': tickets['created_datetime'].max(),
+    }
+
+def prepare_volume_view(tickets):
+    """Volume & Distribution: monthly trend and breakdowns"""
+    return {
+        'monthly_volume': tickets.groupby(['year_month', 'hub'], observed=True).size().reset_index(name='ticket_count'),
+        'hub_dist': tickets['hub'].value_counts(),
+        'func_dist': tickets['function'].value_counts(),
+        'top_categories': tickets['category'].value_counts().head(10),
+        'channel_dist': tickets['channel'].value_counts(),
+        'priority_by_month': tickets.groupby(['year_month', 'priority'], observed=True).size().reset_index(name='count'),
+    }
+
+def prepare_sla_view(tickets):
+    """SLA & Resolution: per-category SLA compliance and resolution time"""
+    resolved_tickets = tickets[tickets['sla_met'].notna()]
+    category_sla = resolved_tickets.groupby('category', observed=True).agg({
+        'sla_met': lambda x: (x.sum() / len(x) * 100),
+        'resolution_time_hours': 'mean',
+        'ticket_id': 'count'
+    }).round(2)
+    category_sla.columns = ['SLA Compliance %', 'Avg Resolution Time (hrs)', 'Ticket Count']
+    category_sla = category_sla[category_sla['Ticket Count'] >= 3]  # Only categories with 3+ tickets
+    return {
+        'category_sla': category_sla,
+        'worst_sla': category_sla.nsmallest(5, 'SLA Compliance %'),
+        'highest_resolution': category_sla.nlargest(5, 'Avg Resolution Time (hrs)'),
+    }
+
+def prepare_csat_view(tickets):
+    """CSAT: averages by hub/function/month/category and the score distribution"""
+    csat_tickets = tickets[tickets['csat_has_score']]
+    if len(csat_tickets) == 0:
+        return None
+
+    csat_trend = csat_tickets.groupby(['year_month', 'hub'], observed=True).agg({
+        'csat_score': 'mean'
+    }).reset_index()
+
+    csat_by_category = csat_tickets.groupby('category', observed=True).agg({
+        'csat_score': ['mean', 'count']
+    }).round(2)
+    csat_by_category.columns = ['Avg CSAT', 'Response Count']
+    csat_by_category = csat_by_category[csat_by_category['Response Count'] >= 3]
+
+    return {
+        'csat_by_hub': csat_tickets.groupby('hub', observed=True)['csat_score'].mean().round(2),
+        'csat_by_function': csat_tickets.groupby('function', observed=True)['csat_score'].mean().round(2),
+        'csat_trend': csat_trend,
+        'csat_dist': csat_tickets['csat_score'].value_counts().sort_index(),
+        'high_csat': (csat_tickets['csat_score'] >= 4).sum(),
+        'medium_csat': (csat_tickets['csat_score'] == 3).sum(),
+        'low_csat': (csat_tickets['csat_score'] <= 2).sum(),
+        'top_10_categories': csat_by_category.nlargest(10, 'Avg CSAT'),
+    }
+
+def prepare_management_view(tickets):
+    """Management Summary: last-month KPIs and the inputs of the insight rules"""
+    last_month = tickets['year_month'].max()
+    last_month_tickets = tickets[tickets['year_month'] == last_month]
+    total = len(last_month_tickets)
+
+    resolved = last_month_tickets[last_month_tickets['sla_met'].notna()]
+    with_csat = last_month_tickets[last_month_tickets['csat_has_score']]
+    resolved_tickets = last_month_tickets[last_month_tickets['resolution_time_hours'].notna()]
+
+    worst_category, worst_count = None, 0
+    if total > 0:
+        category_counts = last_month_tickets['category'].value_counts()
+        worst_category, worst_count = category_counts.idxmax(), category_counts.max()
+
+    prev_total = None
+    months = sorted(tickets['year_month'].unique())
+    if len(months) >= 2:
+        prev_total = len(tickets[tickets['year_month'] == months[-2]])
+
+    hub_sla = last_month_tickets.groupby('hub', observed=True).apply(
+        lambda x: (x['sla_met'].sum() / x['sla_met'].notna().sum() * 100) if x['sla_met'].notna().sum() > 0 else 0
+    )
+
+    cat_sla = None
+    if len(resolved) > 0:
+        cat_sla = resolved.groupby('category', observed=True).apply(
+            lambda x: (x['sla_met'].sum() / len(x) * 100)
+        ).round(2).sort_values(ascending=False).head(5)
+
+    return {
+        'last_month': last_month,
+        'total': total,
+        'backlog': last_month_tickets['is_backlog'].sum(),
+        'sla': (resolved['sla_met'].sum() / len(resolved) * 100) if len(resolved) > 0 else 0,
+        'avg_csat': with_csat['csat_score'].mean() if len(with_csat) > 0 else 0,
+        'avg_res': resolved_tickets['resolution_time_hours'].mean() if len(resolved_tickets) > 0 else 0,
+        'worst_category': worst_category,
+        'worst_count': worst_count,
+        'prev_total': prev_total,
+        'hub_sla': hub_sla,
+        'cat_sla': cat_sla,
+    }
+
+def prepare_agent_view(agents, hub, function):
+    """Detailed KPI Table: agent performance rows and summaries for the selection"""
+    filtered_agents = agents
+
+    if hub != 'All':
+        filtered_agents = filtered_agents[filtered_agents['hub'] == hub]
+
+    if function != 'All':
+        filtered_agents = filtered_agents[filtered_agents['function'] == function]
+
+    agent_kpi_display = filtered_agents[[
+        'month', 'agent_id', 'hub', 'function',
+        'tickets_handled', 'total_working_hours', 'ticket_work_hours',
+        'utilization_pct', 'avg_hours_per_ticket'
+    ]].copy()
+
+    agent_kpi_display.columns = [
+        'Month', 'Agent ID', 'Hub', 'Function',
+        'Tickets Handled', 'Total Hours', 'Ticket Work Hours',
+        'Utilization %', 'Avg Hours/Ticket'
+    ]
+
+    agent_monthly_avg = filtered_agents.groupby('agent_id').agg({
+        'tickets_handled': 'mean',
+        'hub': 'first',
+        'function': 'first'
+    }).round(2).sort_values('tickets_handled', ascending=False)
+    agent_monthly_avg.columns = ['Avg Tickets/Month', 'Hub', 'Function']
+
+    agent_util_avg = filtered_agents.groupby('agent_id').agg({
+        'utilization_pct': 'mean',
+        'hub': 'first',
+        'function': 'first'
+    }).round(2).sort_values('utilization_pct', ascending=False)
+    agent_util_avg.columns = ['Avg Utilization %', 'Hub', 'Function']
+
+    agent_hub_function = filtered_agents.groupby(['hub', 'function']).agg({
+        'tickets_handled': 'sum',
+        'utilization_pct': 'mean',
+        'agent_id': 'nunique'
+    }).round(2).reset_index()
+    agent_hub_function.columns = ['Hub', 'Function', 'Total Tickets', 'Avg Utilization %', 'Agent Count']
+
+    agent_monthly_trend = filtered_agents.groupby(['month', 'agent_id']).agg({
+        'tickets_handled': 'sum'
+    }).reset_index()
+    agent_util_trend = filtered_agents.groupby(['month', 'agent_id']).agg({
+        'utilization_pct': 'mean'
+    }).reset_index()
+
+    return {
+        'filtered_agents': filtered_agents,
+        'agent_kpi_display': agent_kpi_display,
+        'agent_monthly_avg': agent_monthly_avg,
+        'agent_util_avg': agent_util_avg,
+        'agent_monthly_trend': agent_monthly_trend,
+        'agent_util_trend': agent_util_trend,
+        'agent_hub_function': agent_hub_function,
+        # Chart data: top agents plus one "Other" bar/line (tables keep every agent)
+        'agent_monthly_bars': top_n_bars(agent_monthly_avg['Avg Tickets/Month']),
+        'agent_util_bars': top_n_bars(agent_util_avg['Avg Utilization %']),
+        'agent_monthly_lines': top_n_series(agent_monthly_trend, 'agent_id', 'month', 'tickets_handled', rank='sum'),
+        'agent_util_lines': top_n_series(agent_util_trend, 'agent_id', 'month', 'utilization_pct', rank='mean'),
+    }
+
 # ============================================================================
 # MAIN APP
 # ============================================================================
 
 def main():
+    # Opt-in timings of this rerun (sidebar checkbox, see render_profiler)
+    # Every chart is held to a point budget (see chart_reduction)
+    profiler = RenderProfiler.from_session(prepare_figure=limit_points)
+
     # Header
     st.markdown('<div class="main-header">📊 Support Operations Performance Dashboard</div>', unsafe_allow_html=True)
     st.markdown('<div class="sub-header">OrionEdge Corp | Hub A (Bangalore) & Hub B (Krakow)</div>', unsafe_allow_html=True)
     st.markdown("---")
 
-    # Load data
-    tickets_df, kpis_df, agents_df, error = load_data()
-
-    if error:
-        st.error(error)
-        st.info("Please run: **python main.py** to generate the data files first.")
-        st.stop()
+    # Load data (the Parquet store lets the sidebar be built before loading tickets)
+    manifest = current_manifest()
+    store = load_store_metadata(artifact_fingerprint(manifest, STORE_ARTIFACTS['metadata']))
+    artifacts = CSV_ARTIFACTS if store is None else STORE_ARTIFACTS
+
+    # With the analytics database, tickets stay in it: filters and view
+    # aggregations run there as SQL and only their results are fetched
+    analytics = None
+    db_name = analytics_db_name(manifest)
+    if db_name is not None:
+        try:
+            with profiler.section('load', 'analytics_db'):
+                analytics = load_analytics_db(db_name, artifact_fingerprint(manifest, db_name), _manifest=manifest)
+                db_metadata = analytics.memoize(('metadata',), analytics.metadata)
+                kpis_df, agents_df = (
+                    analytics.memoize(('table', name), analytics.read_table, name)
+                    for name in ('kpi_monthly_summary', 'agent_performance')
+                )
+        except ManifestMismatchError:
+            st.info("Output files are being regenerated by main.py. Refresh in a moment.")
+            st.stop()
+
+    if analytics is not None:
+        hubs = db_metadata['hubs']
+        functions = db_metadata['functions']
+        min_date = pd.Timestamp(db_metadata['created_min']).date()
+        max_date = pd.Timestamp(db_metadata['created_max']).date()
+    elif store is None:
+        with profiler.section('load', 'load_data'):
+            tickets_df, kpis_df, agents_df, error = load_data(manifest=manifest)
+
+        if error:
+            st.error(error)
+            st.info("Please run: **python main.py** to generate the data files first.")
+            st.stop()
+
+        hubs = sorted(tickets_df['hub'].unique().tolist())
+        functions = sorted(tickets_df['function'].unique().tolist())
+        min_date = tickets_df['created_datetime'].min().date()
+        max_date = tickets_df['created_datetime'].max().date()
+    else:
+        hubs = store['hubs']
+        functions = store['functions']
+        min_date = pd.Timestamp(store['created_min']).date()
+        max_date = pd.Timestamp(store['created_max']).date()
 
     # ========================================================================
     # SIDEBAR FILTERS
@@ -128,17 +583,15 @@ def main():
     st.sidebar.header("🔍 Global Filters")
 
     # Hub filter
-    hub_options = ['All'] + sorted(tickets_df['hub'].unique().tolist())
+    hub_options = ['All'] + hubs
     selected_hub = st.sidebar.selectbox("📍 Hub", hub_options)
 
     # Function filter
-    function_options = ['All'] + sorted(tickets_df['function'].unique().tolist())
+    function_options = ['All'] + functions
     selected_function = st.sidebar.selectbox("💼 Function", function_options)
 
     # Date range filter
     st.sidebar.subheader("📅 Date Range")
-    min_date = tickets_df['created_datetime'].min().date()
-    max_date = tickets_df['created_datetime'].max().date()
 
     date_range = st.sidebar.date_input(
         "Select Date Range",
@@ -147,26 +600,74 @@ def main():
         max_value=max_date
     )
 
-    # Apply filters
-    filtered_tickets = tickets_df.copy()
-    filtered_kpis = kpis_df.copy()
+    if analytics is None and store is not None:
+        # All partitions, once per generation: the sidebar selection is applied
+        # by the ticket filter below, so changing it never reads the store again
+        with profiler.section('load', 'load_data'):
+            tickets_df, kpis_df, agents_df, error = load_data(manifest=manifest)
+
+        if error:
+            st.error(error)
+            st.info("Please run: **python main.py** to generate the data files first.")
+            st.stop()
+
+    # Apply filters: the date range is a binary-searched slice of the time-sorted
+    # tickets and hub/function are bitmap ANDs inside it. Results are memoized by
+    # filter state, so a repeated selection is a cache lookup.
+    filter_start, filter_end = date_range if len(date_range) == 2 else (None, None)
+    filter_state = (filter_start, filter_end, selected_hub, selected_function)
+    if analytics is None:
+        with profiler.section('load', 'ticket_filter'):
+            ticket_filter = load_ticket_filter(
+                generation=artifact_fingerprint(manifest, artifacts['tickets']), _manifest=manifest
+            )
+        with profiler.section('filter', 'select'):
+            filtered_tickets = ticket_filter.select(
+                filter_start, filter_end, hub=selected_hub, function=selected_function
+            )
+
+    # View data is memoized per filter state by the ticket filter, or by the
+    # analytics connection when the aggregations run there as SQL
+    view_cache = ticket_filter if analytics is None else analytics
+
+    def view_data(name, prepare):
+        """One view's data: prepare() over the filtered tickets, or its SQL counterpart"""
+        if analytics is not None:
+            return analytics.memoize((name,) + filter_state, analytics.view, name, *filter_state)
+        return ticket_filter.memoize((name,) + filter_state, prepare, filtered_tickets)
+
+    filtered_kpis = kpis_df
 
     if selected_hub != 'All':
-        filtered_tickets = filtered_tickets[filtered_tickets['hub'] == selected_hub]
         filtered_kpis = filtered_kpis[filtered_kpis['hub'] == selected_hub]
 
     if selected_function != 'All':
-        filtered_tickets = filtered_tickets[filtered_tickets['function'] == selected_function]
         filtered_kpis = filtered_kpis[filtered_kpis['function'] == selected_function]
 
-    if len(date_range) == 2:
-        filtered_tickets = filtered_tickets[
-            (filtered_tickets['created_datetime'].dt.date >= date_range[0]) &
-            (filtered_tickets['created_datetime'].dt.date <= date_range[1])
-        ]
+    # Month/hub/function rollups come from indexed cube lookups, not groupbys
+    try:
+        with profiler.section('load', 'rollup_cube'):
+            kpi_cube = load_rollup_cube(artifact_fingerprint(manifest, CSV_ARTIFACTS['cube']), _manifest=manifest)
+    except ManifestMismatchError:
+        st.info("Output files are being regenerated by main.py. Refresh in a moment.")
+        st.stop()
+
+    if kpi_cube is None:
+        st.error("KPI rollup cube not found. Please run main.py first!")
+        st.info("Please run: **python main.py** to generate the data files first.")
+        st.stop()
+
+    with profiler.section('aggregate', 'cube_lookups'):
+        monthly_kpis = cube_lookup(kpi_cube, hub=selected_hub, function=selected_function, by='year_month')
+        hub_kpis = cube_lookup(kpi_cube, function=selected_function, by='hub')
+        function_kpis = cube_lookup(kpi_cube, hub=selected_hub, by='function')
+        overall_kpis = cube_lookup(kpi_cube, hub=selected_hub, function=selected_function).reindex([0]).iloc[0]
+
+    with profiler.section('aggregate', 'overview'):
+        overview = view_data('overview', prepare_overview)
 
     st.sidebar.markdown("---")
-    st.sidebar.info(f"📊 Filtered Data: {len(filtered_tickets)} tickets")
+    st.sidebar.info(f"📊 Filtered Data: {overview['total_tickets']} tickets")
 
     # ========================================================================
     # KEY METRICS OVERVIEW
@@ -177,65 +678,59 @@ def main():
     col1, col2, col3, col4, col5 = st.columns(5)
 
     with col1:
-        total_tickets = len(filtered_tickets)
+        total_tickets = overview['total_tickets']
         st.metric("🎫 Total Tickets", f"{total_tickets:,}")
 
     with col2:
-        backlog_count = filtered_tickets['is_backlog'].sum()
+        backlog_count = overview['backlog_count']
         backlog_pct = (backlog_count / total_tickets * 100) if total_tickets > 0 else 0
         st.metric("📋 Backlog", f"{backlog_count:,}", f"{backlog_pct:.1f}%")
 
     with col3:
-        resolved = filtered_tickets[filtered_tickets['sla_met'].notna()]
-        if len(resolved) > 0:
-            sla_pct = (resolved['sla_met'].sum() / len(resolved)) * 100
-            st.metric("✅ SLA Compliance", f"{sla_pct:.1f}%")
+        if overview['sla_pct'] is not None:
+            st.metric("✅ SLA Compliance", f"{overview['sla_pct']:.1f}%")
         else:
             st.metric("✅ SLA Compliance", "N/A")
 
     with col4:
-        with_csat = filtered_tickets[filtered_tickets['csat_has_score']]
-        if len(with_csat) > 0:
-            avg_csat = with_csat['csat_score'].mean()
-            st.metric("⭐ Avg CSAT", f"{avg_csat:.2f}/5")
+        if overview['avg_csat'] is not None:
+            st.metric("⭐ Avg CSAT", f"{overview['avg_csat']:.2f}/5")
         else:
             st.metric("⭐ Avg CSAT", "N/A")
 
     with col5:
-        resolved_tickets = filtered_tickets[filtered_tickets['resolution_time_hours'].notna()]
-        if len(resolved_tickets) > 0:
-            avg_resolution = resolved_tickets['resolution_time_hours'].mean()
-            st.metric("⏱️ Avg Resolution", f"{avg_resolution:.1f}h")
+        if overview['avg_resolution'] is not None:
+            st.metric("⏱️ Avg Resolution", f"{overview['avg_resolution']:.1f}h")
         else:
             st.metric("⏱️ Avg Resolution", "N/A")
 
     st.markdown("---")
 
     # ========================================================================
-    # TAB NAVIGATION - REQUIRED DASHBOARDS
+    # VIEW NAVIGATION - REQUIRED DASHBOARDS
     # ========================================================================
+    # Unlike st.tabs, which runs every tab body on each rerun, only the
+    # selected view prepares its data and builds its figures.
 
-    tab1, tab2, tab3, tab4, tab5 = st.tabs([
-        "📊 Volume & Distribution",
-        "⏱️ SLA & Resolution Performance",
-        "⭐ CSAT Analysis",
-        "📋 Management Summary",
-        "📈 Detailed KPI Table"
-    ])
+    active_view = st.radio("View", VIEWS, horizontal=True, label_visibility="collapsed", key="active_view")
+    profiler.view = active_view
 
     # ========================================================================
     # TAB 1: VOLUME & DISTRIBUTION VIEW
     # ========================================================================
 
-    with tab1:
+    if active_view == VIEWS[0]:
         st.header("📊 Volume & Distribution View")
         st.markdown("**Analyze ticket volumes and distribution patterns**")
         st.markdown("---")
 
+        with profiler.section('aggregate', 'volume'):
+            volume = view_data('volume', prepare_volume_view)
+
         # Trend of ticket volumes by month
         st.subheader("📈 Ticket Volume Trend by Month")
 
-        monthly_volume = filtered_tickets.groupby(['year_month', 'hub']).size().reset_index(name='ticket_count')
+        monthly_volume = volume['monthly_volume']
 
         fig = px.line(
             monthly_volume,
@@ -248,7 +743,7 @@ def main():
             title="Monthly Ticket Trend by Hub"
         )
         fig.update_layout(height=400, hovermode='x unified')
-        st.plotly_chart(fig, use_container_width=True)
+        profiler.plotly_chart(fig, use_container_width=True)
 
         st.markdown("---")
 
@@ -257,7 +752,7 @@ def main():
 
         with col1:
             st.subheader("🏢 Breakdown by Hub")
-            hub_dist = filtered_tickets['hub'].value_counts()
+            hub_dist = volume['hub_dist']
 
             fig = px.pie(
                 values=hub_dist.values,
@@ -268,11 +763,11 @@ def main():
             )
             fig.update_traces(textposition='inside', textinfo='percent+label+value')
             fig.update_layout(height=350)
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
         with col2:
             st.subheader("💼 Breakdown by Function")
-            func_dist = filtered_tickets['function'].value_counts()
+            func_dist = volume['func_dist']
 
             fig = px.pie(
                 values=func_dist.values,
@@ -283,7 +778,7 @@ def main():
             )
             fig.update_traces(textposition='inside', textinfo='percent+label+value')
             fig.update_layout(height=350)
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
         st.markdown("---")
 
@@ -291,7 +786,7 @@ def main():
 
         with col1:
             st.subheader("📂 Top 10 Categories")
-            top_categories = filtered_tickets['category'].value_counts().head(10)
+            top_categories = volume['top_categories']
 
             fig = px.bar(
                 y=top_categories.index,
@@ -303,11 +798,11 @@ def main():
                 color_continuous_scale='Blues'
             )
             fig.update_layout(height=400, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
         with col2:
             st.subheader("📞 Distribution by Channel")
-            channel_dist = filtered_tickets['channel'].value_counts()
+            channel_dist = volume['channel_dist']
 
             fig = px.bar(
                 x=channel_dist.index,
@@ -318,13 +813,13 @@ def main():
                 color_discrete_sequence=px.colors.qualitative.Set2
             )
             fig.update_layout(height=400, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
         st.markdown("---")
 
         # Priority breakdown
         st.subheader("🚨 Ticket Priority Distribution")
-        priority_by_month = filtered_tickets.groupby(['year_month', 'priority']).size().reset_index(name='count')
+        priority_by_month = volume['priority_by_month']
 
         fig = px.bar(
             priority_by_month,
@@ -341,13 +836,67 @@ def main():
             }
         )
         fig.update_layout(height=400, barmode='stack')
-        st.plotly_chart(fig, use_container_width=True)
+        profiler.plotly_chart(fig, use_container_width=True)
+
+        st.markdown("---")
+
+        # Backlog over time, from the event sweep in backlog_timeline
+        st.subheader("📦 Backlog Over Time")
+
+        try:
+            with profiler.section('load', 'backlog_timeline'):
+                timeline = load_backlog_timeline(
+                    artifact_fingerprint(manifest, CSV_ARTIFACTS['backlog_timeline']), _manifest=manifest
+                )
+        except ManifestMismatchError:
+            st.info("Output files are being regenerated by main.py. Refresh in a moment.")
+            st.stop()
+
+        if timeline is None:
+            st.info("Backlog timeline not found. Please run main.py to build it.")
+        else:
+            with profiler.section('aggregate', 'backlog'):
+                backlog_daily = backlog_series(timeline, selected_hub, selected_function, filter_start, filter_end)
+                backlog_priority = backlog_series(
+                    timeline, selected_hub, selected_function, filter_start, filter_end, by='priority'
+                )
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                fig = px.area(
+                    backlog_daily.rename(columns=AGING_LABELS),
+                    x='date',
+                    y=[AGING_LABELS[column] for column in AGING_COLUMNS],
+                    labels={'date': 'Date', 'value': 'Open Tickets', 'variable': 'Age'},
+                    title="Open Tickets at End of Day by Age"
+                )
+                fig.update_layout(height=400)
+                profiler.plotly_chart(fig, use_container_width=True)
+
+            with col2:
+                fig = px.line(
+                    backlog_priority,
+                    x='date',
+                    y='open_count',
+                    color='priority',
+                    labels={'date': 'Date', 'open_count': 'Open Tickets', 'priority': 'Priority'},
+                    title="Open Tickets at End of Day by Priority",
+                    color_discrete_map={
+                        'Critical': '#d62728',
+                        'High': '#ff7f0e',
+                        'Medium': '#1f77b4',
+                        'Low': '#2ca02c'
+                    }
+                )
+                fig.update_layout(height=400)
+                profiler.plotly_chart(fig, use_container_width=True)
 
     # ========================================================================
     # TAB 2: SLA & RESOLUTION PERFORMANCE VIEW
     # ========================================================================
 
-    with tab2:
+    if active_view == VIEWS[1]:
         st.header("⏱️ SLA & Resolution Performance View")
         st.markdown("**Monitor SLA compliance and resolution efficiency**")
         st.markdown("---")
@@ -357,9 +906,7 @@ def main():
 
         with col1:
             st.subheader("✅ SLA Compliance Trend")
-            sla_trend = filtered_kpis.groupby('year_month').agg({
-                'sla_compliance_pct': 'mean'
-            }).reset_index()
+            sla_trend = monthly_kpis[['year_month', 'sla_compliance_pct']]
 
             fig = px.line(
                 sla_trend,
@@ -373,13 +920,11 @@ def main():
                          annotation_text="Target: 80%", annotation_position="right")
             fig.update_layout(height=350)
             fig.update_traces(line_color='#1f77b4', line_width=3)
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
         with col2:
             st.subheader("⏱️ Avg Resolution Time Trend")
-            resolution_trend = filtered_kpis.groupby('year_month').agg({
-                'avg_resolution_time_hours': 'mean'
-            }).reset_index()
+            resolution_trend = monthly_kpis[['year_month', 'avg_resolution_time_hours']]
 
             fig = px.line(
                 resolution_trend,
@@ -391,7 +936,61 @@ def main():
             )
             fig.update_layout(height=350)
             fig.update_traces(line_color='#ff7f0e', line_width=3)
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
+
+        st.markdown("---")
+
+        # Resolution time percentiles, merged from per-cell sketches (see quantile_sketch)
+        st.subheader("📐 Resolution Time Percentiles")
+
+        try:
+            with profiler.section('load', 'resolution_sketches'):
+                sketches = load_resolution_sketches(
+                    artifact_fingerprint(manifest, CSV_ARTIFACTS['sketches']), _manifest=manifest
+                )
+        except ManifestMismatchError:
+            st.info("Output files are being regenerated by main.py. Refresh in a moment.")
+            st.stop()
+
+        if sketches is None:
+            st.info("Resolution-time sketches not found. Please run main.py to build them.")
+        else:
+            with profiler.section('aggregate', 'resolution_percentiles'):
+                overall_pct = sketch_quantiles(sketches, hub=selected_hub, function=selected_function).iloc[0]
+                monthly_pct = sketch_quantiles(sketches, hub=selected_hub, function=selected_function, by='year_month')
+                priority_pct = sketch_quantiles(sketches, hub=selected_hub, function=selected_function, by='priority')
+
+            col1, col2, col3 = st.columns(3)
+            for col, column, label in [(col1, 'p50', "Median (P50)"), (col2, 'p90', "P90"), (col3, 'p99', "P99")]:
+                with col:
+                    value = overall_pct[column]
+                    st.metric(f"⏱️ {label} Resolution", "-" if pd.isna(value) else f"{value:.1f}h")
+            st.caption("All months for the selected hub and function; each value is within 1% of the exact percentile.")
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                fig = px.line(
+                    monthly_pct,
+                    x='year_month',
+                    y=['p50', 'p90', 'p99'],
+                    markers=True,
+                    labels={'year_month': 'Month', 'value': 'Resolution Time (hours)', 'variable': 'Percentile'},
+                    title="Resolution Time Percentiles Over Time"
+                )
+                fig.update_layout(height=350)
+                profiler.plotly_chart(fig, use_container_width=True)
+
+            with col2:
+                st.markdown("**Resolution Time by Priority (hours):**")
+                st.dataframe(
+                    priority_pct.rename(columns={
+                        'priority': 'Priority', 'resolved': 'Resolved Tickets',
+                        'p50': 'P50', 'p90': 'P90', 'p99': 'P99'
+                    }).round(1),
+                    use_container_width=True,
+                    hide_index=True
+                )
 
         st.markdown("---")
 
@@ -399,11 +998,7 @@ def main():
         st.subheader("🏢 Hub A vs Hub B Comparison")
 
         if selected_hub == 'All':
-            hub_comparison = filtered_kpis.groupby('hub').agg({
-                'sla_compliance_pct': 'mean',
-                'avg_resolution_time_hours': 'mean',
-                'total_tickets': 'sum'
-            }).round(2).reset_index()
+            hub_comparison = hub_kpis[['hub', 'sla_compliance_pct', 'avg_resolution_time_hours', 'total_tickets']]
 
             col1, col2, col3 = st.columns(3)
 
@@ -413,7 +1008,7 @@ def main():
                     go.Bar(name='Hub B', x=['SLA %'], y=[hub_comparison[hub_comparison['hub']=='B']['sla_compliance_pct'].values[0]], marker_color='#ff7f0e')
                 ])
                 fig.update_layout(title="SLA Compliance Comparison", height=300, showlegend=True)
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             with col2:
                 fig = go.Figure(data=[
@@ -421,7 +1016,7 @@ def main():
                     go.Bar(name='Hub B', x=['Resolution Time'], y=[hub_comparison[hub_comparison['hub']=='B']['avg_resolution_time_hours'].values[0]], marker_color='#ff7f0e')
                 ])
                 fig.update_layout(title="Avg Resolution Time (hours)", height=300, showlegend=True)
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             with col3:
                 fig = go.Figure(data=[
@@ -429,7 +1024,7 @@ def main():
                     go.Bar(name='Hub B', x=['Tickets'], y=[hub_comparison[hub_comparison['hub']=='B']['total_tickets'].values[0]], marker_color='#ff7f0e')
                 ])
                 fig.update_layout(title="Total Tickets Processed", height=300, showlegend=True)
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
         else:
             st.info(f"Viewing data for Hub {selected_hub} only. Select 'All' in sidebar to see hub comparison.")
 
@@ -438,15 +1033,10 @@ def main():
         # Top 5 categories with worst SLA % or highest resolution time
         st.subheader("🔴 Top 5 Categories with Worst SLA Performance")
 
-        resolved_tickets = filtered_tickets[filtered_tickets['sla_met'].notna()].copy()
-        category_sla = resolved_tickets.groupby('category').agg({
-            'sla_met': lambda x: (x.sum() / len(x) * 100),
-            'resolution_time_hours': 'mean',
-            'ticket_id': 'count'
-        }).round(2)
-        category_sla.columns = ['SLA Compliance %', 'Avg Resolution Time (hrs)', 'Ticket Count']
-        category_sla = category_sla[category_sla['Ticket Count'] >= 3]  # Only categories with 3+ tickets
-        worst_sla = category_sla.nsmallest(5, 'SLA Compliance %')
+        with profiler.section('aggregate', 'sla'):
+            sla_view = view_data('sla', prepare_sla_view)
+        category_sla = sla_view['category_sla']
+        worst_sla = sla_view['worst_sla']
 
         col1, col2 = st.columns(2)
 
@@ -461,10 +1051,10 @@ def main():
                 color_continuous_scale='Reds_r'
             )
             fig.update_layout(height=350, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
         with col2:
-            highest_resolution = category_sla.nlargest(5, 'Avg Resolution Time (hrs)')
+            highest_resolution = sla_view['highest_resolution']
 
             fig = px.bar(
                 x=highest_resolution['Avg Resolution Time (hrs)'],
@@ -476,7 +1066,7 @@ def main():
                 color_continuous_scale='Oranges'
             )
             fig.update_layout(height=350, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
         # Detailed table
         st.subheader("📊 Category Performance Details")
@@ -490,15 +1080,16 @@ def main():
     # TAB 3: CSAT VIEW
     # ========================================================================
 
-    with tab3:
+    if active_view == VIEWS[2]:
         st.header("⭐ CSAT (Customer Satisfaction) Analysis")
         st.markdown("**Monitor customer satisfaction trends and patterns**")
         st.markdown("---")
 
-        # Filter for tickets with CSAT scores
-        csat_tickets = filtered_tickets[filtered_tickets['csat_has_score']].copy()
+        # Aggregates over the tickets with CSAT scores (None if there are none)
+        with profiler.section('aggregate', 'csat'):
+            csat = view_data('csat', prepare_csat_view)
 
-        if len(csat_tickets) == 0:
+        if csat is None:
             st.warning("No CSAT data available for the selected filters.")
         else:
             # Avg CSAT per hub and per function
@@ -506,7 +1097,7 @@ def main():
 
             with col1:
                 st.subheader("🏢 Average CSAT by Hub")
-                csat_by_hub = csat_tickets.groupby('hub')['csat_score'].mean().round(2)
+                csat_by_hub = csat['csat_by_hub']
 
                 fig = go.Figure(data=[
                     go.Bar(
@@ -526,11 +1117,11 @@ def main():
                 )
                 fig.add_hline(y=4, line_dash="dash", line_color="green",
                              annotation_text="Target: 4.0", annotation_position="right")
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             with col2:
                 st.subheader("💼 Average CSAT by Function")
-                csat_by_function = csat_tickets.groupby('function')['csat_score'].mean().round(2)
+                csat_by_function = csat['csat_by_function']
 
                 fig = go.Figure(data=[
                     go.Bar(
@@ -550,16 +1141,14 @@ def main():
                 )
                 fig.add_hline(y=4, line_dash="dash", line_color="green",
                              annotation_text="Target: 4.0", annotation_position="right")
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             st.markdown("---")
 
             # Trend of CSAT over months
             st.subheader("📈 CSAT Trend Over Time")
 
-            csat_trend = csat_tickets.groupby(['year_month', 'hub']).agg({
-                'csat_score': 'mean'
-            }).reset_index()
+            csat_trend = csat['csat_trend']
 
             fig = px.line(
                 csat_trend,
@@ -574,7 +1163,7 @@ def main():
             fig.add_hline(y=4, line_dash="dash", line_color="green",
                          annotation_text="Target: 4.0", annotation_position="right")
             fig.update_layout(height=400, yaxis_range=[0, 5], hovermode='x unified')
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
             st.markdown("---")
 
@@ -582,7 +1171,7 @@ def main():
 
             with col1:
                 st.subheader("📊 CSAT Score Distribution")
-                csat_dist = csat_tickets['csat_score'].value_counts().sort_index()
+                csat_dist = csat['csat_dist']
 
                 fig = px.bar(
                     x=csat_dist.index,
@@ -593,14 +1182,14 @@ def main():
                     color_continuous_scale='RdYlGn'
                 )
                 fig.update_layout(height=350, showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             with col2:
                 st.subheader("🎯 CSAT Categories")
 
-                high_csat = (csat_tickets['csat_score'] >= 4).sum()
-                medium_csat = ((csat_tickets['csat_score'] == 3)).sum()
-                low_csat = (csat_tickets['csat_score'] <= 2).sum()
+                high_csat = csat['high_csat']
+                medium_csat = csat['medium_csat']
+                low_csat = csat['low_csat']
 
                 fig = go.Figure(data=[go.Pie(
                     labels=['High (4-5)', 'Medium (3)', 'Low (1-2)'],
@@ -610,16 +1199,11 @@ def main():
                 )])
                 fig.update_layout(title="CSAT Score Categories", height=350)
                 fig.update_traces(textposition='inside', textinfo='percent+label+value')
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             # CSAT by category
             st.subheader("📂 CSAT by Category (Top 10)")
-            csat_by_category = csat_tickets.groupby('category').agg({
-                'csat_score': ['mean', 'count']
-            }).round(2)
-            csat_by_category.columns = ['Avg CSAT', 'Response Count']
-            csat_by_category = csat_by_category[csat_by_category['Response Count'] >= 3]
-            top_10_categories = csat_by_category.nlargest(10, 'Avg CSAT')
+            top_10_categories = csat['top_10_categories']
 
             fig = px.bar(
                 y=top_10_categories.index,
@@ -631,20 +1215,21 @@ def main():
                 color_continuous_scale='RdYlGn'
             )
             fig.update_layout(height=400, showlegend=False)
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
     # ========================================================================
     # TAB 4: MANAGEMENT SUMMARY REPORT
     # ========================================================================
 
-    with tab4:
+    if active_view == VIEWS[3]:
         st.header("📋 Management Summary Report")
         st.markdown("**Executive summary and key insights**")
         st.markdown("---")
 
-        # Get last month data
-        last_month = filtered_tickets['year_month'].max()
-        last_month_tickets = filtered_tickets[filtered_tickets['year_month'] == last_month]
+        # Last month KPIs and insight inputs
+        with profiler.section('aggregate', 'management'):
+            summary = view_data('management', prepare_management_view)
+        last_month = summary['last_month']
 
         st.subheader(f"📅 Summary for: {last_month}")
 
@@ -654,26 +1239,23 @@ def main():
         col1, col2, col3, col4, col5 = st.columns(5)
 
         with col1:
-            total = len(last_month_tickets)
+            total = summary['total']
             st.metric("Total Tickets", f"{total}")
 
         with col2:
-            backlog = last_month_tickets['is_backlog'].sum()
+            backlog = summary['backlog']
             st.metric("Backlog", f"{backlog}", f"{backlog/total*100:.1f}%" if total > 0 else "0%")
 
         with col3:
-            resolved = last_month_tickets[last_month_tickets['sla_met'].notna()]
-            sla = (resolved['sla_met'].sum() / len(resolved) * 100) if len(resolved) > 0 else 0
+            sla = summary['sla']
             st.metric("SLA Compliance", f"{sla:.1f}%")
 
         with col4:
-            with_csat = last_month_tickets[last_month_tickets['csat_has_score']]
-            avg_csat = with_csat['csat_score'].mean() if len(with_csat) > 0 else 0
+            avg_csat = summary['avg_csat']
             st.metric("Avg CSAT", f"{avg_csat:.2f}/5")
 
         with col5:
-            resolved_tickets = last_month_tickets[last_month_tickets['resolution_time_hours'].notna()]
-            avg_res = resolved_tickets['resolution_time_hours'].mean() if len(resolved_tickets) > 0 else 0
+            avg_res = summary['avg_res']
             st.metric("Avg Resolution", f"{avg_res:.1f}h")
 
         st.markdown("---")
@@ -724,13 +1306,13 @@ def main():
                 })
 
             # 5. Check worst categories
-            if len(last_month_tickets) > 0:
-                worst_category = last_month_tickets['category'].value_counts().idxmax()
-                worst_count = last_month_tickets['category'].value_counts().max()
-                if worst_count > len(last_month_tickets) * 0.15:
+            if total > 0:
+                worst_category = summary['worst_category']
+                worst_count = summary['worst_count']
+                if worst_count > total * 0.15:
                     improvements.append({
                         'area': f'📂 High Volume Category: {worst_category}',
-                        'current': f'{worst_count} tickets ({worst_count/len(last_month_tickets)*100:.1f}%)',
+                        'current': f'{worst_count} tickets ({worst_count/total*100:.1f}%)',
                         'target': '<15% per category',
                         'detail': f'{worst_category} represents unusually high volume. Investigate root causes.'
                     })
@@ -786,25 +1368,19 @@ def main():
                 })
 
             # 5. Volume handling
-            prev_month = filtered_tickets['year_month'].unique()
-            if len(prev_month) >= 2:
-                prev_month_sorted = sorted(prev_month)
-                if len(prev_month_sorted) >= 2:
-                    prev = prev_month_sorted[-2]
-                    prev_total = len(filtered_tickets[filtered_tickets['year_month'] == prev])
-                    if total > prev_total:
-                        growth = ((total - prev_total) / prev_total * 100)
-                        highlights.append({
-                            'area': f'📈 Volume Handled ({growth:.1f}% increase)',
-                            'value': f'{total} tickets',
-                            'detail': f'Successfully handled {growth:.1f}% more tickets compared to previous month.'
-                        })
+            prev_total = summary['prev_total']
+            if prev_total is not None:
+                if total > prev_total:
+                    growth = ((total - prev_total) / prev_total * 100)
+                    highlights.append({
+                        'area': f'📈 Volume Handled ({growth:.1f}% increase)',
+                        'value': f'{total} tickets',
+                        'detail': f'Successfully handled {growth:.1f}% more tickets compared to previous month.'
+                    })
 
             # 6. Best performing hub/function
             if selected_hub == 'All':
-                hub_sla = last_month_tickets.groupby('hub').apply(
-                    lambda x: (x['sla_met'].sum() / x['sla_met'].notna().sum() * 100) if x['sla_met'].notna().sum() > 0 else 0
-                )
+                hub_sla = summary['hub_sla']
                 if len(hub_sla) > 0:
                     best_hub = hub_sla.idxmax()
                     best_sla = hub_sla.max()
@@ -837,12 +1413,8 @@ def main():
 
         with col1:
             st.markdown("#### 🏆 Top Performing Categories (by SLA)")
-            resolved_last_month = last_month_tickets[last_month_tickets['sla_met'].notna()]
-            if len(resolved_last_month) > 0:
-                cat_sla = resolved_last_month.groupby('category').apply(
-                    lambda x: (x['sla_met'].sum() / len(x) * 100)
-                ).round(2).sort_values(ascending=False).head(5)
-
+            cat_sla = summary['cat_sla']
+            if cat_sla is not None:
                 for cat, sla_val in cat_sla.items():
                     st.write(f"• **{cat}**: {sla_val:.1f}% SLA")
             else:
@@ -910,11 +1482,36 @@ def main():
             mime='text/csv'
         )
 
+        # The full pack is built in the background; later reruns pick up the result
+        if manifest is not None and XLSX_AVAILABLE:
+            pack_key = (str(last_month), selected_hub, selected_function, manifest['generation'])
+            if st.button("📊 Build Excel Management Pack"):
+                st.session_state['pack_key'] = pack_key
+
+            if st.session_state.get('pack_key') == pack_key:
+                pack = build_management_pack(*pack_key)
+                if not pack.done():
+                    st.info("⏳ Building the Excel management pack in the background - "
+                            "interact with the dashboard or press the button again to check on it.")
+                elif pack.exception() is not None:
+                    st.error(f"Excel pack failed: {pack.exception()}")
+                elif str(last_month) not in pack.result()['paths']:
+                    st.warning(f"No ticket details for {last_month} in the pipeline outputs.")
+                else:
+                    path = pack.result()['paths'][str(last_month)]
+                    with open(path, 'rb') as f:
+                        st.download_button(
+                            label="📥 Download Management Pack (Excel)",
+                            data=f.read(),
+                            file_name=os.path.basename(path),
+                            mime='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+                        )
+
     # ========================================================================
     # TAB 5: DETAILED KPI TABLE
     # ========================================================================
 
-    with tab5:
+    if active_view == VIEWS[4]:
         st.header("📈 Detailed KPI Table")
         st.markdown("**Comprehensive KPI metrics for each Month / Hub / Function**")
         st.markdown("---")
@@ -975,24 +1572,18 @@ def main():
             st.markdown("**By Channel:**")
 
             # Channel summary
-            channel_summary = filtered_kpis.groupby('year_month').agg({
-                'tickets_email': 'sum',
-                'tickets_portal': 'sum',
-                'tickets_phone': 'sum',
-                'tickets_chat': 'sum'
-            }).round(0)
+            channel_summary = monthly_kpis.set_index('year_month')[[
+                'tickets_email', 'tickets_portal', 'tickets_phone', 'tickets_chat'
+            ]]
 
             st.dataframe(channel_summary, use_container_width=True)
 
             st.markdown("**By Priority:**")
 
             # Priority summary
-            priority_summary = filtered_kpis.groupby('year_month').agg({
-                'tickets_critical': 'sum',
-                'tickets_high': 'sum',
-                'tickets_medium': 'sum',
-                'tickets_low': 'sum'
-            }).round(0)
+            priority_summary = monthly_kpis.set_index('year_month')[[
+                'tickets_critical', 'tickets_high', 'tickets_medium', 'tickets_low'
+            ]]
 
             st.dataframe(priority_summary, use_container_width=True)
 
@@ -1001,12 +1592,9 @@ def main():
             st.markdown("**Monthly Performance:**")
 
             # SLA and resolution summary
-            performance_summary = filtered_kpis.groupby('year_month').agg({
-                'sla_compliance_pct': 'mean',
-                'avg_resolution_time_hours': 'mean',
-                'backlog_count': 'sum',
-                'reopen_rate_pct': 'mean'
-            }).round(2)
+            performance_summary = monthly_kpis.set_index('year_month')[[
+                'sla_compliance_pct', 'avg_resolution_time_hours', 'backlog_count', 'reopen_rate_pct'
+            ]]
 
             performance_summary.columns = ['SLA Compliance %', 'Avg Resolution (hrs)', 'Total Backlog', 'Reopen Rate %']
 
@@ -1015,12 +1603,9 @@ def main():
             st.markdown("**CSAT Metrics:**")
 
             # CSAT summary
-            csat_summary = filtered_kpis.groupby('year_month').agg({
-                'csat_avg_score': 'mean',
-                'csat_responses': 'sum',
-                'csat_high_pct': 'mean',
-                'csat_low_pct': 'mean'
-            }).round(2)
+            csat_summary = monthly_kpis.set_index('year_month')[[
+                'csat_avg_score', 'csat_responses', 'csat_high_pct', 'csat_low_pct'
+            ]]
 
             csat_summary.columns = ['Avg CSAT', 'Total Responses', 'High CSAT %', 'Low CSAT %']
 
@@ -1032,18 +1617,11 @@ def main():
         st.subheader("🏢 Hub-Wise KPI Comparison")
 
         if selected_hub == 'All':
-            hub_comparison_detailed = filtered_kpis.groupby('hub').agg({
-                'total_tickets': 'sum',
-                'sla_compliance_pct': 'mean',
-                'avg_resolution_time_hours': 'mean',
-                'backlog_count': 'sum',
-                'reopen_rate_pct': 'mean',
-                'csat_avg_score': 'mean',
-                'tickets_critical': 'sum',
-                'tickets_high': 'sum',
-                'tickets_medium': 'sum',
-                'tickets_low': 'sum'
-            }).round(2)
+            hub_comparison_detailed = hub_kpis.set_index('hub')[[
+                'total_tickets', 'sla_compliance_pct', 'avg_resolution_time_hours',
+                'backlog_count', 'reopen_rate_pct', 'csat_avg_score',
+                'tickets_critical', 'tickets_high', 'tickets_medium', 'tickets_low'
+            ]]
 
             hub_comparison_detailed.columns = [
                 'Total Tickets', 'SLA %', 'Avg Resolution (hrs)',
@@ -1084,7 +1662,7 @@ def main():
                     barmode='group',
                     height=350
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             with col2:
                 # Priority distribution by hub
@@ -1112,7 +1690,7 @@ def main():
                     barmode='group',
                     height=350
                 )
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
         else:
             st.info(f"Viewing data for Hub {selected_hub} only. Select 'All' in sidebar to see hub comparison.")
 
@@ -1122,14 +1700,10 @@ def main():
         st.subheader("💼 Function-Wise KPI Comparison")
 
         if selected_function == 'All':
-            function_comparison = filtered_kpis.groupby('function').agg({
-                'total_tickets': 'sum',
-                'sla_compliance_pct': 'mean',
-                'avg_resolution_time_hours': 'mean',
-                'backlog_count': 'sum',
-                'reopen_rate_pct': 'mean',
-                'csat_avg_score': 'mean'
-            }).round(2)
+            function_comparison = function_kpis.set_index('function')[[
+                'total_tickets', 'sla_compliance_pct', 'avg_resolution_time_hours',
+                'backlog_count', 'reopen_rate_pct', 'csat_avg_score'
+            ]]
 
             function_comparison.columns = [
                 'Total Tickets', 'SLA %', 'Avg Resolution (hrs)',
@@ -1153,7 +1727,7 @@ def main():
                 yaxis_title="Number of Tickets",
                 height=350
             )
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
         else:
             st.info(f"Viewing data for {selected_function} function only. Select 'All' in sidebar to see function comparison.")
 
@@ -1162,12 +1736,9 @@ def main():
         # Month-over-month trends
         st.subheader("📈 Month-over-Month Trends")
 
-        monthly_trends = filtered_kpis.groupby('year_month').agg({
-            'total_tickets': 'sum',
-            'sla_compliance_pct': 'mean',
-            'avg_resolution_time_hours': 'mean',
-            'csat_avg_score': 'mean'
-        }).round(2)
+        monthly_trends = monthly_kpis.set_index('year_month')[[
+            'total_tickets', 'sla_compliance_pct', 'avg_resolution_time_hours', 'csat_avg_score'
+        ]]
 
         monthly_trends.columns = ['Total Tickets', 'SLA %', 'Avg Resolution (hrs)', 'Avg CSAT']
 
@@ -1193,7 +1764,7 @@ def main():
             )
             fig.add_hline(y=80, line_dash="dash", line_color="green", annotation_text="Target: 80%")
             fig.update_layout(height=300)
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
         with col2:
             fig = px.line(
@@ -1206,7 +1777,7 @@ def main():
             )
             fig.add_hline(y=4, line_dash="dash", line_color="green", annotation_text="Target: 4.0")
             fig.update_layout(height=300, yaxis_range=[0, 5])
-            st.plotly_chart(fig, use_container_width=True)
+            profiler.plotly_chart(fig, use_container_width=True)
 
         st.markdown("---")
 
@@ -1215,29 +1786,18 @@ def main():
         st.markdown("**Tickets per Agent and Work Utilization**")
 
         if agents_df is not None and len(agents_df) > 0:
-            # Filter agents based on sidebar selections
-            filtered_agents = agents_df.copy()
-
-            if selected_hub != 'All':
-                filtered_agents = filtered_agents[filtered_agents['hub'] == selected_hub]
-
-            if selected_function != 'All':
-                filtered_agents = filtered_agents[filtered_agents['function'] == selected_function]
+            # Agents matching the sidebar selections, with their summaries
+            with profiler.section('aggregate', 'agents'):
+                agent_view = view_cache.memoize(
+                    ('agents', selected_hub, selected_function),
+                    prepare_agent_view, agents_df, selected_hub, selected_function
+                )
+            filtered_agents = agent_view['filtered_agents']
 
             # Agent KPI Table
             st.markdown("**📊 Agent Performance by Month:**")
 
-            agent_kpi_display = filtered_agents[[
-                'month', 'agent_id', 'hub', 'function',
-                'tickets_handled', 'total_working_hours', 'ticket_work_hours',
-                'utilization_pct', 'avg_hours_per_ticket'
-            ]].copy()
-
-            agent_kpi_display.columns = [
-                'Month', 'Agent ID', 'Hub', 'Function',
-                'Tickets Handled', 'Total Hours', 'Ticket Work Hours',
-                'Utilization %', 'Avg Hours/Ticket'
-            ]
+            agent_kpi_display = agent_view['agent_kpi_display']
 
             st.dataframe(agent_kpi_display, use_container_width=True, height=400)
 
@@ -1258,54 +1818,44 @@ def main():
             with col1:
                 st.markdown("**📊 Tickets per Agent (Monthly Average):**")
 
-                agent_monthly_avg = filtered_agents.groupby('agent_id').agg({
-                    'tickets_handled': 'mean',
-                    'hub': 'first',
-                    'function': 'first'
-                }).round(2).sort_values('tickets_handled', ascending=False)
-
-                agent_monthly_avg.columns = ['Avg Tickets/Month', 'Hub', 'Function']
+                agent_monthly_avg = agent_view['agent_monthly_avg']
 
                 st.dataframe(agent_monthly_avg, use_container_width=True)
 
                 # Visualization
+                agent_monthly_bars = agent_view['agent_monthly_bars']
                 fig = px.bar(
-                    x=agent_monthly_avg.index,
-                    y=agent_monthly_avg['Avg Tickets/Month'],
+                    x=agent_monthly_bars.index,
+                    y=agent_monthly_bars,
                     labels={'x': 'Agent ID', 'y': 'Average Tickets per Month'},
                     title="Average Tickets Handled per Agent per Month",
-                    color=agent_monthly_avg['Avg Tickets/Month'],
+                    color=agent_monthly_bars,
                     color_continuous_scale='Blues'
                 )
                 fig.update_layout(height=350, showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             with col2:
                 st.markdown("**⚡ Ticket Work Utilization %:**")
 
-                agent_util_avg = filtered_agents.groupby('agent_id').agg({
-                    'utilization_pct': 'mean',
-                    'hub': 'first',
-                    'function': 'first'
-                }).round(2).sort_values('utilization_pct', ascending=False)
-
-                agent_util_avg.columns = ['Avg Utilization %', 'Hub', 'Function']
+                agent_util_avg = agent_view['agent_util_avg']
 
                 st.dataframe(agent_util_avg, use_container_width=True)
 
                 # Visualization
+                agent_util_bars = agent_view['agent_util_bars']
                 fig = px.bar(
-                    x=agent_util_avg.index,
-                    y=agent_util_avg['Avg Utilization %'],
+                    x=agent_util_bars.index,
+                    y=agent_util_bars,
                     labels={'x': 'Agent ID', 'y': 'Average Utilization %'},
                     title="Average Work Utilization % per Agent",
-                    color=agent_util_avg['Avg Utilization %'],
+                    color=agent_util_bars,
                     color_continuous_scale='Oranges'
                 )
                 fig.add_hline(y=100, line_dash="dash", line_color="red",
                              annotation_text="100% Capacity", annotation_position="right")
                 fig.update_layout(height=350, showlegend=False)
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             st.markdown("---")
 
@@ -1316,54 +1866,46 @@ def main():
 
             with col1:
                 # Tickets handled trend
-                agent_monthly_trend = filtered_agents.groupby(['month', 'agent_id']).agg({
-                    'tickets_handled': 'sum'
-                }).reset_index()
+                agent_monthly_lines = agent_view['agent_monthly_lines']
 
                 fig = px.line(
-                    agent_monthly_trend,
+                    agent_monthly_lines,
                     x='month',
                     y='tickets_handled',
                     color='agent_id',
                     markers=True,
+                    render_mode='webgl' if len(agent_monthly_lines) > WEBGL_THRESHOLD else 'svg',
                     labels={'month': 'Month', 'tickets_handled': 'Tickets Handled', 'agent_id': 'Agent'},
                     title="Tickets Handled per Agent Over Time"
                 )
                 fig.update_layout(height=350)
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             with col2:
                 # Utilization trend
-                agent_util_trend = filtered_agents.groupby(['month', 'agent_id']).agg({
-                    'utilization_pct': 'mean'
-                }).reset_index()
+                agent_util_lines = agent_view['agent_util_lines']
 
                 fig = px.line(
-                    agent_util_trend,
+                    agent_util_lines,
                     x='month',
                     y='utilization_pct',
                     color='agent_id',
                     markers=True,
+                    render_mode='webgl' if len(agent_util_lines) > WEBGL_THRESHOLD else 'svg',
                     labels={'month': 'Month', 'utilization_pct': 'Utilization %', 'agent_id': 'Agent'},
                     title="Agent Utilization % Over Time"
                 )
                 fig.add_hline(y=100, line_dash="dash", line_color="red",
                              annotation_text="100%", annotation_position="right")
                 fig.update_layout(height=350)
-                st.plotly_chart(fig, use_container_width=True)
+                profiler.plotly_chart(fig, use_container_width=True)
 
             # Agent comparison by hub and function
             if selected_hub == 'All' and selected_function == 'All':
                 st.markdown("---")
                 st.markdown("**🏢 Agent Metrics by Hub & Function:**")
 
-                agent_hub_function = filtered_agents.groupby(['hub', 'function']).agg({
-                    'tickets_handled': 'sum',
-                    'utilization_pct': 'mean',
-                    'agent_id': 'nunique'
-                }).round(2).reset_index()
-
-                agent_hub_function.columns = ['Hub', 'Function', 'Total Tickets', 'Avg Utilization %', 'Agent Count']
+                agent_hub_function = agent_view['agent_hub_function']
 
                 st.dataframe(agent_hub_function, use_container_width=True)
 
@@ -1380,7 +1922,7 @@ def main():
                         color_discrete_map={'A': '#1f77b4', 'B': '#ff7f0e'}
                     )
                     fig.update_layout(height=300)
-                    st.plotly_chart(fig, use_container_width=True)
+                    profiler.plotly_chart(fig, use_container_width=True)
 
                 with col2:
                     fig = px.bar(
@@ -1393,7 +1935,7 @@ def main():
                         color_discrete_map={'A': '#1f77b4', 'B': '#ff7f0e'}
                     )
                     fig.update_layout(height=300)
-                    st.plotly_chart(fig, use_container_width=True)
+                    profiler.plotly_chart(fig, use_container_width=True)
 
             # Agent efficiency metrics
             st.markdown("---")
@@ -1434,21 +1976,21 @@ def main():
 
         with col1:
             st.markdown("**Overall Performance**")
-            st.metric("Total Tickets Processed", f"{filtered_kpis['total_tickets'].sum():,.0f}")
-            st.metric("Average SLA Compliance", f"{filtered_kpis['sla_compliance_pct'].mean():.1f}%")
-            st.metric("Total Backlog", f"{filtered_kpis['backlog_count'].sum():,.0f}")
+            st.metric("Total Tickets Processed", f"{overall_kpis['total_tickets']:,.0f}")
+            st.metric("Average SLA Compliance", f"{overall_kpis['sla_compliance_pct']:.1f}%")
+            st.metric("Total Backlog", f"{overall_kpis['backlog_count']:,.0f}")
 
         with col2:
             st.markdown("**Resolution Metrics**")
-            st.metric("Avg Resolution Time", f"{filtered_kpis['avg_resolution_time_hours'].mean():.1f} hrs")
-            st.metric("Avg Reopen Rate", f"{filtered_kpis['reopen_rate_pct'].mean():.1f}%")
-            st.metric("Total Reopened", f"{filtered_kpis['reopen_count'].sum():,.0f}")
+            st.metric("Avg Resolution Time", f"{overall_kpis['avg_resolution_time_hours']:.1f} hrs")
+            st.metric("Avg Reopen Rate", f"{overall_kpis['reopen_rate_pct']:.1f}%")
+            st.metric("Total Reopened", f"{overall_kpis['reopen_count']:,.0f}")
 
         with col3:
             st.markdown("**Customer Satisfaction**")
-            st.metric("Average CSAT Score", f"{filtered_kpis['csat_avg_score'].mean():.2f}/5")
-            st.metric("Total CSAT Responses", f"{filtered_kpis['csat_responses'].sum():,.0f}")
-            st.metric("High CSAT Rate", f"{filtered_kpis['csat_high_pct'].mean():.1f}%")
+            st.metric("Average CSAT Score", f"{overall_kpis['csat_avg_score']:.2f}/5")
+            st.metric("Total CSAT Responses", f"{overall_kpis['csat_responses']:,.0f}")
+            st.metric("High CSAT Rate", f"{overall_kpis['csat_high_pct']:.1f}%")
 
     # ========================================================================
     # FOOTER
@@ -1458,11 +2000,14 @@ def main():
     st.markdown(f"""
         <div style='text-align: center; color: #666; padding: 1rem;'>
             <p><strong>Support Operations Dashboard</strong> | OrionEdge Corp</p>
-            <p>Data Range: {filtered_tickets['created_datetime'].min().date()} to {filtered_tickets['created_datetime'].max().date()}</p>
-            <p>Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>Data Range: {overview['created_min'].date()} to {overview['created_max'].date()}</p>
+            <p>Last Updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}{f" | Output Generation: {manifest['generation']}" if manifest else ""}</p>
         </div>
     """, unsafe_allow_html=True)
 
+    # Profiler checkbox and, when enabled, this rerun's timings and history
+    render_panel(profiler)
+
 # ============================================================================
 # RUN APP
 # ============================================================================
@@ -0,0 +1,208 @@
+"""
+Backlog Timeline for Support Operations Reporting System
+Daily open-ticket counts and aging buckets per hub/function/priority from an event sweep
+
+is_backlog only says which tickets were open at extract time. Here every
+ticket becomes dated +1/-1 events: +1 on the day it was created, -1 on the day
+it was resolved (open statuses never get a -1), and for each aging bucket +1
+on the day the ticket's age enters the bucket and -1 on the day it leaves the
+bucket or is resolved, whichever comes first. Summing the events per
+(group, day) and taking running sums over the sorted days gives, for every
+day, the tickets still open at the end of that day and their age
+distribution, for all groups in one pass: O(n log n) in the tickets.
+
+Event deltas per (year_month, hub, function, priority, date) are additive, so
+chunks, shards and incremental partitions merge by summing them before the
+running sums are taken. Tickets closed without a resolved_datetime count as
+closed on the day they were created.
+
+Output: outputs/backlog_timeline.csv (one row per hub/function/priority and day)
+"""
+
+import numpy as np
+import pandas as pd
+
+from kpi_engine import KPI_KEYS, encode_group_keys, decode_group_keys
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+BACKLOG_EVENT_KEYS = KPI_KEYS + ['priority', 'date']
+TIMELINE_KEYS = ['hub', 'function', 'priority']
+TIMELINE_FILE = "backlog_timeline.csv"
+
+ROLLUP_ALL = 'All'
+
+# Age of an open ticket in whole days since its creation day: [low, high)
+AGING_BUCKETS = [
+    ('age_0_2d', 0, 3),
+    ('age_3_7d', 3, 8),
+    ('age_8_14d', 8, 15),
+    ('age_15_30d', 15, 31),
+    ('age_over_30d', 31, None),
+]
+AGING_COLUMNS = [name for name, _, _ in AGING_BUCKETS]
+AGING_LABELS = {
+    'age_0_2d': '0-2 days', 'age_3_7d': '3-7 days', 'age_8_14d': '8-14 days',
+    'age_15_30d': '15-30 days', 'age_over_30d': 'Over 30 days',
+}
+
+# Per-day event deltas; 'opened'/'closed' are also reported as daily counts
+EVENT_COLUMNS = ['opened', 'closed'] + AGING_COLUMNS
+TIMELINE_COLUMNS = ['opened', 'closed', 'open_count'] + AGING_COLUMNS
+
+# Day number standing in for "still open"
+NEVER = np.iinfo(np.int64).max
+
+# ============================================================================
+# EVENTS
+# ============================================================================
+
+def _day_numbers(values):
+    """Days since 1970-01-01 (NaT -> NEVER)"""
+    days = pd.DatetimeIndex(values).to_numpy('datetime64[D]')
+    return np.where(np.isnat(days), NEVER, days.astype(np.int64))
+
+
+def compute_backlog_events(tickets_df):
+    """Backlog event deltas per (year_month, hub, function, priority, date).
+
+    tickets_df: enriched tickets (prepare_tickets). Returns the key columns
+    (as str, date as YYYY-MM-DD) followed by EVENT_COLUMNS, one row per group
+    and day with events, sorted by key.
+    """
+    tickets = tickets_df[tickets_df['created_datetime'].notna()]
+    codes, uniques = encode_group_keys(tickets, KPI_KEYS + ['priority'])
+    tickets, codes = tickets[codes >= 0], codes[codes >= 0]
+
+    created = _day_numbers(tickets['created_datetime'])
+    resolved = _day_numbers(tickets['resolved_datetime'])
+    is_open = tickets['is_backlog'].to_numpy(bool)
+    # Day the ticket stops being open at the end of the day
+    closed = np.where(is_open, NEVER, np.where(resolved == NEVER, created, np.maximum(resolved, created)))
+
+    cells, days, columns, deltas = [], [], [], []
+
+    def add(mask, day, column, delta):
+        cells.append(codes[mask])
+        days.append(day[mask])
+        columns.append(np.full(mask.sum(), column, dtype=np.int64))
+        deltas.append(np.full(mask.sum(), delta, dtype=np.int64))
+
+    everyone = np.ones(len(tickets), dtype=bool)
+    add(everyone, created, 0, 1)
+    add(closed != NEVER, closed, 1, 1)
+    for column, (_, low, high) in enumerate(AGING_BUCKETS, start=2):
+        enters = created + low
+        leaves = closed if high is None else np.minimum(created + high, closed)
+        active = enters < leaves
+        add(active, enters, column, 1)
+        add(active & (leaves != NEVER), leaves, column, -1)
+
+    events = pd.DataFrame({
+        'cell': np.concatenate(cells), 'day': np.concatenate(days),
+        'column': np.concatenate(columns), 'delta': np.concatenate(deltas),
+    })
+
+    # Sort the events by (group, day) and sum each group-day's deltas per column
+    sums = events.groupby(['cell', 'day', 'column'], sort=True)['delta'].sum().unstack('column', fill_value=0)
+    sums = sums.reindex(columns=range(len(EVENT_COLUMNS)), fill_value=0)
+
+    cell_codes = sums.index.get_level_values('cell').to_numpy()
+    partials = decode_group_keys(cell_codes, uniques, KPI_KEYS + ['priority'])
+    for key in KPI_KEYS + ['priority']:
+        partials[key] = partials[key].astype(str)
+    partials['date'] = pd.to_datetime(sums.index.get_level_values('day').to_numpy(), unit='D').strftime('%Y-%m-%d')
+    for position, column in enumerate(EVENT_COLUMNS):
+        partials[column] = sums[position].to_numpy(np.int64)
+
+    # Categorical keys group in category order; every engine writes string order
+    return partials.sort_values(BACKLOG_EVENT_KEYS, ignore_index=True)
+
+
+def merge_backlog_events(events_list):
+    """Add up backlog event deltas computed on separate batches of tickets"""
+    events = pd.concat(events_list, ignore_index=True)
+    merged = events.groupby(BACKLOG_EVENT_KEYS, sort=True)[EVENT_COLUMNS].sum()
+    return merged.reset_index()
+
+# ============================================================================
+# TIMELINE
+# ============================================================================
+
+def build_backlog_timeline(events):
+    """Running sums of the event deltas: one row per hub/function/priority and day.
+
+    Days run from the first creation to the last creation or resolution, with
+    'opened'/'closed' the day's counts and 'open_count' and the aging columns
+    the tickets open at the end of the day.
+    """
+    deltas = events.groupby(TIMELINE_KEYS + ['date'], sort=True)[EVENT_COLUMNS].sum()
+    if len(deltas) == 0:
+        return pd.DataFrame(columns=TIMELINE_KEYS + ['date'] + TIMELINE_COLUMNS)
+
+    dated = deltas[(deltas['opened'] > 0) | (deltas['closed'] > 0)].index.get_level_values('date')
+    dates = pd.date_range(dated.min(), dated.max(), freq='D').strftime('%Y-%m-%d')
+
+    groups = deltas.index.droplevel('date').unique()
+    group_of_row = groups.get_indexer(deltas.index.droplevel('date'))
+    day_of_row = dates.get_indexer(deltas.index.get_level_values('date'))
+    in_range = day_of_row >= 0
+
+    # Dense group x day x column array, then running sums along the days
+    dense = np.zeros((len(groups), len(dates), len(EVENT_COLUMNS)), dtype=np.int64)
+    np.add.at(dense, (group_of_row[in_range], day_of_row[in_range]), deltas.to_numpy(np.int64)[in_range])
+    running = dense.cumsum(axis=1)
+
+    timeline = groups.repeat(len(dates)).to_frame(index=False)
+    timeline['date'] = np.tile(dates.to_numpy(), len(groups))
+    flat = dense.reshape(-1, len(EVENT_COLUMNS))
+    flat_running = running.reshape(-1, len(EVENT_COLUMNS))
+    timeline['opened'] = flat[:, 0]
+    timeline['closed'] = flat[:, 1]
+    timeline['open_count'] = flat_running[:, 0] - flat_running[:, 1]
+    for position, column in enumerate(AGING_COLUMNS, start=2):
+        timeline[column] = flat_running[:, position]
+
+    return timeline
+
+
+def write_backlog_timeline(output_dir, events):
+    """Build the timeline from event deltas and save it next to the other outputs"""
+    timeline = build_backlog_timeline(events)
+    timeline.to_csv(f"{output_dir}/{TIMELINE_FILE}", index=False)
+    return timeline
+
+
+def read_backlog_timeline(output_dir, buffer=None):
+    """Load the saved timeline (or its already-read contents)"""
+    source = f"{output_dir}/{TIMELINE_FILE}" if buffer is None else buffer
+    return pd.read_csv(source, dtype={key: str for key in TIMELINE_KEYS + ['date']}, keep_default_na=False)
+
+# ============================================================================
+# LOOKUPS
+# ============================================================================
+
+def backlog_series(timeline, hub=ROLLUP_ALL, function=ROLLUP_ALL, start_date=None, end_date=None, by=None):
+    """Daily backlog for one selection, summed over the other keys.
+
+    hub/function: selected value or "All"; start_date/end_date: optional
+    inclusive date bounds; by: optional key ('hub', 'function' or 'priority')
+    to keep as a column. Returns 'date' (datetime64), the `by` column (if
+    any) and TIMELINE_COLUMNS.
+    """
+    rows = timeline
+    if hub != ROLLUP_ALL:
+        rows = rows[rows['hub'] == hub]
+    if function != ROLLUP_ALL:
+        rows = rows[rows['function'] == function]
+    if start_date is not None:
+        rows = rows[rows['date'] >= str(start_date)]
+    if end_date is not None:
+        rows = rows[rows['date'] <= str(end_date)]
+
+    keys = ['date'] if by is None else ['date', by]
+    series = rows.groupby(keys, sort=True)[TIMELINE_COLUMNS].sum().reset_index()
+    series['date'] = pd.to_datetime(series['date'])
+    return series
@@ -0,0 +1,366 @@
+"""
+Benchmark Suite for Support Operations Reporting System
+Per-stage timings and memory for the pipeline and dashboard, plus a golden-output check
+
+For each data size, synthetic ticket and effort files are generated once
+(synthetic_data.py, fixed seed) and every stage is measured:
+
+    pipeline    load, validate, transform, kpi, agent, summary (main.py STEPS 1-5)
+    dashboard   tickets (compact + sorted), filter index, and the data
+                preparation of each view (overview, volume, sla, csat,
+                management, agents)
+
+Each stage is timed as the best of --repeat runs; peak memory is the largest
+allocation increase seen by tracemalloc during a separate run. Results are
+appended to a JSON-lines history file and compared with the previous run.
+
+The golden check runs every pipeline engine (default, streaming, parallel,
+incremental) on the input files and compares its CSVs byte for byte with the
+pinned data/golden/*.csv; any difference fails the run. Refresh the pinned
+files (copy them from outputs/) only when an output change is intended.
+
+Usage:
+    python benchmark.py                       # golden check + 10k and 100k rows
+    python benchmark.py --sizes 1M 10M --repeat 1
+    python benchmark.py --golden-only
+"""
+
+import argparse
+import gc
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from pipeline import (
+    INPUT_TICKETS, INPUT_EFFORT,
+    load_inputs, validate_inputs, transform_tickets, calculate_kpis, calculate_agent_performance,
+    summarize_tickets, run_pipeline, write_outputs,
+)
+from streaming import run_streaming
+from run_report import peak_rss_mb
+from parallel import run_parallel
+from incremental import run_incremental
+from rollup_cube import CUBE_FILE
+from quantile_sketch import SKETCH_FILE
+from backlog_timeline import TIMELINE_FILE
+from bitmap_index import TicketFilter
+from synthetic_data import generate_files, parse_rows, OUTPUT_DIR as SYNTHETIC_DIR
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Run history (a gitignored directory, so benchmarking leaves the tree clean)
+HISTORY_FILE = "benchmarks/benchmark_history.jsonl"
+
+# Pinned expected outputs of the input files; pipeline runs never write here
+GOLDEN_DIR = "data/golden"
+
+DEFAULT_SIZES = ['10k', '100k']
+DEFAULT_REPEAT = 3
+SEED = 42
+
+# Slower than the previous run by more than this fraction -> flagged
+REGRESSION_THRESHOLD = 0.20
+
+# Pipeline outputs that every engine must reproduce exactly
+GOLDEN_FILES = [
+    'tickets_master.csv', 'kpi_monthly_summary.csv', CUBE_FILE, SKETCH_FILE, TIMELINE_FILE, 'agent_performance.csv'
+]
+
+# Small chunks so the streaming engine merges across many chunk boundaries
+GOLDEN_CHUNK_SIZE = 40
+
+# ============================================================================
+# MEASUREMENT
+# ============================================================================
+
+def measure(run, setup=None, repeat=DEFAULT_REPEAT, memory=True):
+    """Time run(*setup()) as the best of `repeat` runs, then its peak allocation.
+
+    setup() builds fresh inputs for each run (e.g. a copy for an in-place
+    step) and is not timed. Returns (seconds, peak_mb, result).
+    """
+    best = None
+    for _ in range(repeat):
+        args = setup() if setup else ()
+        gc.collect()
+        start = time.perf_counter()
+        result = run(*args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    peak_mb = None
+    if memory:
+        args = setup() if setup else ()
+        gc.collect()
+        tracemalloc.start()
+        baseline = tracemalloc.get_traced_memory()[0]
+        run(*args)
+        peak_mb = (tracemalloc.get_traced_memory()[1] - baseline) / 1024 / 1024
+        tracemalloc.stop()
+
+    return best, peak_mb, result
+
+
+def synthetic_inputs(size, data_dir=SYNTHETIC_DIR):
+    """Ticket and effort files for `size` rows (generated once, then reused)"""
+    tickets_path = os.path.join(data_dir, f"tickets_{size}.csv")
+    effort_path = os.path.join(data_dir, f"effort_{size}.csv")
+    if not (os.path.exists(tickets_path) and os.path.exists(effort_path)):
+        print(f"  generating {size} synthetic tickets ...")
+        generate_files(parse_rows(size), tickets_path, effort_path, seed=SEED)
+    return tickets_path, effort_path
+
+
+def load_app():
+    """Import app.py for its view functions, without Streamlit's bare-mode warnings"""
+    logging.disable(logging.WARNING)
+    try:
+        import app
+    finally:
+        logging.disable(logging.NOTSET)
+    return app
+
+
+def benchmark_size(size, repeat=DEFAULT_REPEAT, memory=True, data_dir=SYNTHETIC_DIR):
+    """Measure every pipeline stage and dashboard view at one data size"""
+    app = load_app()
+    tickets_path, effort_path = synthetic_inputs(size, data_dir)
+    results = []
+
+    def record(group, stage, run, setup=None):
+        seconds, peak_mb, result = measure(run, setup, repeat, memory)
+        results.append({
+            'size': size, 'group': group, 'stage': stage,
+            'seconds': round(seconds, 4),
+            'peak_mb': None if peak_mb is None else round(peak_mb, 1),
+        })
+        return result
+
+    # Pipeline: main.py STEPS 1-5
+    tickets_raw, effort_df = record('pipeline', 'load', load_inputs, lambda: (tickets_path, effort_path))
+    record('pipeline', 'validate', validate_inputs, lambda: (tickets_raw,))
+    tickets_df = record('pipeline', 'transform', transform_tickets, lambda: (tickets_raw.copy(),))
+    record('pipeline', 'transform_business', transform_tickets, lambda: (tickets_raw.copy(), 'business'))
+    record('pipeline', 'kpi', calculate_kpis, lambda: (tickets_df,))
+    agents = record('pipeline', 'agent', calculate_agent_performance, lambda: (tickets_df, effort_df))
+    record('pipeline', 'summary', summarize_tickets, lambda: (tickets_df,))
+
+    # Dashboard: ticket frame, filter index and each view's data preparation
+    tickets = record('dashboard', 'tickets', app.dashboard_tickets, lambda: (tickets_df,))
+    record('dashboard', 'filter_index', TicketFilter, lambda: (tickets,))
+    views = [
+        ('overview', app.prepare_overview),
+        ('volume', app.prepare_volume_view),
+        ('sla', app.prepare_sla_view),
+        ('csat', app.prepare_csat_view),
+        ('management', app.prepare_management_view),
+    ]
+    for stage, prepare in views:
+        record('dashboard', stage, prepare, lambda: (tickets,))
+    record('dashboard', 'agents', app.prepare_agent_view, lambda: (agents, 'All', 'All'))
+
+    for result in results:
+        result['rows'] = len(tickets_raw)
+    return results
+
+# ============================================================================
+# GOLDEN-OUTPUT CHECK
+# ============================================================================
+
+def _first_difference(expected_path, actual_path):
+    """First differing line of two files, or None when they are identical"""
+    with open(expected_path, 'rb') as f:
+        expected = f.read()
+    with open(actual_path, 'rb') as f:
+        actual = f.read()
+    if expected == actual:
+        return None
+    for number, (a, b) in enumerate(zip(expected.splitlines(), actual.splitlines()), start=1):
+        if a != b:
+            return f"line {number}: expected {a[:80]!r}, got {b[:80]!r}"
+    return f"{len(expected.splitlines())} lines expected, got {len(actual.splitlines())}"
+
+
+def _golden_engines():
+    """Engine name -> function writing the pipeline outputs for the input files into a directory"""
+    def default(output_dir):
+        write_outputs(run_pipeline(INPUT_TICKETS, INPUT_EFFORT), output_dir, write_parquet=False)
+
+    def streaming(output_dir):
+        run_streaming(INPUT_TICKETS, pd.read_csv(INPUT_EFFORT), output_dir,
+                      chunk_size=GOLDEN_CHUNK_SIZE, write_parquet=False)
+
+    def parallel(output_dir):
+        run_parallel(*load_inputs(), output_dir, workers=2, write_parquet=False)
+
+    def incremental(output_dir):
+        # Full build, then a no-change incremental run over the stored state
+        run_incremental(*load_inputs(), output_dir, full_refresh=True)
+        run_incremental(*load_inputs(), output_dir)
+
+    return {'default': default, 'streaming': streaming, 'parallel': parallel, 'incremental': incremental}
+
+
+def check_golden(golden_dir=GOLDEN_DIR):
+    """Compare every engine's CSVs with the golden files.
+
+    Returns {engine: {file: None or first difference}}; empty when there are
+    no golden files.
+    """
+    if not all(os.path.exists(os.path.join(golden_dir, name)) for name in GOLDEN_FILES):
+        return {}
+
+    report = {}
+    for engine, write in _golden_engines().items():
+        output_dir = tempfile.mkdtemp(prefix=f"golden_{engine}_")
+        try:
+            write(output_dir)
+            report[engine] = {
+                name: _first_difference(os.path.join(golden_dir, name), os.path.join(output_dir, name))
+                for name in GOLDEN_FILES
+            }
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+    return report
+
+# ============================================================================
+# HISTORY
+# ============================================================================
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def read_history(path=HISTORY_FILE):
+    """All recorded runs, oldest first"""
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(run, path=HISTORY_FILE):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(run) + '\n')
+
+
+def previous_seconds(history, size, stage):
+    """Most recent recorded time of a stage at a size (None if never measured)"""
+    for run in reversed(history):
+        for result in run['results']:
+            if result['size'] == size and result['stage'] == stage:
+                return result['seconds']
+    return None
+
+# ============================================================================
+# REPORT
+# ============================================================================
+
+def print_results(results, history):
+    regressions = 0
+    for size in dict.fromkeys(r['size'] for r in results):
+        rows = next(r['rows'] for r in results if r['size'] == size)
+        print(f"\n  {size} ({rows:,} tickets)")
+        for result in (r for r in results if r['size'] == size):
+            memory = '' if result['peak_mb'] is None else f"{result['peak_mb']:>9.1f} MB"
+            change = ''
+            before = previous_seconds(history, size, result['stage'])
+            if before:
+                ratio = result['seconds'] / before - 1
+                change = f"  {ratio:+7.1%} vs last"
+                if ratio > REGRESSION_THRESHOLD and result['seconds'] - before > 0.01:
+                    change += "  [SLOW]"
+                    regressions += 1
+            label = f"{result['group']}/{result['stage']}"
+            print(f"    {label:.<34} {result['seconds']:9.4f}s{memory}{change}")
+    return regressions
+
+
+def print_golden(report):
+    failures = 0
+    for engine, files in report.items():
+        differences = {name: diff for name, diff in files.items() if diff}
+        failures += len(differences)
+        if differences:
+            for name, diff in differences.items():
+                print(f"  [FAIL] {engine:<12} {name}: {diff}")
+        else:
+            print(f"  [OK] {engine:<12} identical to golden {', '.join(files)}")
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline stages and dashboard views")
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES, help="ticket counts, e.g. 10k 1M 10M")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="timed runs per stage (best is kept)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--history', default=HISTORY_FILE, help="JSON-lines history file")
+    parser.add_argument('--data-dir', default=SYNTHETIC_DIR, help="directory for the synthetic input files")
+    parser.add_argument('--golden-dir', default=GOLDEN_DIR, help="directory with the golden output CSVs")
+    parser.add_argument('--golden-only', action='store_true', help="only run the golden-output check")
+    parser.add_argument('--skip-golden', action='store_true', help="skip the golden-output check")
+    args = parser.parse_args()
+
+    # Deprecation notices from the measured code would repeat once per run
+    warnings.simplefilter('ignore', FutureWarning)
+
+    print("=" * 80)
+    print(" " * 28 + "BENCHMARK SUITE")
+    print("=" * 80)
+
+    golden = {}
+    failures = 0
+    if not args.skip_golden:
+        print("\nGOLDEN-OUTPUT CHECK")
+        golden = check_golden(args.golden_dir)
+        if not golden:
+            print(f"  [SKIP] no golden files in {args.golden_dir}/")
+        failures = print_golden(golden)
+
+    results = []
+    regressions = 0
+    if not args.golden_only:
+        print(f"\nSTAGE TIMINGS (best of {args.repeat}, peak tracemalloc allocation)")
+        for size in args.sizes:
+            results.extend(benchmark_size(size, args.repeat, not args.no_memory, args.data_dir))
+
+        history = read_history(args.history)
+        regressions = print_results(results, history)
+
+        append_history({
+            'run_at': datetime.now().isoformat(timespec='seconds'),
+            'commit': git_commit(),
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'cpus': os.cpu_count(),
+            'repeat': args.repeat,
+            'peak_rss_mb': peak_rss_mb(),
+            'golden_ok': failures == 0 if golden else None,
+            'results': results,
+        }, args.history)
+        print(f"\n[OK] Appended to {args.history} ({regressions} stages slower than the previous run)")
+
+    if failures:
+        print(f"\n[FAIL] {failures} golden-output differences")
+        sys.exit(1)
@@ -0,0 +1,172 @@
+"""
+Bitmap Indexes and Memoized Filters for Support Operations Reporting System
+Answers sidebar filter combinations with bitwise ANDs and a bounded LRU cache
+
+For every value of hub, function, priority, channel, status and category a
+packed bitmap (1 bit per ticket, np.packbits) marks the tickets that have it.
+A filter state becomes an OR of value bitmaps per column and an AND across
+columns, evaluated only over the bytes covering the created_datetime slice
+from time_index. Resolved results are kept in an LRU cache keyed by the filter
+state and bounded by their memory size, so a repeated state is a dictionary
+lookup and a new one costs a few bitmap ANDs.
+"""
+
+import sys
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from compact_schema import drop_unused_categories
+from time_index import created_index, created_bounds
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+BITMAP_COLUMNS = ['hub', 'function', 'priority', 'channel', 'status', 'category']
+
+# Memory budget for memoized filter results
+DEFAULT_CACHE_BYTES = 256 * 1024 * 1024
+
+# Value meaning "no filter on this column" (the sidebar's default option)
+ALL_VALUES = 'All'
+
+# ============================================================================
+# BITMAPS
+# ============================================================================
+
+def build_bitmaps(tickets_df, columns=BITMAP_COLUMNS):
+    """Packed bitmap per (column, value): {column: {value: uint8 array}}"""
+    bitmaps = {}
+    for column in columns:
+        if column not in tickets_df.columns:
+            continue
+        codes, uniques = pd.factorize(tickets_df[column])
+        bitmaps[column] = {
+            value: np.packbits(codes == position)
+            for position, value in enumerate(uniques)
+        }
+    return bitmaps
+
+
+def select_rows(bitmaps, n_rows, filters, start=0, stop=None):
+    """Row positions in [start, stop) matching every filter.
+
+    filters: {column: value or list of values}; ALL_VALUES/None means no filter
+    """
+    stop = n_rows if stop is None else stop
+    active = {
+        column: ([values] if np.isscalar(values) else list(values))
+        for column, values in filters.items()
+        if values is not None and not (np.isscalar(values) and values == ALL_VALUES)
+    }
+    if not active:
+        return np.arange(start, stop)
+
+    # Only the bytes covering the row range take part in the ANDs
+    first_byte, last_byte = start // 8, (stop + 7) // 8
+    empty = np.zeros(last_byte - first_byte, dtype=np.uint8)
+
+    combined = None
+    for column, values in active.items():
+        column_bitmaps = bitmaps[column]
+        matched = empty.copy()
+        for value in values:
+            if value in column_bitmaps:
+                matched |= column_bitmaps[value][first_byte:last_byte]
+        combined = matched if combined is None else combined & matched
+
+    positions = np.flatnonzero(np.unpackbits(combined)) + first_byte * 8
+    return positions[(positions >= start) & (positions < stop)]
+
+# ============================================================================
+# LRU CACHE
+# ============================================================================
+
+def estimate_nbytes(value):
+    """Approximate memory size of a cached value (frames, series, containers, scalars)"""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(index=True, deep=False)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimate_nbytes(item) for item in value)
+    return sys.getsizeof(value)
+
+
+class LRUCache:
+    """Least-recently-used cache bounded by the total size of its values"""
+
+    def __init__(self, max_bytes=DEFAULT_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, key, value, nbytes):
+        if key in self._entries:
+            self.current_bytes -= self._entries.pop(key)[1]
+        if nbytes > self.max_bytes:
+            return value
+        self._entries[key] = (value, nbytes)
+        self.current_bytes += nbytes
+        while self.current_bytes > self.max_bytes:
+            _, (_, evicted_bytes) = self._entries.popitem(last=False)
+            self.current_bytes -= evicted_bytes
+        return value
+
+    def __len__(self):
+        return len(self._entries)
+
+# ============================================================================
+# TICKET FILTER
+# ============================================================================
+
+class TicketFilter:
+    """Bitmap-indexed, memoized filtering over tickets sorted by created_datetime"""
+
+    def __init__(self, tickets_df, columns=BITMAP_COLUMNS, cache_bytes=DEFAULT_CACHE_BYTES):
+        self.tickets = tickets_df
+        self.bitmaps = build_bitmaps(tickets_df, columns)
+        self.created = created_index(tickets_df)
+        self.cache = LRUCache(cache_bytes)
+
+    def select(self, start_date=None, end_date=None, **filters):
+        """Tickets created in the date range whose columns match `filters`.
+
+        The result is shared between callers and must not be modified in place.
+        """
+        key = (start_date, end_date, tuple(sorted(
+            (column, values if np.isscalar(values) or values is None else tuple(values))
+            for column, values in filters.items()
+        )))
+        result = self.cache.get(key)
+        if result is not None:
+            return result
+
+        start, stop = created_bounds(self.created, len(self.tickets), start_date, end_date)
+        rows = select_rows(self.bitmaps, len(self.tickets), filters, start, stop)
+        result = drop_unused_categories(self.tickets.iloc[rows])
+
+        return self.cache.put(key, result, estimate_nbytes(result))
+
+    def memoize(self, key, compute, *args):
+        """compute(*args), cached under `key` (e.g. a view name plus filter state)"""
+        key = ('memo',) + tuple(key)
+        result = self.cache.get(key)
+        if result is None:
+            result = compute(*args)
+            self.cache.put(key, result, estimate_nbytes(result))
+        return result
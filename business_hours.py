@@ -0,0 +1,129 @@
+"""
+Business-Hours Clock for Support Operations Reporting System
+Vectorized resolution time in working hours of each hub's local calendar
+
+SLA contracts count only working hours: each hub has its own time zone,
+working days, daily working window and public holidays (HUB_CALENDARS).
+Instead of walking every ticket hour by hour, each timestamp is mapped to a
+business-minute clock: working minutes since a fixed origin, i.e. whole
+working days before its day (np.busday_count, which honours the weekmask
+and holidays) times the window length, plus the minutes of its own day that
+fall inside the window. The business duration of a ticket is the clock at
+resolution minus the clock at creation, a handful of array operations per
+hub.
+
+prepare_tickets(..., sla_clock='business') uses this for
+resolution_time_hours, so sla_met and every SLA KPI downstream follow.
+"""
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SLA_CLOCKS = ['wall', 'business']
+
+# Time zone the export's timestamps are recorded in; None = each hub's local time
+TIMESTAMP_TIMEZONE = None
+
+# Working calendar per hub: local time zone, working window (local time),
+# working days (numpy weekmask, Monday first) and public holidays; edit to
+# match each hub's contract
+HUB_CALENDARS = {
+    'A': {  # Bangalore
+        'timezone': 'Asia/Kolkata',
+        'window': ('09:00', '18:00'),
+        'weekmask': '1111100',
+        'holidays': [
+            '2025-01-14', '2025-01-26', '2025-03-14', '2025-03-31', '2025-04-18', '2025-05-01',
+            '2025-08-15', '2025-08-27', '2025-10-01', '2025-10-02', '2025-10-20', '2025-10-22',
+            '2025-11-01', '2025-12-25',
+            '2026-01-14', '2026-01-26', '2026-03-04', '2026-03-20', '2026-04-03', '2026-05-01',
+            '2026-08-15', '2026-09-14', '2026-10-02', '2026-10-20', '2026-11-01', '2026-11-09',
+            '2026-12-25',
+        ],
+    },
+    'B': {  # Krakow
+        'timezone': 'Europe/Warsaw',
+        'window': ('08:00', '16:00'),
+        'weekmask': '1111100',
+        'holidays': [
+            '2025-01-01', '2025-01-06', '2025-04-20', '2025-04-21', '2025-05-01', '2025-05-03',
+            '2025-06-08', '2025-06-19', '2025-08-15', '2025-11-01', '2025-11-11', '2025-12-24',
+            '2025-12-25', '2025-12-26',
+            '2026-01-01', '2026-01-06', '2026-04-05', '2026-04-06', '2026-05-01', '2026-05-03',
+            '2026-05-24', '2026-06-04', '2026-08-15', '2026-11-01', '2026-11-11', '2026-12-24',
+            '2026-12-25', '2026-12-26',
+        ],
+    },
+}
+
+# Hubs without a calendar of their own
+DEFAULT_CALENDAR = {
+    'timezone': None,
+    'window': ('09:00', '17:00'),
+    'weekmask': '1111100',
+    'holidays': [],
+}
+
+# Origin of the business-minute clock (only differences of the clock are used)
+CLOCK_ORIGIN = np.datetime64('2000-01-01', 'D')
+
+# ============================================================================
+# BUSINESS-MINUTE CLOCK
+# ============================================================================
+
+def _minutes(hhmm):
+    hours, minutes = hhmm.split(':')
+    return int(hours) * 60 + int(minutes)
+
+
+def to_local_time(timestamps, calendar, source_timezone=TIMESTAMP_TIMEZONE):
+    """Naive timestamps in the calendar's local time (unchanged when source_timezone is None)"""
+    timestamps = pd.Series(pd.to_datetime(timestamps))
+    if source_timezone is None or calendar['timezone'] is None:
+        return timestamps
+    return timestamps.dt.tz_localize(source_timezone).dt.tz_convert(calendar['timezone']).dt.tz_localize(None)
+
+
+def business_minutes(local_times, calendar):
+    """Working minutes from CLOCK_ORIGIN to each local timestamp (NaN for NaT).
+
+    Differences of this clock are business durations.
+    """
+    times = pd.DatetimeIndex(local_times).to_numpy('datetime64[s]')
+    missing = np.isnat(times)
+    days = np.where(missing, CLOCK_ORIGIN, times.astype('datetime64[D]'))
+    minute_of_day = (times - days.astype('datetime64[s]')).astype(np.float64) / 60
+
+    start, end = (_minutes(hhmm) for hhmm in calendar['window'])
+    holidays = np.array(calendar['holidays'], dtype='datetime64[D]')
+    working_days = np.busday_count(CLOCK_ORIGIN, days, weekmask=calendar['weekmask'], holidays=holidays)
+    is_working = np.is_busday(days, weekmask=calendar['weekmask'], holidays=holidays)
+
+    within_day = np.clip(minute_of_day - start, 0, end - start) * is_working
+    clock = working_days * float(end - start) + within_day
+    clock[missing] = np.nan
+    return clock
+
+
+def business_hours_between(created, resolved, hubs, calendars=HUB_CALENDARS, source_timezone=TIMESTAMP_TIMEZONE):
+    """Working hours from `created` to `resolved` on each ticket's hub calendar.
+
+    created/resolved: datetime Series (NaT allowed, giving NaN); hubs: hub of
+    each ticket. Returns a float64 array aligned with the inputs.
+    """
+    hubs = pd.Series(hubs).astype(str).to_numpy()
+    created, resolved = pd.Series(created), pd.Series(resolved)
+    hours = np.full(len(hubs), np.nan)
+
+    for hub in pd.unique(hubs):
+        rows = np.flatnonzero(hubs == hub)
+        calendar = calendars.get(hub, DEFAULT_CALENDAR)
+        start = business_minutes(to_local_time(created.iloc[rows], calendar, source_timezone), calendar)
+        end = business_minutes(to_local_time(resolved.iloc[rows], calendar, source_timezone), calendar)
+        hours[rows] = (end - start) / 60
+
+    return hours
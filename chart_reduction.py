@@ -0,0 +1,186 @@
+"""
+Chart Data Reduction for the Support Operations Dashboard
+Bounded figure payloads for high-cardinality charts
+
+Charts with one bar or line per agent grow with the roster: with hundreds of
+agents the figure JSON runs to megabytes and the browser stalls. Data is
+reduced on the server before a figure is built or sent:
+
+    top_n_bars / top_n_series   the N agents that matter most, the rest folded
+                                into one "Other (avg of K agents)" bar or line
+    lttb_indices                Largest-Triangle-Three-Buckets downsampling of
+                                a long line, keeping its visual shape
+    limit_points                last line of defense for every figure: at most
+                                POINT_BUDGET points in total (lines are LTTB
+                                downsampled, other traces truncated, the title
+                                says so), and WebGL (scattergl) line traces
+                                above WEBGL_THRESHOLD points
+
+Figures within the budget are returned unchanged.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Agents drawn individually (Plotly's default palette has 10 colors)
+TOP_N_AGENTS = 10
+
+# Points a single figure may send to the browser
+POINT_BUDGET = 5_000
+
+# Line charts switch to WebGL rendering above this many points
+WEBGL_THRESHOLD = 1_000
+
+
+def other_label(count):
+    return f"Other (avg of {count} agents)"
+
+# ============================================================================
+# TOP-N BUCKETING
+# ============================================================================
+
+def top_n_bars(values, n=TOP_N_AGENTS):
+    """The n largest values of a Series, plus the mean of the rest as one bar.
+
+    Returns the Series unchanged when it has at most n + 1 entries.
+    """
+    if len(values) <= n + 1:
+        return values
+    top = values.nlargest(n)
+    rest = values.drop(top.index)
+    other = pd.Series([round(rest.mean(), 2)], index=[other_label(len(rest))], name=values.name)
+    return pd.concat([top, other])
+
+
+def top_n_series(frame, key, x, y, n=TOP_N_AGENTS, rank='sum'):
+    """Long-format series limited to the n highest-ranked `key` values.
+
+    Keys are ranked by the `rank` aggregate of y ('sum' or 'mean'); the other
+    keys become one series holding their mean y per x. Returns the frame
+    unchanged when it has at most n + 1 keys.
+    """
+    keys = frame[key].unique()
+    if len(keys) <= n + 1:
+        return frame
+
+    top = frame.groupby(key)[y].agg(rank).nlargest(n).index
+    is_top = frame[key].isin(top)
+    rest = frame[~is_top]
+    other = rest.groupby(x, as_index=False)[y].mean().round(2)
+    other[key] = other_label(rest[key].nunique())
+    return pd.concat([frame[is_top], other[frame.columns]], ignore_index=True)
+
+# ============================================================================
+# DOWNSAMPLING
+# ============================================================================
+
+def lttb_indices(x, y, threshold):
+    """Indices of the points Largest-Triangle-Three-Buckets keeps (first and last included).
+
+    x and y are numeric arrays of equal length, x in plotting order.
+    """
+    length = len(x)
+    if threshold >= length:
+        return np.arange(length)
+    threshold = max(threshold, 3)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    kept = np.empty(threshold, dtype=np.int64)
+    kept[0], kept[-1] = 0, length - 1
+
+    # Middle points split into threshold - 2 buckets
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        # Average of the next bucket (the last point for the final bucket)
+        next_end = edges[bucket + 2] if bucket + 2 < len(edges) else length
+        avg_x = x[end:next_end].mean() if next_end > end else x[-1]
+        avg_y = y[end:next_end].mean() if next_end > end else y[-1]
+
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.nanargmax(area)) if np.isfinite(area).any() else start
+        kept[bucket + 1] = previous
+
+    return kept
+
+
+def _numeric_positions(values):
+    """x values as numbers for LTTB: numbers and dates as-is, categories by position"""
+    values = np.asarray(values)
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(np.float64)
+    try:
+        return pd.to_datetime(values).asi8.astype(np.float64)
+    except (ValueError, TypeError):
+        return np.arange(len(values), dtype=np.float64)
+
+# ============================================================================
+# FIGURE BUDGET
+# ============================================================================
+
+def _trace_points(trace):
+    for attribute in ('x', 'y', 'values', 'labels'):
+        values = getattr(trace, attribute, None)
+        if values is not None:
+            return len(values)
+    return 0
+
+
+def _slice_trace(trace, keep):
+    """Keep the given point positions of every per-point array of a trace"""
+    length = _trace_points(trace)
+    for attribute in ('x', 'y', 'text', 'customdata', 'hovertext', 'values', 'labels'):
+        values = getattr(trace, attribute, None)
+        if values is not None and not isinstance(values, str) and len(values) == length:
+            trace[attribute] = np.asarray(values)[keep]
+    marker = getattr(trace, 'marker', None)
+    if marker is not None and marker.color is not None and not isinstance(marker.color, str) \
+            and len(marker.color) == length:
+        marker.color = np.asarray(marker.color)[keep]
+
+
+def limit_points(fig, budget=POINT_BUDGET, webgl_threshold=WEBGL_THRESHOLD):
+    """Bound the number of points a figure sends (the figure is modified in place)"""
+    total = sum(_trace_points(trace) for trace in fig.data)
+    kept = total
+
+    if total > budget:
+        # At least 3 points per trace, so at most budget // 3 traces
+        if len(fig.data) > budget // 3:
+            fig.data = fig.data[:budget // 3]
+        points = [_trace_points(trace) for trace in fig.data]
+        for trace, count in zip(fig.data, points):
+            share = max(3, budget * count // sum(points))
+            if count <= share:
+                continue
+            if trace.type in ('scatter', 'scattergl') and trace.x is not None and trace.y is not None:
+                keep = lttb_indices(_numeric_positions(trace.x), np.asarray(trace.y, dtype=np.float64), share)
+            else:
+                keep = np.arange(share)
+            _slice_trace(trace, keep)
+
+        kept = sum(_trace_points(trace) for trace in fig.data)
+        title = fig.layout.title.text or ""
+        fig.update_layout(title_text=f"{title} ({kept:,} of {total:,} points)".strip())
+
+    # WebGL draws large line/marker traces without one SVG node per point
+    if kept > webgl_threshold and any(trace.type == 'scatter' for trace in fig.data):
+        traces = [
+            go.Scattergl({k: v for k, v in trace.to_plotly_json().items() if k != 'type'}, skip_invalid=True)
+            if trace.type == 'scatter' else trace
+            for trace in fig.data
+        ]
+        fig.data = []
+        fig.add_traces(traces)
+
+    return fig
@@ -0,0 +1,245 @@
+"""
+Partitioned Columnar Output Store for Support Operations Reporting System
+Typed Parquet copies of the pipeline outputs for fast dashboard loads
+
+Layout (under outputs/parquet/):
+    tickets_master/year_month=2025-10/hub=A/part-0.parquet   (part-N when streamed)
+    kpi_monthly_summary.parquet
+    agent_performance.parquet
+    _store.json            months, hubs, functions and created_datetime range
+
+Tickets are partitioned by year_month and hub, low-cardinality text columns
+are stored dictionary-encoded and datetimes as native timestamps, so readers
+skip CSV and date parsing entirely. read_tickets() prunes both columns and
+partitions (hub, month range) before any data is decoded.
+
+Requires pyarrow (optional dependency); PARQUET_AVAILABLE is False without it.
+"""
+
+import json
+import os
+import shutil
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+STORE_DIR_NAME = "parquet"
+TICKETS_DIR_NAME = "tickets_master"
+METADATA_FILE = "_store.json"
+
+PARTITION_COLUMNS = ['year_month', 'hub']
+
+# Low-cardinality text columns stored dictionary-encoded
+CATEGORY_COLUMNS = [
+    'function', 'channel', 'status', 'priority', 'category',
+    'requester_department', 'assigned_agent_id', 'month_name',
+]
+TIMESTAMP_COLUMNS = ['created_datetime', 'resolved_datetime']
+
+
+def store_path(output_dir):
+    return os.path.join(output_dir, STORE_DIR_NAME)
+
+# ============================================================================
+# WRITING
+# ============================================================================
+
+def _typed_tickets(tickets_df):
+    """Cast enriched tickets to the store's column types"""
+    typed = tickets_df.copy()
+    typed['year_month'] = typed['year_month'].astype(str)
+    typed['hub'] = typed['hub'].astype(str)
+    for column in CATEGORY_COLUMNS:
+        if column in typed.columns:
+            typed[column] = typed[column].astype('category')
+    for column in TIMESTAMP_COLUMNS:
+        typed[column] = pd.to_datetime(typed[column])
+    if 'sla_met' in typed.columns:
+        typed['sla_met'] = typed['sla_met'].astype('boolean')
+    return typed
+
+
+def _ticket_schema(typed):
+    """Arrow schema for ticket partition files (partition columns excluded)"""
+    schema = pa.Schema.from_pandas(typed.drop(columns=PARTITION_COLUMNS), preserve_index=False)
+    for column in CATEGORY_COLUMNS:
+        if column in schema.names:
+            position = schema.get_field_index(column)
+            schema = schema.set(position, pa.field(column, pa.dictionary(pa.int32(), pa.string())))
+    return schema.remove_metadata()
+
+
+def _write_partition(tickets_root, year_month, hub, partition, schema, part=0):
+    directory = os.path.join(tickets_root, f"year_month={year_month}", f"hub={hub}")
+    os.makedirs(directory, exist_ok=True)
+    table = pa.Table.from_pandas(
+        partition.drop(columns=PARTITION_COLUMNS), schema=schema, preserve_index=False
+    )
+    pq.write_table(table, os.path.join(directory, f"part-{part}.parquet"))
+
+
+def _write_metadata(root, kpi_summary, created_min, created_max):
+    metadata = {
+        'months': sorted(kpi_summary['year_month'].astype(str).unique().tolist()),
+        'hubs': sorted(kpi_summary['hub'].astype(str).unique().tolist()),
+        'functions': sorted(kpi_summary['function'].astype(str).unique().tolist()),
+        'created_min': str(created_min),
+        'created_max': str(created_max),
+    }
+    with open(os.path.join(root, METADATA_FILE), 'w') as f:
+        json.dump(metadata, f, indent=2)
+
+
+def begin_store(output_dir):
+    """Start a fresh store in a staging directory; returns the staging path"""
+    staging = store_path(output_dir) + ".tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(os.path.join(staging, TICKETS_DIR_NAME))
+    return staging
+
+
+def write_store_chunk(staging, tickets_df, part=0, schema=None):
+    """Add enriched tickets to a staged store, one file per partition and part.
+
+    Returns the schema used, so later chunks can be written with the same one.
+    """
+    typed = _typed_tickets(tickets_df)
+    schema = schema or _ticket_schema(typed)
+    tickets_root = os.path.join(staging, TICKETS_DIR_NAME)
+    for (year_month, hub), partition in typed.groupby(PARTITION_COLUMNS, sort=True, observed=True):
+        _write_partition(tickets_root, year_month, hub, partition, schema, part)
+    return schema
+
+
+def finish_store(output_dir, staging, kpi_summary, agent_performance, created_min, created_max):
+    """Add the summary tables and metadata, then swap the staged store in"""
+    kpi_summary.to_parquet(os.path.join(staging, "kpi_monthly_summary.parquet"), index=False)
+    agent_performance.to_parquet(os.path.join(staging, "agent_performance.parquet"), index=False)
+    _write_metadata(staging, kpi_summary, created_min, created_max)
+
+    root = store_path(output_dir)
+    shutil.rmtree(root, ignore_errors=True)
+    os.replace(staging, root)
+    return root
+
+
+def write_store(output_dir, tickets_df, kpi_summary, agent_performance):
+    """Write all outputs to a fresh store and swap it in place of the old one"""
+    staging = begin_store(output_dir)
+    write_store_chunk(staging, tickets_df)
+    return finish_store(
+        output_dir, staging, kpi_summary, agent_performance,
+        tickets_df['created_datetime'].min(), tickets_df['created_datetime'].max()
+    )
+
+
+def update_store(output_dir, recomputed, touched, kpi_summary, agent_performance, created_min, created_max):
+    """Replace the touched (year_month, hub, function) slices of an existing store.
+
+    `recomputed` holds every enriched ticket of the touched partitions.
+    """
+    root = store_path(output_dir)
+    tickets_root = os.path.join(root, TICKETS_DIR_NAME)
+
+    typed = _typed_tickets(recomputed)
+    schema = _ticket_schema(typed)
+
+    touched_functions = {}
+    for year_month, hub, function in touched:
+        touched_functions.setdefault((year_month, hub), set()).add(function)
+
+    for (year_month, hub), functions in touched_functions.items():
+        directory = os.path.join(tickets_root, f"year_month={year_month}", f"hub={hub}")
+        fresh = typed[(typed['year_month'] == year_month) & (typed['hub'] == hub)]
+
+        if os.path.isdir(directory):
+            # A partition may hold several part files (streamed runs); merge them into one
+            existing = pd.concat(
+                [pq.read_table(os.path.join(directory, name)).to_pandas() for name in sorted(os.listdir(directory))],
+                ignore_index=True
+            )
+            existing = existing[~existing['function'].astype(str).isin(functions)]
+            existing['year_month'], existing['hub'] = year_month, hub
+            fresh = pd.concat([existing, fresh], ignore_index=True)
+            shutil.rmtree(directory)
+
+        if len(fresh) > 0:
+            _write_partition(tickets_root, year_month, hub, _typed_tickets(fresh), schema)
+
+    kpi_summary.to_parquet(os.path.join(root, "kpi_monthly_summary.parquet"), index=False)
+    agent_performance.to_parquet(os.path.join(root, "agent_performance.parquet"), index=False)
+    _write_metadata(root, kpi_summary, created_min, created_max)
+
+# ============================================================================
+# READING
+# ============================================================================
+
+def load_metadata(output_dir):
+    """Store metadata, or None when there is no (readable) store"""
+    path = os.path.join(store_path(output_dir), METADATA_FILE)
+    if not PARQUET_AVAILABLE or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def read_tickets(output_dir, columns=None, hubs=None, functions=None,
+                 start_date=None, end_date=None, categorical=True):
+    """Read tickets with column and partition pruning.
+
+    hubs/functions: lists of values to keep (None = all)
+    start_date/end_date: inclusive created_datetime dates (None = open-ended)
+    categorical: keep dictionary columns as pandas categoricals, else decode to str
+    """
+    partitioning = ds.partitioning(
+        pa.schema([('year_month', pa.string()), ('hub', pa.string())]), flavor='hive'
+    )
+    dataset = ds.dataset(
+        os.path.join(store_path(output_dir), TICKETS_DIR_NAME), format='parquet', partitioning=partitioning
+    )
+
+    # Partition filters prune whole directories; the rest is pushed into the scan
+    conditions = []
+    if hubs is not None:
+        conditions.append(ds.field('hub').isin(list(hubs)))
+    if start_date is not None:
+        start = pd.Timestamp(start_date)
+        conditions.append(ds.field('year_month') >= start.strftime('%Y-%m'))
+        conditions.append(ds.field('created_datetime') >= start.to_datetime64())
+    if end_date is not None:
+        end = pd.Timestamp(end_date)
+        conditions.append(ds.field('year_month') <= end.strftime('%Y-%m'))
+        conditions.append(ds.field('created_datetime') < (end + pd.Timedelta(days=1)).to_datetime64())
+    if functions is not None:
+        conditions.append(ds.field('function').cast(pa.string()).isin(list(functions)))
+
+    expression = None
+    for condition in conditions:
+        expression = condition if expression is None else expression & condition
+
+    table = dataset.to_table(columns=columns, filter=expression)
+
+    if not categorical:
+        decoded = [
+            pa.field(field.name, field.type.value_type) if pa.types.is_dictionary(field.type) else field
+            for field in table.schema
+        ]
+        table = table.cast(pa.schema(decoded))
+
+    return table.to_pandas()
+
+
+def read_table(output_dir, name):
+    """Read one of the small summary tables (kpi_monthly_summary, agent_performance)"""
+    return pd.read_parquet(os.path.join(store_path(output_dir), f"{name}.parquet"))
@@ -0,0 +1,252 @@
+"""
+Compact Ticket Schema for Support Operations Reporting System
+Categorical, int-coded and bitpacked in-memory representation of the tickets frame
+
+Loaded with default dtypes, every text column (hub, function, status, ids, ...)
+is a Python object string per row and the enrichment adds a float and several
+bool helper columns per ticket. The compact schema keeps the same information in
+a fraction of the memory:
+
+    low-cardinality text      -> categorical (int8/int16 codes + one copy of each label)
+    ticket / agent ids        -> int32 numbers ("TCK-2001" -> 2001), formats kept in attrs
+    small integer columns     -> smallest integer dtype that holds them
+    sla_met (True/False/None) -> nullable boolean
+    redundant helper columns  -> dropped (csat_score_clean) or bitpacked into one uint8 `flags`
+
+Run directly for a memory report (bytes per ticket before and after):
+    python compact_schema.py --rows 1000000
+"""
+
+import argparse
+import re
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+# Low-cardinality text columns kept as categoricals
+CATEGORY_COLUMNS = [
+    'hub', 'function', 'channel', 'status', 'priority', 'category',
+    'requester_department', 'month_name',
+]
+
+# Identifier columns of the form PREFIX-<digits>, stored as int32
+ID_COLUMNS = ['ticket_id', 'assigned_agent_id']
+
+# Integer columns downcast to the smallest dtype that holds their values
+SMALL_INT_COLUMNS = ['sla_target_hours', 'reopened_flag']
+
+# Helper columns packed into the `flags` bit field (bit position = list index)
+FLAG_COLUMNS = ['csat_high', 'csat_low', 'was_reopened']
+
+# Helper columns dropped because they are trivially derivable
+DERIVED_COLUMNS = ['csat_score_clean']
+
+# dtype= for pd.read_csv: parse low-cardinality text straight into categoricals
+# (numeric columns are parsed as found: text in them is quarantined by
+# validation.py, which then gives the valid rows consistent numeric dtypes)
+TICKET_LOAD_DTYPES = {
+    **{column: 'category' for column in CATEGORY_COLUMNS if column != 'month_name'},
+    'assigned_agent_id': 'category',
+}
+
+_ID_PATTERN = re.compile(r'^(\D*?)(\d+)$')
+
+# ============================================================================
+# ID ENCODING
+# ============================================================================
+
+def encode_ids(series):
+    """Encode PREFIX-<digits> identifiers as int32.
+
+    Returns (codes, id_format) where id_format is a str.format pattern that
+    turns a code back into the identifier, or (series, None) unchanged when the
+    values do not share one prefix and one numbering style (fixed zero-padded
+    width, or unpadded).
+    """
+    parts = series.astype('string').str.extract(_ID_PATTERN.pattern)
+    if len(parts) == 0 or parts[1].isna().any() or parts[0].nunique() != 1:
+        return series, None
+
+    digits = parts[1]
+    widths = digits.str.len()
+    if widths.max() > 9:
+        return series, None
+
+    if widths.nunique() == 1:
+        id_format = f"{parts[0].iloc[0]}{{:0{widths.iloc[0]}d}}"
+    elif not (digits.str.startswith('0') & (widths > 1)).any():
+        id_format = f"{parts[0].iloc[0]}{{:d}}"
+    else:
+        return series, None
+
+    return digits.astype(np.int64).astype(np.int32), id_format
+
+
+def decode_ids(codes, id_format):
+    """Turn int-coded identifiers back into their original strings"""
+    prefix, width = re.match(r'^(.*)\{:0?(\d*)d\}$', id_format).groups()
+    numbers = pd.Series(codes, index=getattr(codes, 'index', None)).astype(str)
+    return prefix + (numbers.str.zfill(int(width)) if width else numbers)
+
+# ============================================================================
+# LOADING
+# ============================================================================
+
+def downcast_integers(tickets_df):
+    """Downcast SMALL_INT_COLUMNS in place (columns with missing values are left alone)"""
+    for column in SMALL_INT_COLUMNS:
+        if column in tickets_df.columns and pd.api.types.is_integer_dtype(tickets_df[column]):
+            tickets_df[column] = pd.to_numeric(tickets_df[column], downcast='integer')
+    return tickets_df
+
+
+def load_tickets(path, **read_csv_kwargs):
+    """Read a ticket export with categorical text columns and narrow integers.
+
+    Ticket ids stay strings here: the pipeline writes them back verbatim.
+    """
+    return downcast_integers(pd.read_csv(path, dtype=TICKET_LOAD_DTYPES, **read_csv_kwargs))
+
+# ============================================================================
+# COMPACT / EXPAND
+# ============================================================================
+
+def compact_tickets(tickets_df, encode_id_columns=True, pack_flags=True):
+    """Return a compact copy of a (raw or enriched) tickets frame.
+
+    encode_id_columns: int-code ticket and agent ids (formats go to attrs['id_formats'])
+    pack_flags: bitpack FLAG_COLUMNS into `flags` and drop DERIVED_COLUMNS
+    """
+    compact = tickets_df.copy()
+    id_formats = dict(compact.attrs.get('id_formats', {}))
+
+    for column in CATEGORY_COLUMNS:
+        if column in compact.columns and not isinstance(compact[column].dtype, pd.CategoricalDtype):
+            compact[column] = compact[column].astype('category')
+
+    for column in ID_COLUMNS:
+        if column not in compact.columns or column in id_formats:
+            continue
+        codes, id_format = encode_ids(compact[column]) if encode_id_columns else (None, None)
+        if id_format is not None:
+            compact[column] = codes
+            id_formats[column] = id_format
+        elif not isinstance(compact[column].dtype, pd.CategoricalDtype) and column != 'ticket_id':
+            compact[column] = compact[column].astype('category')
+
+    downcast_integers(compact)
+
+    if 'year_month' in compact.columns and compact['year_month'].dtype == object:
+        # "YYYY-MM" labels sort chronologically, so max() gives the latest month
+        compact['year_month'] = compact['year_month'].astype('category').cat.as_ordered()
+
+    if 'sla_met' in compact.columns:
+        compact['sla_met'] = compact['sla_met'].astype('boolean')
+
+    if pack_flags:
+        present = [column for column in FLAG_COLUMNS if column in compact.columns]
+        if present:
+            flags = np.zeros(len(compact), dtype=np.uint8)
+            for column in present:
+                flags |= compact[column].to_numpy(dtype=bool).astype(np.uint8) << FLAG_COLUMNS.index(column)
+            compact['flags'] = flags
+        compact = compact.drop(columns=present + [c for c in DERIVED_COLUMNS if c in compact.columns])
+
+    compact.attrs['id_formats'] = id_formats
+    return compact
+
+
+def drop_unused_categories(tickets_df):
+    """Drop categories that no longer occur (e.g. after filtering), so counts skip them"""
+    unused = {
+        column: tickets_df[column].cat.remove_unused_categories()
+        for column in tickets_df.columns
+        if isinstance(tickets_df[column].dtype, pd.CategoricalDtype)
+    }
+    return tickets_df.assign(**unused) if unused else tickets_df
+
+
+def ticket_flag(tickets_df, name):
+    """Read one helper flag, whether it is a column or packed into `flags`"""
+    if name in tickets_df.columns:
+        return tickets_df[name].astype(bool)
+    bit = FLAG_COLUMNS.index(name)
+    return pd.Series((tickets_df['flags'].to_numpy() >> bit) & 1 == 1, index=tickets_df.index, name=name)
+
+
+def expand_tickets(compact):
+    """Inverse of compact_tickets: object strings and separate bool helper columns"""
+    expanded = compact.copy()
+
+    for column, id_format in compact.attrs.get('id_formats', {}).items():
+        if column in expanded.columns:
+            expanded[column] = decode_ids(expanded[column], id_format).to_numpy(dtype=object)
+
+    for column in expanded.columns:
+        if isinstance(expanded[column].dtype, pd.CategoricalDtype):
+            expanded[column] = expanded[column].astype(object)
+
+    if 'sla_met' in expanded.columns:
+        expanded['sla_met'] = expanded['sla_met'].astype(object).where(expanded['sla_met'].notna(), None)
+
+    if 'flags' in expanded.columns:
+        for column in FLAG_COLUMNS:
+            expanded[column] = ticket_flag(compact, column)
+        expanded = expanded.drop(columns='flags')
+        if 'csat_score' in expanded.columns:
+            expanded['csat_score_clean'] = expanded['csat_score'].fillna(0)
+
+    expanded.attrs = {}
+    return expanded
+
+# ============================================================================
+# MEMORY REPORT
+# ============================================================================
+
+def bytes_per_ticket(tickets_df):
+    """Deep memory usage per column, in bytes per ticket"""
+    return tickets_df.memory_usage(deep=True, index=False) / max(len(tickets_df), 1)
+
+
+def memory_report(before, after):
+    """Per-column bytes/ticket before and after compaction, with a total row"""
+    report = pd.DataFrame({
+        'before': bytes_per_ticket(before),
+        'after': bytes_per_ticket(after),
+    })
+    report.loc['TOTAL'] = report.sum()
+    report['saved_pct'] = ((1 - report['after'] / report['before']) * 100).round(1)
+    return report.round(2)
+
+
+if __name__ == "__main__":
+    from kpi_engine import make_benchmark_tickets
+    from transforms import prepare_tickets
+
+    parser = argparse.ArgumentParser(description="Memory report for the compact ticket schema")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="number of tickets to measure with")
+    parser.add_argument('--source', default="data/tickets 1.csv", help="ticket file to resample")
+    args = parser.parse_args()
+
+    raw = make_benchmark_tickets(args.source, args.rows)
+
+    # main.py: raw export as loaded in STEP 1 (load_tickets dtypes)
+    loaded = downcast_integers(raw.astype(TICKET_LOAD_DTYPES))
+    load_total = memory_report(raw, loaded).loc['TOTAL']
+
+    # app.py: enriched tickets as held by the dashboard
+    tickets = prepare_tickets(raw.copy())
+    compact = compact_tickets(tickets)
+    report = memory_report(tickets, compact)
+
+    print(f"Memory per ticket, {len(tickets):,} enriched tickets (bytes):")
+    print()
+    print(report.fillna('-').to_string())
+    print()
+    for label, total in [('main.py load (raw columns)', load_total), ('compact enriched frame', report.loc['TOTAL'])]:
+        print(f"[OK] {label:.<30} {total['before']:.0f} -> {total['after']:.0f} bytes/ticket "
+              f"({total['before'] * len(tickets) / 1e6:,.0f} MB -> {total['after'] * len(tickets) / 1e6:,.0f} MB)")
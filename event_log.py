@@ -0,0 +1,335 @@
+"""
+Ticket Event Log for Support Operations Reporting System
+Append-only ticket change records compacted into a latest-state table keyed by ticket_id
+
+The source system appends one change record per ticket update to a CSV file:
+the ticket's full row after the change (the columns of the ticket export),
+plus an optional `op` field where "delete" removes the ticket. A snapshot
+export such as data/tickets 1.csv is therefore also a valid change stream.
+The `op` field does not have to be in the header: when it is not, a record
+may carry it as one extra trailing field ("...,delete"), so a log seeded from
+a plain snapshot export can still receive deletes. A missing or empty `op`
+means upsert.
+
+Each run ingests only the bytes appended to the source since the previous run
+and stores them as a new immutable log segment. A hash index maps every live
+ticket_id to the position of its latest record (in the compacted base table
+or in a segment), so the latest state is one positional take over the base
+and the segments, without sorting or deduplicating the history. Once the
+segments hold more than COMPACT_RATIO records per live ticket (or
+MAX_SEGMENTS segments), they are folded into a new base table and deleted.
+
+State lives in outputs/.event_log/:
+    base_<n>.pkl          latest state as of compaction n (load_tickets dtypes)
+    segment_<n>.csv       change records of one ingest, as appended to the source
+    log_state.pkl         hash index, source offset, segment list and sequence numbers
+
+log_state.pkl is replaced atomically after the files it refers to are written,
+so an interrupted run leaves the previous state intact. The last sequence
+number of the log acknowledged by a completed pipeline run is kept as well:
+ticket ids changed since then drive incremental runs (main.py --events).
+"""
+
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from compact_schema import TICKET_LOAD_DTYPES, downcast_integers
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+LOG_DIR_NAME = ".event_log"
+STATE_FILE = "log_state.pkl"
+
+OP_COLUMN = 'op'
+DELETE_OP = 'delete'
+
+# Compact once the segments hold this many records per live ticket
+COMPACT_RATIO = 0.25
+
+# ... or once there are this many segments
+MAX_SEGMENTS = 30
+
+LOG_VERSION = 1
+
+# Index position of records held in the base table
+BASE_SEGMENT = -1
+
+# ============================================================================
+# STATE
+# ============================================================================
+
+def log_dir(output_dir):
+    return os.path.join(output_dir, LOG_DIR_NAME)
+
+
+def _empty_state():
+    return {
+        'version': LOG_VERSION,
+        'source': None,
+        'header': None,
+        'offset': 0,
+        'base': None,
+        'segments': [],
+        'next_file': 1,
+        'segment_records': 0,
+        # ticket_id -> segment (BASE_SEGMENT = base table), row and sequence number of its latest record
+        'index': pd.DataFrame(
+            {'segment': pd.Series(dtype=np.int64), 'row': pd.Series(dtype=np.int64),
+             'seq': pd.Series(dtype=np.int64)},
+            index=pd.Index([], dtype=object, name='ticket_id'),
+        ),
+        'seq': 0,
+        'acknowledged_seq': 0,
+        'compactions': 0,
+    }
+
+
+def load_log_state(directory):
+    """Stored log state, or a fresh one when there is none (or it is outdated)"""
+    path = os.path.join(directory, STATE_FILE)
+    if not os.path.exists(path):
+        return _empty_state()
+    state = pd.read_pickle(path)
+    return state if state.get('version') == LOG_VERSION else _empty_state()
+
+
+def _save_log_state(directory, state):
+    path = os.path.join(directory, STATE_FILE)
+    pd.to_pickle(state, path + ".tmp")
+    os.replace(path + ".tmp", path)
+
+
+def _remove_unreferenced(directory, state):
+    """Delete base tables and segments the current state no longer uses"""
+    keep = set(state['segments']) | {state['base'], STATE_FILE}
+    for name in os.listdir(directory):
+        if name not in keep and (name.startswith('base_') or name.startswith('segment_')):
+            os.remove(os.path.join(directory, name))
+
+# ============================================================================
+# INGEST
+# ============================================================================
+
+def read_new_records(source_path, state):
+    """Change records appended to the source since the stored offset.
+
+    Only whole lines are consumed; a partly written last line is left for the
+    next run. Returns (records, new offset, header).
+    """
+    with open(source_path, 'rb') as f:
+        header = f.readline()
+        if state['source'] is not None and (state['source'] != os.path.abspath(source_path)
+                                            or state['header'] != header):
+            raise ValueError(
+                f"{source_path} is not the source this event log was built from; "
+                f"use --full-refresh to rebuild the log"
+            )
+        offset = max(state['offset'], len(header))
+        if os.path.getsize(source_path) < offset:
+            raise ValueError(f"{source_path} is shorter than the ingested part: it was truncated or replaced")
+
+        f.seek(offset)
+        data = f.read()
+
+    data = data[:data.rfind(b'\n') + 1]
+    if not data.strip():
+        return None, offset, header
+
+    # Without an op column in the header, a trailing extra field is the op
+    columns = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+    names = columns if OP_COLUMN in columns else columns + [OP_COLUMN]
+    records = pd.read_csv(io.BytesIO(data), header=None, names=names, dtype=TICKET_LOAD_DTYPES)
+    if OP_COLUMN not in columns and records[OP_COLUMN].isna().all():
+        records = records.drop(columns=[OP_COLUMN])
+    return records, offset + len(data), header
+
+
+def ingest_events(source_path, output_dir, full_refresh=False, compact_ratio=COMPACT_RATIO,
+                  max_segments=MAX_SEGMENTS):
+    """Append the new change records of `source_path` to the log, compacting when due.
+
+    Returns a dict with ingest statistics: 'records' read, 'upserts',
+    'deletes', 'new_tickets', 'live_tickets', 'segments' and 'compacted'.
+    """
+    directory = log_dir(output_dir)
+    os.makedirs(directory, exist_ok=True)
+    state = _empty_state() if full_refresh else load_log_state(directory)
+
+    records, offset, header = read_new_records(source_path, state)
+    stats = {'records': 0, 'upserts': 0, 'deletes': 0, 'new_tickets': 0}
+    pending = {}
+
+    if records is not None:
+        name = f"segment_{state['next_file']:06d}.csv"
+        pending[name] = records
+        segment = len(state['segments'])
+        seqs = state['seq'] + 1 + np.arange(len(records), dtype=np.int64)
+
+        ops = records[OP_COLUMN].astype(str).str.lower() if OP_COLUMN in records.columns else None
+        is_delete = (ops == DELETE_OP).to_numpy() if ops is not None else np.zeros(len(records), dtype=bool)
+
+        # Last record of each ticket in this segment wins
+        ticket_ids = records['ticket_id'].astype(str).to_numpy()
+        last = ~pd.Series(ticket_ids).duplicated(keep='last').to_numpy()
+
+        index = state['index']
+        position = index.index.get_indexer(ticket_ids[last])
+        rows = np.flatnonzero(last)
+        upsert = ~is_delete[last]
+
+        # Point tickets already indexed at their new record, append new ones in arrival order
+        update = (position >= 0) & upsert
+        located = index[['segment', 'row', 'seq']].to_numpy()
+        located[position[update]] = np.column_stack([
+            np.full(update.sum(), segment), rows[update], seqs[last][update]
+        ])
+        added = (position < 0) & upsert
+        index = pd.concat([
+            pd.DataFrame(located, columns=['segment', 'row', 'seq'], index=index.index),
+            pd.DataFrame(
+                {'segment': segment, 'row': rows[added], 'seq': seqs[last][added]},
+                index=pd.Index(ticket_ids[last][added], name='ticket_id'),
+            ),
+        ])
+        index = index[~index.index.isin(ticket_ids[last][~upsert])]
+
+        state.update({
+            'source': os.path.abspath(source_path),
+            'header': header,
+            'segments': state['segments'] + [name],
+            'next_file': state['next_file'] + 1,
+            'index': index,
+            'seq': int(seqs[-1]),
+            'segment_records': state['segment_records'] + len(records),
+        })
+        stats.update({
+            'records': len(records),
+            'upserts': int(upsert.sum()),
+            'deletes': int((~upsert).sum()),
+            'new_tickets': int(added.sum()),
+        })
+    state['offset'] = offset
+
+    due = (state['segment_records'] > compact_ratio * max(len(state['index']), 1)
+           or len(state['segments']) > max_segments)
+    compacted = bool(state['segments']) and due
+    if compacted:
+        # The new records go straight into the base table
+        state = _compact(directory, state, pending)
+    else:
+        for name, frame in pending.items():
+            frame.to_csv(os.path.join(directory, name), index=False)
+
+    _save_log_state(directory, state)
+    _remove_unreferenced(directory, state)
+
+    stats.update({
+        'live_tickets': len(state['index']),
+        'segments': len(state['segments']),
+        'compacted': compacted,
+    })
+    return stats
+
+# ============================================================================
+# LATEST STATE
+# ============================================================================
+
+def _read_segment(directory, name):
+    records = pd.read_csv(os.path.join(directory, name), dtype=TICKET_LOAD_DTYPES)
+    return records.drop(columns=[OP_COLUMN], errors='ignore')
+
+
+def _materialize(directory, state, pending=None):
+    """Latest row of every live ticket, in first-seen order.
+
+    pending: segments not written yet (file name -> records).
+    """
+    pending = pending or {}
+    index = state['index']
+    parts, offsets = [], {}
+    total = 0
+    sources = ([(BASE_SEGMENT, state['base'])] if state['base'] else []) + list(enumerate(state['segments']))
+    for segment, name in sources:
+        if segment == BASE_SEGMENT:
+            frame = pd.read_pickle(os.path.join(directory, name))
+        elif name in pending:
+            frame = pending[name].drop(columns=[OP_COLUMN], errors='ignore')
+        else:
+            frame = _read_segment(directory, name)
+        parts.append(frame)
+        offsets[segment] = total
+        total += len(frame)
+
+    if not parts:
+        return pd.DataFrame()
+
+    segment_offset = pd.Series(offsets).reindex(index['segment']).to_numpy()
+    records = pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+    latest = records.take(segment_offset + index['row'].to_numpy())
+    dtypes = {column: dtype for column, dtype in TICKET_LOAD_DTYPES.items() if column in latest.columns}
+    return downcast_integers(latest.reset_index(drop=True).astype(dtypes))
+
+
+def _compact(directory, state, pending=None):
+    """Fold the segments into a new base table; returns the new state"""
+    latest = _materialize(directory, state, pending)
+    name = f"base_{state['next_file']:06d}.pkl"
+    latest.to_pickle(os.path.join(directory, name))
+
+    index = state['index'].assign(segment=BASE_SEGMENT, row=np.arange(len(latest), dtype=np.int64))
+    return {
+        **state,
+        'base': name,
+        'segments': [],
+        'segment_records': 0,
+        'next_file': state['next_file'] + 1,
+        'index': index,
+        'compactions': state['compactions'] + 1,
+    }
+
+
+def latest_tickets(output_dir):
+    """The compacted latest-state table: one row per live ticket, as load_tickets returns"""
+    directory = log_dir(output_dir)
+    return _materialize(directory, load_log_state(directory))
+
+
+def lookup_ticket(output_dir, ticket_id):
+    """Latest record of one ticket via the hash index (None when unknown or deleted)"""
+    directory = log_dir(output_dir)
+    state = load_log_state(directory)
+    if str(ticket_id) not in state['index'].index:
+        return None
+
+    segment, row = (int(value) for value in state['index'].loc[str(ticket_id), ['segment', 'row']])
+    if segment == BASE_SEGMENT:
+        frame = pd.read_pickle(os.path.join(directory, state['base']))
+    else:
+        frame = _read_segment(directory, state['segments'][segment])
+    return frame.iloc[row]
+
+# ============================================================================
+# PIPELINE HAND-OFF
+# ============================================================================
+
+def changed_since_acknowledged(output_dir):
+    """Ticket ids upserted since the last acknowledged run.
+
+    Returns (ticket ids, log sequence number to acknowledge afterwards).
+    """
+    state = load_log_state(log_dir(output_dir))
+    index = state['index']
+    return index.index[index['seq'] > state['acknowledged_seq']].to_numpy(), state['seq']
+
+
+def acknowledge(output_dir, seq):
+    """Record that a pipeline run has processed the log up to `seq`"""
+    directory = log_dir(output_dir)
+    state = load_log_state(directory)
+    state['acknowledged_seq'] = max(state['acknowledged_seq'], seq)
+    _save_log_state(directory, state)
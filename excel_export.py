@@ -0,0 +1,345 @@
+"""
+Excel Management Packs for Support Operations Reporting System
+One formatted multi-sheet workbook per month, streamed in constant memory
+
+Each pack (outputs/exports/management_pack_<month>.xlsx) holds:
+
+    Summary     the month's headline KPIs against the previous month, and SLA,
+                CSAT and volume by hub and by function (from the rollup cube)
+    KPIs        kpi_monthly_summary rows of the month
+    Agents      agent_performance rows of the month
+    Tickets     every ticket created in the month (continued on "Tickets 2",
+                ... past Excel's 1,048,576-row sheet limit)
+
+Workbooks are written with xlsxwriter in constant_memory mode: each row is
+flushed to the sheet's temporary file as soon as the next one starts, so
+memory does not grow with the number of rows. Ticket details are read from
+tickets_master.csv in chunks of CHUNK_SIZE rows in a single pass that feeds
+the packs of every requested month at once. Cell formats are set per column,
+and datetimes are written as Excel serial numbers computed a chunk at a time.
+
+A pack is written under a .tmp name and renamed into place when complete.
+Used by main.py --excel-packs and by the dashboard's Management Summary
+download (built in a background thread, not while the page renders).
+
+Requires xlsxwriter (optional dependency); XLSX_AVAILABLE is False without it.
+"""
+
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+from rollup_cube import read_rollup_cube, cube_lookup, ROLLUP_ALL
+
+try:
+    import xlsxwriter
+    XLSX_AVAILABLE = True
+except ImportError:
+    XLSX_AVAILABLE = False
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+EXPORT_DIR_NAME = "exports"
+
+# Tickets read from tickets_master.csv per chunk
+CHUNK_SIZE = 100_000
+
+# Data rows per ticket sheet (Excel's limit, less the header row)
+MAX_SHEET_ROWS = 1_048_575
+
+# Excel's day zero for serial datetimes
+EXCEL_EPOCH = pd.Timestamp('1899-12-30')
+
+# Number formats by column kind
+NUMBER_FORMATS = {
+    'text': None,
+    'count': '#,##0',
+    'hours': '#,##0.0',
+    'pct': '0.0"%"',
+    'score': '0.00',
+    'datetime': 'yyyy-mm-dd hh:mm',
+    'flag': None,
+}
+COLUMN_WIDTHS = {'text': 14, 'count': 11, 'hours': 12, 'pct': 11, 'score': 9, 'datetime': 17, 'flag': 9}
+
+# (source column, header, kind) per sheet
+KPI_SHEET_COLUMNS = [
+    ('year_month', 'Month', 'text'), ('hub', 'Hub', 'text'), ('function', 'Function', 'text'),
+    ('total_tickets', 'Total Tickets', 'count'),
+    ('tickets_critical', 'Critical', 'count'), ('tickets_high', 'High', 'count'),
+    ('tickets_medium', 'Medium', 'count'), ('tickets_low', 'Low', 'count'),
+    ('tickets_email', 'Email', 'count'), ('tickets_portal', 'Portal', 'count'),
+    ('tickets_phone', 'Phone', 'count'), ('tickets_chat', 'Chat', 'count'),
+    ('sla_compliance_pct', 'SLA Compliance %', 'pct'),
+    ('avg_resolution_time_hours', 'Avg Resolution (hrs)', 'hours'),
+    ('backlog_count', 'Backlog', 'count'), ('reopen_rate_pct', 'Reopen Rate %', 'pct'),
+    ('csat_avg_score', 'Avg CSAT', 'score'), ('csat_responses', 'CSAT Responses', 'count'),
+]
+AGENT_SHEET_COLUMNS = [
+    ('month', 'Month', 'text'), ('agent_id', 'Agent ID', 'text'), ('hub', 'Hub', 'text'),
+    ('function', 'Function', 'text'), ('tickets_handled', 'Tickets Handled', 'count'),
+    ('total_working_hours', 'Total Hours', 'hours'), ('ticket_work_hours', 'Ticket Work Hours', 'hours'),
+    ('utilization_pct', 'Utilization %', 'pct'), ('avg_hours_per_ticket', 'Avg Hours/Ticket', 'hours'),
+]
+TICKET_SHEET_COLUMNS = [
+    ('ticket_id', 'Ticket ID', 'text'), ('hub', 'Hub', 'text'), ('function', 'Function', 'text'),
+    ('channel', 'Channel', 'text'), ('priority', 'Priority', 'text'), ('category', 'Category', 'text'),
+    ('status', 'Status', 'text'), ('assigned_agent_id', 'Agent', 'text'),
+    ('created_datetime', 'Created', 'datetime'), ('resolved_datetime', 'Resolved', 'datetime'),
+    ('resolution_time_hours', 'Resolution (hrs)', 'hours'), ('sla_met', 'SLA Met', 'flag'),
+    ('csat_score', 'CSAT', 'score'), ('reopened_flag', 'Reopened', 'count'),
+]
+# KPIs of the Summary sheet: (KPI column, label, kind)
+SUMMARY_KPIS = [
+    ('total_tickets', 'Total Tickets', 'count'),
+    ('backlog_count', 'Backlog', 'count'),
+    ('sla_compliance_pct', 'SLA Compliance %', 'pct'),
+    ('avg_resolution_time_hours', 'Avg Resolution (hrs)', 'hours'),
+    ('reopen_rate_pct', 'Reopen Rate %', 'pct'),
+    ('csat_avg_score', 'Avg CSAT', 'score'),
+    ('csat_responses', 'CSAT Responses', 'count'),
+]
+
+
+def export_dir(output_dir):
+    return os.path.join(output_dir, EXPORT_DIR_NAME)
+
+
+def pack_name(month, hub=ROLLUP_ALL, function=ROLLUP_ALL):
+    """File name of one month's pack (hub/function appended when filtered)"""
+    selection = ''.join(f"_{value}" for value in (hub, function) if value != ROLLUP_ALL)
+    return f"management_pack_{month}{selection}.xlsx"
+
+# ============================================================================
+# SHEET WRITING
+# ============================================================================
+
+class PackWriter:
+    """One month's workbook, open while the ticket chunks stream through"""
+
+    def __init__(self, path):
+        self.path = path
+        self.workbook = xlsxwriter.Workbook(path + ".tmp", {'constant_memory': True})
+        self.header = self.workbook.add_format({
+            'bold': True, 'bg_color': '#1f4e79', 'font_color': '#ffffff', 'border': 1, 'text_wrap': True,
+        })
+        self.title = self.workbook.add_format({'bold': True, 'font_size': 14})
+        self.bold = self.workbook.add_format({'bold': True})
+        self.formats = {
+            kind: self.workbook.add_format({'num_format': spec}) if spec else None
+            for kind, spec in NUMBER_FORMATS.items()
+        }
+        self.ticket_sheets = 0
+        self.ticket_sheet = None
+        self.ticket_row = 0
+        self.tickets = 0
+
+    def add_table_sheet(self, name, columns):
+        """New sheet with formatted columns and a frozen, filterable header row"""
+        sheet = self.workbook.add_worksheet(name)
+        for position, (_, header, kind) in enumerate(columns):
+            sheet.set_column(position, position, max(COLUMN_WIDTHS[kind], len(header) + 2), self.formats[kind])
+        sheet.write_row(0, 0, [header for _, header, _ in columns], self.header)
+        sheet.freeze_panes(1, 0)
+        return sheet
+
+    def write_table(self, name, columns, frame):
+        sheet = self.add_table_sheet(name, columns)
+        self._write_rows(sheet, 1, _cell_values(frame, columns))
+        sheet.autofilter(0, 0, max(len(frame), 1), len(columns) - 1)
+
+    def _write_rows(self, sheet, first_row, values):
+        for offset, row in enumerate(values):
+            sheet.write_row(first_row + offset, 0, row)
+
+    def append_tickets(self, values):
+        """Stream ticket rows onto the Tickets sheet(s), starting a new sheet at MAX_SHEET_ROWS"""
+        start = 0
+        while start < len(values):
+            if self.ticket_sheet is None or self.ticket_row > MAX_SHEET_ROWS:
+                self._next_ticket_sheet()
+            stop = start + min(len(values) - start, MAX_SHEET_ROWS + 1 - self.ticket_row)
+            self._write_rows(self.ticket_sheet, self.ticket_row, values[start:stop])
+            self.ticket_row += stop - start
+            start = stop
+        self.tickets += len(values)
+
+    def _next_ticket_sheet(self):
+        self._finish_ticket_sheet()
+        self.ticket_sheets += 1
+        name = "Tickets" if self.ticket_sheets == 1 else f"Tickets {self.ticket_sheets}"
+        self.ticket_sheet = self.add_table_sheet(name, TICKET_SHEET_COLUMNS)
+        self.ticket_row = 1
+
+    def _finish_ticket_sheet(self):
+        if self.ticket_sheet is not None:
+            self.ticket_sheet.autofilter(0, 0, max(self.ticket_row - 1, 1), len(TICKET_SHEET_COLUMNS) - 1)
+
+    def close(self):
+        if self.ticket_sheet is None:
+            self._next_ticket_sheet()
+        self._finish_ticket_sheet()
+        self.workbook.close()
+        os.replace(self.path + ".tmp", self.path)
+
+
+def _cell_values(frame, columns):
+    """Rows of `frame` as lists of cell values: datetimes as Excel serials, missing values as None"""
+    cells = []
+    for column, _, kind in columns:
+        values = frame[column]
+        if kind == 'datetime':
+            values = (pd.to_datetime(values) - EXCEL_EPOCH) / pd.Timedelta(days=1)
+        elif kind == 'flag':
+            # True/False (and missing) whether read as bool or as text
+            values = values.map({True: True, False: False, 'True': True, 'False': False})
+        cells.append(values.to_numpy(dtype=object))
+    if not cells:
+        return []
+    table = np.column_stack(cells) if len(frame) else np.empty((0, len(columns)), dtype=object)
+    table[pd.isna(table)] = None
+    return table.tolist()
+
+# ============================================================================
+# SUMMARY SHEET
+# ============================================================================
+
+def write_summary_sheet(pack, cube, month, hub, function):
+    """Headline KPIs of the month vs. the previous one, then breakdowns by hub and by function"""
+    sheet = pack.workbook.add_worksheet("Summary")
+    sheet.set_column(0, 0, 24)
+    sheet.set_column(1, 6, 16)
+
+    monthly = cube_lookup(cube, hub=hub, function=function, by='year_month').set_index('year_month')
+    months = list(monthly.index)
+    previous = months[months.index(month) - 1] if month in months and months.index(month) > 0 else None
+
+    sheet.write(0, 0, f"Management Summary - {month}", pack.title)
+    sheet.write(1, 0, f"Hub: {hub} | Function: {function}")
+    row = 3
+    sheet.write_row(row, 0, ['KPI', month, previous or 'Previous month', 'Change'], pack.header)
+    for column, label, kind in SUMMARY_KPIS:
+        row += 1
+        current_value = monthly[column].get(month)
+        previous_value = monthly[column].get(previous) if previous else None
+        change = None
+        if current_value is not None and previous_value is not None and not pd.isna(previous_value):
+            change = round(current_value - previous_value, 2)
+        sheet.write(row, 0, label, pack.bold)
+        for position, value in enumerate((current_value, previous_value, change), start=1):
+            if value is not None and not pd.isna(value):
+                sheet.write_number(row, position, float(value), pack.formats[kind])
+
+    breakdown_columns = [
+        ('total_tickets', 'Tickets', 'count'), ('sla_compliance_pct', 'SLA Compliance %', 'pct'),
+        ('avg_resolution_time_hours', 'Avg Resolution (hrs)', 'hours'), ('backlog_count', 'Backlog', 'count'),
+        ('csat_avg_score', 'Avg CSAT', 'score'),
+    ]
+    for key, title in (('hub', 'By Hub'), ('function', 'By Function')):
+        breakdown = cube_lookup(cube, year_month=month, hub=hub, function=function, by=key)
+        selected = hub if key == 'hub' else function
+        if selected != ROLLUP_ALL:
+            breakdown = breakdown[breakdown[key] == selected]
+        row += 2
+        sheet.write(row, 0, title, pack.bold)
+        row += 1
+        sheet.write_row(row, 0, [key.title()] + [header for _, header, _ in breakdown_columns], pack.header)
+        for values in _cell_values(breakdown, [(key, key, 'text')] + breakdown_columns):
+            row += 1
+            sheet.write(row, 0, values[0])
+            for position, ((_, _, kind), value) in enumerate(zip(breakdown_columns, values[1:]), start=1):
+                if value is not None:
+                    sheet.write_number(row, position, value, pack.formats[kind])
+
+# ============================================================================
+# PACKS
+# ============================================================================
+
+def _select(frame, hub, function, month_column, months):
+    rows = frame[frame[month_column].astype(str).isin(months)]
+    if hub != ROLLUP_ALL:
+        rows = rows[rows['hub'].astype(str) == hub]
+    if function != ROLLUP_ALL:
+        rows = rows[rows['function'].astype(str) == function]
+    return rows
+
+
+def write_management_packs(output_dir, months=None, hub=ROLLUP_ALL, function=ROLLUP_ALL, target_dir=None,
+                           chunk_size=CHUNK_SIZE):
+    """Write one management pack per month from the saved outputs.
+
+    months: YYYY-MM months to export (default: every month with tickets)
+    hub/function: optional selection ("All" = everything)
+    target_dir: where the packs go (default outputs/exports/)
+    Returns a dict with 'paths' (month -> workbook), 'tickets' (month -> detail
+    rows written) and 'unknown' (requested months without tickets, skipped).
+    """
+    cube = read_rollup_cube(output_dir)
+    available = sorted(value for value in cube.index.get_level_values('year_month').unique() if value != ROLLUP_ALL)
+    requested = available if months is None else list(dict.fromkeys(str(month) for month in months))
+    unknown = [month for month in requested if month not in available]
+    months = [month for month in requested if month in available]
+
+    target_dir = target_dir or export_dir(output_dir)
+    os.makedirs(target_dir, exist_ok=True)
+    kpis = pd.read_csv(os.path.join(output_dir, "kpi_monthly_summary.csv"), dtype={'year_month': str})
+    agents = pd.read_csv(os.path.join(output_dir, "agent_performance.csv"), dtype={'month': str})
+
+    packs = {}
+    try:
+        for month in months:
+            pack = PackWriter(os.path.join(target_dir, pack_name(month, hub, function)))
+            packs[month] = pack
+            # A fixed creation date keeps the file byte-identical while the data is unchanged
+            pack.workbook.set_properties({
+                'title': f"Management pack {month}", 'created': pd.Timestamp(month).to_pydatetime(),
+            })
+            write_summary_sheet(pack, cube, month, hub, function)
+            pack.write_table("KPIs", KPI_SHEET_COLUMNS, _select(kpis, hub, function, 'year_month', [month]))
+            pack.write_table("Agents", AGENT_SHEET_COLUMNS, _select(agents, hub, function, 'month', [month]))
+
+        if packs:
+            # One pass over the ticket details feeds every month's Tickets sheet
+            columns = [column for column, _, _ in TICKET_SHEET_COLUMNS] + ['year_month']
+            reader = pd.read_csv(os.path.join(output_dir, "tickets_master.csv"), usecols=columns,
+                                 dtype={'year_month': str, 'ticket_id': str, 'assigned_agent_id': str},
+                                 chunksize=chunk_size)
+            for chunk in reader:
+                chunk = _select(chunk, hub, function, 'year_month', months)
+                for month, rows in chunk.groupby('year_month', sort=False):
+                    packs[month].append_tickets(_cell_values(rows, TICKET_SHEET_COLUMNS))
+
+        for pack in packs.values():
+            pack.close()
+    except BaseException:
+        for pack in packs.values():
+            if os.path.exists(pack.path + ".tmp"):
+                os.remove(pack.path + ".tmp")
+        raise
+
+    return {
+        'paths': {month: pack.path for month, pack in packs.items()},
+        'tickets': {month: pack.tickets for month, pack in packs.items()},
+        'unknown': unknown,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write monthly Excel management packs from the pipeline outputs")
+    parser.add_argument('months', nargs='*', help="months to export, e.g. 2025-11 (default: all)")
+    parser.add_argument('--output-dir', default="outputs", help="pipeline output directory")
+    parser.add_argument('--hub', default=ROLLUP_ALL, help="only this hub")
+    parser.add_argument('--function', default=ROLLUP_ALL, help="only this function")
+    args = parser.parse_args()
+
+    if not XLSX_AVAILABLE:
+        raise SystemExit("xlsxwriter is not installed (pip install xlsxwriter)")
+    export = write_management_packs(args.output_dir, args.months or None, args.hub, args.function)
+    for month, path in export['paths'].items():
+        print(f"[OK] Saved: {path} ({export['tickets'][month]:,} tickets)")
+    for month in export['unknown']:
+        print(f"[WARNING] No tickets for {month} - no pack written")
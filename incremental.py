@@ -0,0 +1,355 @@
+"""
+Incremental KPI Recomputation for Support Operations Reporting System
+Recomputes only the (year_month, hub, function) partitions touched by new or changed tickets
+
+State is kept next to the outputs in outputs/.incremental/:
+    ticket_index.pkl   ticket_id, row hash, open flag and partition of every ticket seen
+    kpi_partials.csv   additive KPI counters per partition (kpi_engine.PARTIAL_COLUMNS)
+    sketches.csv       resolution-time sketch buckets per partition and priority
+    backlog_events.csv backlog event deltas per partition, priority and day
+    agent_counts.csv   tickets handled per agent/hub/function/month
+    state.json         created_datetime watermark, SLA clock and run metadata
+
+Change detection is driven by a created_datetime watermark. Only three kinds of
+rows are hashed and compared against the index: tickets created within
+lookback_days of the previous watermark, tickets that were still open on the
+previous run, and ticket ids never seen before. Older closed tickets are treated
+as frozen. The touched partitions are then re-enriched and re-aggregated from
+scratch and spliced into the stored partials and the output CSVs.
+"""
+
+import json
+import os
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from transforms import prepare_tickets, BACKLOG_STATUSES
+from kpi_engine import KPI_KEYS, compute_kpi_partials, finalize_kpis, summarize_partials
+from agent_metrics import count_agent_tickets, compute_agent_performance
+from rollup_cube import write_rollup_cube
+from quantile_sketch import SKETCH_KEYS, compute_sketch_partials, write_sketches
+from backlog_timeline import BACKLOG_EVENT_KEYS, compute_backlog_events, write_backlog_timeline
+from columnar_store import PARQUET_AVAILABLE, write_store, update_store, load_metadata
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+STATE_DIR_NAME = ".incremental"
+
+# Tickets created this many days before the watermark are still re-checked
+LOOKBACK_DAYS = 35
+
+STATE_VERSION = 3
+
+# ============================================================================
+# STATE HELPERS
+# ============================================================================
+
+def _state_paths(output_dir):
+    state_dir = os.path.join(output_dir, STATE_DIR_NAME)
+    return {
+        'dir': state_dir,
+        'index': os.path.join(state_dir, "ticket_index.pkl"),
+        'partials': os.path.join(state_dir, "kpi_partials.csv"),
+        'sketches': os.path.join(state_dir, "sketches.csv"),
+        'backlog_events': os.path.join(state_dir, "backlog_events.csv"),
+        'agent_counts': os.path.join(state_dir, "agent_counts.csv"),
+        'state': os.path.join(state_dir, "state.json"),
+    }
+
+
+def _load_state(paths, sla_clock):
+    """Return the stored state, or None when a full rebuild is needed"""
+    required = ('index', 'partials', 'sketches', 'backlog_events', 'agent_counts', 'state')
+    if not all(os.path.exists(paths[name]) for name in required):
+        return None
+
+    with open(paths['state']) as f:
+        state = json.load(f)
+    if state.get('version') != STATE_VERSION:
+        return None
+    # Stored partials were measured with the other clock
+    if state.get('sla_clock', 'wall') != sla_clock:
+        return None
+
+    # The index grows with history, so it is kept in a binary format
+    partition_dtypes = {key: str for key in KPI_KEYS}
+    state['index'] = pd.read_pickle(paths['index'])
+    state['partials'] = pd.read_csv(paths['partials'], dtype=partition_dtypes, keep_default_na=False)
+    state['sketches'] = pd.read_csv(
+        paths['sketches'], dtype={key: str for key in SKETCH_KEYS}, keep_default_na=False
+    )
+    state['backlog_events'] = pd.read_csv(
+        paths['backlog_events'], dtype={key: str for key in BACKLOG_EVENT_KEYS}, keep_default_na=False
+    )
+    state['agent_counts'] = pd.read_csv(
+        paths['agent_counts'],
+        dtype={'assigned_agent_id': str, 'hub': str, 'function': str, 'month': str},
+        keep_default_na=False
+    )
+    return state
+
+
+def _save_state(paths, index, partials, sketches, backlog_events, agent_counts, watermark, first_created,
+                tickets_seen, sla_clock):
+    os.makedirs(paths['dir'], exist_ok=True)
+    index.to_pickle(paths['index'])
+    partials.to_csv(paths['partials'], index=False)
+    sketches.to_csv(paths['sketches'], index=False)
+    backlog_events.to_csv(paths['backlog_events'], index=False)
+    agent_counts.to_csv(paths['agent_counts'], index=False)
+
+    # state.json is written last, so an interrupted run triggers a rebuild
+    with open(paths['state'], 'w') as f:
+        json.dump({
+            'version': STATE_VERSION,
+            'watermark': str(watermark),
+            'first_created': str(first_created),
+            'tickets_seen': int(tickets_seen),
+            'sla_clock': sla_clock,
+            'updated_at': datetime.now().isoformat(timespec='seconds'),
+        }, f, indent=2)
+
+# ============================================================================
+# CHANGE DETECTION
+# ============================================================================
+
+def hash_ticket_rows(tickets_raw):
+    """Stable 64-bit content hash of each raw ticket row"""
+    return pd.util.hash_pandas_object(tickets_raw, index=False).to_numpy(np.uint64)
+
+
+def ticket_partitions(tickets_raw, created):
+    """(year_month, hub, function) of each raw ticket as strings ('' = no date)"""
+    # Format each distinct month once instead of every row
+    codes, months = pd.factorize(created.dt.to_period('M'))
+    labels = np.append(months.astype(str).to_numpy(object), '')
+    year_month = labels[codes]
+    return pd.DataFrame({
+        'year_month': year_month,
+        'hub': tickets_raw['hub'].astype(str).to_numpy(),
+        'function': tickets_raw['function'].astype(str).to_numpy(),
+    }, index=tickets_raw.index)
+
+
+def _in_partitions(frame, partitions):
+    """Boolean mask of rows whose partition keys are in `partitions`"""
+    if len(partitions) == 0:
+        return np.zeros(len(frame), dtype=bool)
+    keys = pd.MultiIndex.from_frame(frame[KPI_KEYS].astype(str))
+    return keys.isin(partitions)
+
+
+def _build_index(tickets_raw, hashes, partitions):
+    return pd.DataFrame({
+        'ticket_id': tickets_raw['ticket_id'].astype(str).to_numpy(),
+        'row_hash': hashes,
+        'is_open': tickets_raw['status'].isin(BACKLOG_STATUSES).to_numpy(),
+        **{key: partitions[key].to_numpy() for key in KPI_KEYS},
+    })
+
+# ============================================================================
+# OUTPUT SPLICING
+# ============================================================================
+
+def _splice_master(master_path, recomputed, touched, ticket_order):
+    """Replace the touched partitions of tickets_master.csv, keeping export order.
+
+    Untouched rows are copied as raw text lines; only the key columns and
+    created_datetime are parsed. Returns the first and last created_datetime
+    of the spliced master.
+    """
+    existing = pd.read_csv(master_path, usecols=['ticket_id', 'created_datetime', *KPI_KEYS],
+                           dtype=str, keep_default_na=False)
+    with open(master_path, newline='') as f:
+        header, *lines = f.read().splitlines(keepends=True)
+
+    if len(lines) != len(existing):
+        # Quoted line breaks inside fields: fall back to a parsed rewrite
+        master = pd.read_csv(master_path, dtype=str, keep_default_na=False)
+        lines = master.to_csv(index=False, header=False).splitlines(keepends=True)
+
+    keep = ~_in_partitions(existing, touched)
+    new_lines = recomputed.to_csv(index=False, header=False).splitlines(keepends=True)
+
+    spliced = np.concatenate([np.array(lines, dtype=object)[keep], np.array(new_lines, dtype=object)])
+    ids = np.concatenate([existing['ticket_id'].to_numpy()[keep], recomputed['ticket_id'].astype(str).to_numpy()])
+    position = pd.Index(ticket_order).get_indexer(ids)
+
+    with open(master_path, 'w', newline='') as f:
+        f.write(header)
+        f.write(''.join(spliced[np.argsort(position, kind='stable')]))
+
+    created = pd.concat([
+        pd.to_datetime(existing['created_datetime'][keep]), pd.to_datetime(recomputed['created_datetime'])
+    ])
+    return created.min(), created.max()
+
+# ============================================================================
+# INCREMENTAL RUN
+# ============================================================================
+
+def _write_outputs(output_dir, partials, sketches, backlog_events, agent_counts, effort_df):
+    kpi_summary = finalize_kpis(partials.sort_values(KPI_KEYS, ignore_index=True))
+    kpi_summary.to_csv(f"{output_dir}/kpi_monthly_summary.csv", index=False)
+    write_rollup_cube(output_dir, partials)
+    write_sketches(output_dir, sketches)
+    write_backlog_timeline(output_dir, backlog_events)
+
+    agent_performance = compute_agent_performance(effort_df, agent_counts)
+    agent_performance.to_csv(f"{output_dir}/agent_performance.csv", index=False)
+    return kpi_summary, agent_performance
+
+
+def run_incremental(tickets_raw, effort_df, output_dir, lookback_days=LOOKBACK_DAYS, full_refresh=False,
+                    sla_clock='wall', changed_ids=None):
+    """Bring the outputs in line with `tickets_raw`, recomputing only what changed.
+
+    tickets_raw is the ticket export as read by pd.read_csv (not yet enriched).
+    Switching sla_clock between runs triggers a full rebuild.
+    changed_ids: ids of the tickets changed since the previous run, when the
+    caller knows them (event_log); only those rows are then hashed and
+    compared, instead of the watermark/open/unseen candidates.
+    Returns a dict with run statistics and the summary figures for STEP 5.
+    """
+    paths = _state_paths(output_dir)
+    state = None if full_refresh else _load_state(paths, sla_clock)
+    master_path = f"{output_dir}/tickets_master.csv"
+
+    created = pd.to_datetime(tickets_raw['created_datetime'])
+    partitions = ticket_partitions(tickets_raw, created)
+
+    if state is None or not os.path.exists(master_path):
+        # Full rebuild: enrich everything once and seed the state
+        tickets_df = prepare_tickets(tickets_raw.copy(), sla_clock)
+        tickets_df.to_csv(master_path, index=False)
+
+        partials = compute_kpi_partials(tickets_df)
+        partials['year_month'] = partials['year_month'].astype(str)
+        sketches = compute_sketch_partials(tickets_df)
+        backlog_events = compute_backlog_events(tickets_df)
+        agent_counts = count_agent_tickets(tickets_df)
+        index = _build_index(tickets_raw, hash_ticket_rows(tickets_raw), partitions)
+
+        mode = 'full'
+        changed_count, deleted_count = len(tickets_raw), 0
+        touched_count = len(partials)
+        first_created, watermark = created.min(), created.max()
+    else:
+        index = state['index']
+        watermark = pd.Timestamp(state['watermark'])
+        ticket_ids = tickets_raw['ticket_id'].astype(str)
+
+        if changed_ids is not None:
+            candidates = ticket_ids.isin(changed_ids).to_numpy()
+        else:
+            # Rows worth re-checking: recent, previously open, or never seen
+            open_ids = index.loc[index['is_open'], 'ticket_id']
+            candidates = (
+                (created > watermark - pd.Timedelta(days=lookback_days)).to_numpy()
+                | ticket_ids.isin(open_ids).to_numpy()
+                | ~ticket_ids.isin(index['ticket_id']).to_numpy()
+            )
+        candidate_rows = tickets_raw[candidates]
+        candidate_hashes = hash_ticket_rows(candidate_rows)
+
+        position = pd.Index(index['ticket_id']).get_indexer(ticket_ids[candidates])
+        previous_hash = index['row_hash'].to_numpy()[position]
+        changed = (position < 0) | (previous_hash != candidate_hashes)
+        changed_ids = ticket_ids[candidates][changed]
+        deleted = ~index['ticket_id'].isin(ticket_ids)
+
+        # Partitions affected by the new version or the previous version of a ticket
+        previous = index[index['ticket_id'].isin(changed_ids) | deleted]
+        touched = pd.MultiIndex.from_frame(
+            pd.concat([partitions[candidates][changed], previous[KPI_KEYS]], ignore_index=True)
+        ).unique()
+
+        # Re-enrich and re-aggregate the touched partitions only
+        in_touched = _in_partitions(partitions, touched)
+        recomputed = prepare_tickets(tickets_raw[in_touched].copy(), sla_clock)
+
+        new_partials = compute_kpi_partials(recomputed)
+        new_partials['year_month'] = new_partials['year_month'].astype(str)
+        partials = state['partials']
+        partials = pd.concat([partials[~_in_partitions(partials, touched)], new_partials], ignore_index=True)
+        sketches = state['sketches']
+        sketches = pd.concat(
+            [sketches[~_in_partitions(sketches, touched)], compute_sketch_partials(recomputed)],
+            ignore_index=True
+        )
+        backlog_events = state['backlog_events']
+        backlog_events = pd.concat(
+            [backlog_events[~_in_partitions(backlog_events, touched)], compute_backlog_events(recomputed)],
+            ignore_index=True
+        )
+
+        agent_counts = state['agent_counts']
+        counts_partition = agent_counts.rename(columns={'month': 'year_month'})
+        agent_counts = pd.concat(
+            [agent_counts[~_in_partitions(counts_partition, touched)], count_agent_tickets(recomputed)],
+            ignore_index=True
+        )
+
+        # The date range follows the spliced master, so it also shrinks after deletes and corrections
+        if len(touched) > 0:
+            first_created, watermark = _splice_master(master_path, recomputed, touched, ticket_ids)
+        else:
+            first_created, watermark = pd.Timestamp(state['first_created']), watermark
+
+        # Update the hash index for changed and deleted tickets
+        changed_rows = candidate_rows[changed]
+        index = pd.concat([
+            index[~(index['ticket_id'].isin(changed_ids) | deleted)],
+            _build_index(changed_rows, candidate_hashes[changed], partitions[candidates][changed]),
+        ], ignore_index=True)
+
+        mode = 'incremental'
+        changed_count, deleted_count = len(changed_ids), int(deleted.sum())
+        touched_count = len(touched)
+
+    partials = partials.sort_values(KPI_KEYS, ignore_index=True)
+    sketches = sketches.sort_values(SKETCH_KEYS + ['bucket'], ignore_index=True)
+    backlog_events = backlog_events.sort_values(BACKLOG_EVENT_KEYS, ignore_index=True)
+    agent_counts = agent_counts.sort_values(['month', 'hub', 'function', 'assigned_agent_id'], ignore_index=True)
+    kpi_summary, agent_performance = _write_outputs(
+        output_dir, partials, sketches, backlog_events, agent_counts, effort_df
+    )
+
+    # Keep the Parquet store (when there is one) in step with the CSVs
+    store = None
+    if mode == 'full' and PARQUET_AVAILABLE:
+        write_store(output_dir, tickets_df, kpi_summary, agent_performance)
+        store = 'rewritten'
+    elif mode == 'incremental' and load_metadata(output_dir) is not None:
+        update_store(output_dir, recomputed, touched, kpi_summary, agent_performance, first_created, watermark)
+        store = 'updated'
+
+    _save_state(
+        paths, index, partials, sketches, backlog_events, agent_counts, watermark, first_created, len(tickets_raw),
+        sla_clock
+    )
+
+    totals = summarize_partials(partials)
+    summary = {
+        'Total Tickets': totals.pop('Total Tickets'),
+        'Date Range': f"{first_created.date()} to {watermark.date()}",
+        'Hub A Tickets': totals.pop('Hub A Tickets'),
+        'Hub B Tickets': totals.pop('Hub B Tickets'),
+        'Unique Agents': agent_counts['assigned_agent_id'].nunique(),
+        **totals,
+    }
+
+    return {
+        'mode': mode,
+        'changed_tickets': changed_count,
+        'deleted_tickets': deleted_count,
+        'touched_partitions': touched_count,
+        'kpi_rows': len(kpi_summary),
+        'agent_rows': len(agent_performance),
+        'store': store,
+        'summary': summary,
+    }
@@ -0,0 +1,461 @@
+"""
+KPI Query API for Support Operations Reporting System
+Read-only async HTTP/JSON service over the pipeline outputs with ETags, gzip and a response cache
+
+Run with: python kpi_api.py [--host 127.0.0.1] [--port 8600]
+
+    GET /kpis         KPIs for a month/hub/function selection, "All" levels
+                      included (kpi_rollup_cube.csv, finalized as in
+                      kpi_monthly_summary.csv); ?by=year_month|hub|function
+                      returns one row per value of that key
+    GET /agents       agent performance rows of the selection (months, hubs
+                      and functions of the agent table, which may include
+                      months without tickets)
+    GET /management   management summary of one month (default: the latest
+                      with tickets): KPIs, change in volume against the
+                      previous month, SLA by hub and function, top agents
+    GET /health       output generation and the loaded months/hubs/functions
+
+Every data endpoint takes month (YYYY-MM), hub and function query parameters
+("All" or omitted = no filter). Responses are JSON.
+
+The outputs are read once per pipeline run, not per request: the service
+loads the cube and agent table when main.py writes a new manifest (a stat of
+_manifest.json per request notices it) and keeps serving the previous run
+until the new files match their checksums. Each response body is built once
+per output generation and query, then kept in an LRU cache, gzipped when the
+client accepts it. Its ETag is derived from the checksums of the outputs it
+is built from plus the normalized query, so it changes exactly when the
+answer can; polling clients that send If-None-Match get a bodiless 304.
+Bad queries get a 4xx with a JSON error; any other failure (a corrupt output
+file, an unexpected query error) is logged and answered with a JSON 500.
+
+Built on asyncio streams from the standard library (HTTP/1.1 keep-alive,
+GET and HEAD only); no web framework is needed.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import os
+from email.utils import formatdate
+from urllib.parse import urlsplit, parse_qs
+
+import pandas as pd
+
+from kpi_engine import KPI_KEYS
+from rollup_cube import read_rollup_cube, cube_lookup, CUBE_FILE, ROLLUP_ALL
+from bitmap_index import LRUCache, estimate_nbytes
+from output_manifest import (
+    ManifestMismatchError, MANIFEST_FILE, read_manifest, files_match, read_verified, artifact_fingerprint
+)
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+OUTPUT_DIR = "outputs"
+AGENT_FILE = "agent_performance.csv"
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8600
+
+# Memory budget for cached response bodies (plain and gzipped)
+CACHE_BYTES = 64 * 1024 * 1024
+
+# Smaller bodies are sent uncompressed
+GZIP_MIN_BYTES = 512
+GZIP_LEVEL = 6
+
+# Idle keep-alive connections are closed after this many seconds
+KEEPALIVE_TIMEOUT = 30
+
+# Longest accepted request or header line
+MAX_LINE_BYTES = 16 * 1024
+
+TOP_AGENTS = 5
+
+# Output files behind each endpoint (their checksums go into its ETags), and
+# the snapshot labels its month/hub/function parameters are validated against
+ENDPOINTS = {
+    '/kpis': {'artifacts': [CUBE_FILE], 'params': ['month', 'hub', 'function', 'by'], 'labels': 'labels'},
+    '/agents': {'artifacts': [AGENT_FILE], 'params': ['month', 'hub', 'function'], 'labels': 'agent_labels'},
+    '/management': {'artifacts': [CUBE_FILE, AGENT_FILE], 'params': ['month', 'hub', 'function'],
+                    'labels': 'labels'},
+}
+
+STATUS_TEXT = {
+    200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 500: 'Internal Server Error', 503: 'Service Unavailable',
+}
+
+logger = logging.getLogger(__name__)
+
+
+class RequestError(Exception):
+    """A request the API cannot answer; carries the HTTP status"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+# ============================================================================
+# OUTPUT SNAPSHOT
+# ============================================================================
+
+def load_snapshot(output_dir, manifest):
+    """Cube, agent table and selectable values of one output generation.
+
+    Raises ManifestMismatchError while main.py is still rewriting the files.
+    """
+    cube = read_rollup_cube(output_dir, read_verified(output_dir, manifest, CUBE_FILE))
+    agents = pd.read_csv(read_verified(output_dir, manifest, AGENT_FILE), dtype={'month': str})
+    labels = {
+        key: sorted(value for value in cube.index.get_level_values(key).unique() if value != ROLLUP_ALL)
+        for key in KPI_KEYS
+    }
+    # Agent months come from the effort records too, so some have no tickets
+    agent_labels = {
+        key: sorted(agents[column].dropna().astype(str).unique())
+        for key, column in (('year_month', 'month'), ('hub', 'hub'), ('function', 'function'))
+    }
+    return {
+        'generation': manifest['generation'],
+        'written_at': manifest['written_at'],
+        'fingerprints': {name: artifact_fingerprint(manifest, name) for name in (CUBE_FILE, AGENT_FILE)},
+        'cube': cube,
+        'agents': agents,
+        'labels': labels,
+        'agent_labels': agent_labels,
+    }
+
+
+def _records(frame):
+    """JSON-ready rows of a frame (NaN -> null)"""
+    return json.loads(frame.to_json(orient='records'))
+
+# ============================================================================
+# ENDPOINTS
+# ============================================================================
+
+def parse_filters(snapshot, params, allowed, labels='labels'):
+    """Validated month/hub/function (and by) of a request, "All" when omitted.
+
+    labels: the snapshot entry holding the valid values (cube or agent table).
+    """
+    unknown = sorted(set(params) - set(allowed))
+    if unknown:
+        raise RequestError(400, f"unknown parameter(s): {', '.join(unknown)}")
+
+    filters = {}
+    for name, key in (('month', 'year_month'), ('hub', 'hub'), ('function', 'function')):
+        value = params.get(name, ROLLUP_ALL)
+        if value != ROLLUP_ALL and value not in snapshot[labels][key]:
+            raise RequestError(400, f"unknown {name} '{value}'; expected one of {snapshot[labels][key]}")
+        filters[name] = value
+    if 'by' in allowed:
+        by = params.get('by')
+        if by is not None and by not in KPI_KEYS:
+            raise RequestError(400, f"by must be one of {KPI_KEYS}")
+        filters['by'] = by
+    return filters
+
+
+def kpis_payload(snapshot, filters):
+    rows = cube_lookup(
+        snapshot['cube'], year_month=filters['month'], hub=filters['hub'], function=filters['function'],
+        by=filters['by']
+    )
+    return {'filters': filters, 'rows': _records(rows)}
+
+
+def _select_agents(agents, filters):
+    for name, column in (('month', 'month'), ('hub', 'hub'), ('function', 'function')):
+        if filters[name] != ROLLUP_ALL:
+            agents = agents[agents[column] == filters[name]]
+    return agents
+
+
+def agents_payload(snapshot, filters):
+    return {'filters': filters, 'rows': _records(_select_agents(snapshot['agents'], filters))}
+
+
+def management_payload(snapshot, filters):
+    cube, hub, function = snapshot['cube'], filters['hub'], filters['function']
+    monthly = cube_lookup(cube, hub=hub, function=function, by='year_month')
+    monthly = monthly[monthly['total_tickets'] > 0].reset_index(drop=True)
+
+    month = filters['month'] if filters['month'] != ROLLUP_ALL else (
+        monthly['year_month'].iloc[-1] if len(monthly) else None
+    )
+    payload = {'filters': filters, 'month': month, 'previous_month': None, 'kpis': None,
+               'volume_change_pct': None, 'sla_by_hub': [], 'sla_by_function': [], 'top_agents': []}
+    position = monthly.index[monthly['year_month'] == month]
+    if len(position) == 0:
+        return payload
+
+    current = monthly.loc[position[0]]
+    payload['kpis'] = _records(monthly.loc[[position[0]]].drop(columns=KPI_KEYS))[0]
+    if position[0] > 0:
+        previous = monthly.loc[position[0] - 1]
+        payload['previous_month'] = previous['year_month']
+        payload['volume_change_pct'] = round(
+            (current['total_tickets'] - previous['total_tickets']) / previous['total_tickets'] * 100, 2
+        )
+
+    for key, name in (('hub', 'sla_by_hub'), ('function', 'sla_by_function')):
+        breakdown = cube_lookup(cube, year_month=month, hub=hub, function=function, by=key)
+        if filters[key] != ROLLUP_ALL:
+            breakdown = breakdown[breakdown[key] == filters[key]]
+        payload[name] = _records(breakdown[[key, 'sla_total_evaluated', 'sla_compliance_pct']])
+
+    agents = _select_agents(snapshot['agents'], {**filters, 'month': month})
+    top = agents.nlargest(TOP_AGENTS, 'tickets_handled')
+    payload['top_agents'] = _records(top[['agent_id', 'hub', 'function', 'tickets_handled', 'utilization_pct']])
+    return payload
+
+
+HANDLERS = {
+    '/kpis': kpis_payload,
+    '/agents': agents_payload,
+    '/management': management_payload,
+}
+
+# ============================================================================
+# SERVICE
+# ============================================================================
+
+def _json_bytes(payload):
+    return json.dumps(payload, separators=(',', ':')).encode('utf-8')
+
+
+def _error_response(status, message):
+    headers = {'Allow': 'GET, HEAD'} if status == 405 else {}
+    return status, {**headers, 'Content-Type': 'application/json; charset=utf-8',
+                    'Cache-Control': 'no-store'}, _json_bytes({'error': message})
+
+
+class KPIService:
+    """Request handling over the latest complete output generation (no sockets; see serve())"""
+
+    def __init__(self, output_dir=OUTPUT_DIR, cache_bytes=CACHE_BYTES):
+        self.output_dir = output_dir
+        self.cache_bytes = cache_bytes
+        self.snapshot = None
+        self.cache = LRUCache(cache_bytes)
+        self._manifest_mtime = None
+        self._lock = asyncio.Lock()
+
+    def _current_mtime(self):
+        try:
+            return os.stat(os.path.join(self.output_dir, MANIFEST_FILE)).st_mtime_ns
+        except FileNotFoundError:
+            return None
+
+    async def refresh(self):
+        """Load a new output generation once main.py has finished writing it"""
+        mtime = self._current_mtime()
+        if mtime == self._manifest_mtime:
+            return
+        async with self._lock:
+            if mtime == self._manifest_mtime:
+                return
+            manifest = read_manifest(self.output_dir)
+            if manifest is None or not files_match(self.output_dir, manifest):
+                # No outputs yet, or a run is rewriting them: keep the last complete generation
+                return
+            if self.snapshot is None or manifest['generation'] != self.snapshot['generation']:
+                loop = asyncio.get_running_loop()
+                try:
+                    snapshot = await loop.run_in_executor(None, load_snapshot, self.output_dir, manifest)
+                except (ManifestMismatchError, FileNotFoundError):
+                    return
+                self.snapshot = snapshot
+                self.cache = LRUCache(self.cache_bytes)
+            self._manifest_mtime = mtime
+
+    def _cached_response(self, path, filters):
+        """(etag, body, gzipped body or None) of one normalized query, built once per generation"""
+        snapshot = self.snapshot
+        query = json.dumps(filters, sort_keys=True)
+        fingerprints = '|'.join(snapshot['fingerprints'][name] or '' for name in ENDPOINTS[path]['artifacts'])
+        etag = '"' + hashlib.sha256(f"{fingerprints}|{path}|{query}".encode()).hexdigest()[:32] + '"'
+
+        key = (snapshot['generation'], path, query)
+        entry = self.cache.get(key)
+        if entry is None:
+            body = _json_bytes(HANDLERS[path](snapshot, filters))
+            compressed = gzip.compress(body, GZIP_LEVEL) if len(body) >= GZIP_MIN_BYTES else None
+            entry = {'etag': etag, 'body': body, 'gzip': compressed}
+            self.cache.put(key, entry, estimate_nbytes(entry))
+        return entry
+
+    async def respond(self, method, target, headers):
+        """(status, response headers, body) for one request; headers keys are lower-case"""
+        try:
+            if method not in ('GET', 'HEAD'):
+                raise RequestError(405, "only GET and HEAD are supported")
+            await self.refresh()
+
+            url = urlsplit(target)
+            params = {name: values[-1] for name, values in parse_qs(url.query).items()}
+            if url.path == '/health':
+                return self._health()
+            if url.path not in ENDPOINTS:
+                raise RequestError(404, f"unknown endpoint {url.path}; expected one of {sorted(ENDPOINTS)}")
+            if self.snapshot is None:
+                raise RequestError(503, "no pipeline outputs yet; run main.py first")
+
+            endpoint = ENDPOINTS[url.path]
+            filters = parse_filters(self.snapshot, params, endpoint['params'], endpoint['labels'])
+            entry = self._cached_response(url.path, filters)
+        except RequestError as e:
+            return _error_response(e.status, str(e))
+        except Exception:
+            # A failed reload or query must still get a status line, not a dropped connection
+            logger.exception("%s %s failed", method, target)
+            return _error_response(500, "internal error; see the server log")
+
+        response_headers = {
+            'ETag': entry['etag'],
+            'Cache-Control': 'no-cache',
+            'Vary': 'Accept-Encoding',
+            'X-Output-Generation': str(self.snapshot['generation']),
+        }
+        matches = [tag.strip() for tag in headers.get('if-none-match', '').split(',')]
+        if entry['etag'] in matches or '*' in matches or f"W/{entry['etag']}" in matches:
+            return 304, response_headers, b''
+
+        response_headers['Content-Type'] = 'application/json; charset=utf-8'
+        body = entry['body']
+        if entry['gzip'] is not None and 'gzip' in headers.get('accept-encoding', ''):
+            response_headers['Content-Encoding'] = 'gzip'
+            body = entry['gzip']
+        return 200, response_headers, body
+
+    def _health(self):
+        snapshot = self.snapshot
+        payload = {'status': 'ok' if snapshot else 'no outputs', 'generation': None}
+        if snapshot is not None:
+            payload.update({
+                'generation': snapshot['generation'],
+                'written_at': snapshot['written_at'],
+                'months': snapshot['labels']['year_month'],
+                'hubs': snapshot['labels']['hub'],
+                'functions': snapshot['labels']['function'],
+                'agent_months': snapshot['agent_labels']['year_month'],
+                'cached_responses': len(self.cache),
+            })
+        return 200, {'Content-Type': 'application/json; charset=utf-8', 'Cache-Control': 'no-store'}, \
+            _json_bytes(payload)
+
+# ============================================================================
+# HTTP SERVER
+# ============================================================================
+
+async def _read_line(reader):
+    try:
+        return await asyncio.wait_for(reader.readline(), KEEPALIVE_TIMEOUT)
+    except ValueError:
+        # StreamReader.readline reports a line over the stream limit this way
+        raise RequestError(400, f"request or header line longer than {MAX_LINE_BYTES} bytes")
+
+
+async def _read_request(reader):
+    """(method, target, version, headers) of the next request, or None when the client is done.
+
+    Raises RequestError for a request that cannot be parsed.
+    """
+    line = await _read_line(reader)
+    if not line.strip():
+        return None
+    parts = line.decode('latin-1').split()
+    if len(parts) != 3:
+        raise RequestError(400, "malformed request line; expected 'METHOD /path HTTP/1.1'")
+    method, target, version = parts
+    headers = {}
+    while True:
+        line = await _read_line(reader)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return method, target, version, headers
+
+
+def _write_response(writer, status, response_headers, body, keep_alive, head_only=False):
+    head = [f"HTTP/1.1 {status} {STATUS_TEXT[status]}", f"Date: {formatdate(usegmt=True)}"]
+    head += [f"{name}: {value}" for name, value in response_headers.items()]
+    head.append(f"Content-Length: {len(body)}")
+    head.append(f"Connection: {'keep-alive' if keep_alive else 'close'}")
+    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1'))
+    if not head_only:
+        writer.write(body)
+
+
+async def handle_connection(service, reader, writer):
+    """Serve the requests of one (keep-alive) connection"""
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except asyncio.TimeoutError:
+                break
+            except RequestError as e:
+                # The rest of the stream cannot be trusted: answer, then close
+                _write_response(writer, *_error_response(e.status, str(e)), keep_alive=False)
+                await writer.drain()
+                break
+            if request is None:
+                break
+            method, target, version, headers = request
+
+            status, response_headers, body = await service.respond(method, target, headers)
+            # Requests with a body are not supported, so their connection is not reused
+            keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+                          and 'content-length' not in headers and 'transfer-encoding' not in headers)
+
+            _write_response(writer, status, response_headers, body, keep_alive, head_only=(method == 'HEAD'))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(output_dir=OUTPUT_DIR, host=DEFAULT_HOST, port=DEFAULT_PORT, ready=None):
+    """Run the API until cancelled; `ready` (optional callback) gets the started server"""
+    service = KPIService(output_dir)
+    await service.refresh()
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(service, reader, writer), host, port, limit=MAX_LINE_BYTES
+    )
+    if ready is not None:
+        ready(server, service)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Read-only KPI query API over the pipeline outputs")
+    parser.add_argument('--output-dir', default=OUTPUT_DIR, help="pipeline output directory")
+    parser.add_argument('--host', default=DEFAULT_HOST, help="interface to listen on")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="port to listen on")
+    args = parser.parse_args()
+
+    def announce(server, service):
+        generation = service.snapshot['generation'] if service.snapshot else None
+        print(f"[OK] KPI API on http://{args.host}:{args.port} "
+              f"(output generation {generation}; endpoints: {', '.join(sorted(ENDPOINTS))}, /health)")
+        if generation is None:
+            print(f"[WARNING] No complete outputs in {args.output_dir}/ yet - run main.py first")
+
+    try:
+        asyncio.run(serve(args.output_dir, args.host, args.port, ready=announce))
+    except KeyboardInterrupt:
+        pass
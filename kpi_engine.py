@@ -0,0 +1,356 @@
+"""
+Vectorized KPI Engine for Support Operations Reporting System
+Computes every column of kpi_monthly_summary.csv in one grouped aggregation pass
+
+The original STEP 3 ran one groupby.apply per metric, walking every
+(year_month, hub, function) group in Python for each of them. Here every
+metric is reduced to an additive counter (a 0/1 flag or a sum), the group keys
+are integer-coded, and a single groupby-sum produces all counters at once.
+Percentages and averages are derived from the counters afterwards.
+
+Run directly for a timing comparison against the legacy implementation:
+    python kpi_engine.py --rows 1000000
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from run_report import lap_timer
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+KPI_KEYS = ['year_month', 'hub', 'function']
+
+PRIORITIES = ['Critical', 'High', 'Medium', 'Low']
+CHANNELS = ['Email', 'Portal', 'Phone', 'Chat']
+
+# Additive counters kept per group. Every KPI column is derived from these,
+# so partial results for the same group can simply be added together.
+PARTIAL_COLUMNS = [
+    'total_tickets',
+    'tickets_critical', 'tickets_high', 'tickets_medium', 'tickets_low',
+    'tickets_email', 'tickets_portal', 'tickets_phone', 'tickets_chat',
+    'sla_total_evaluated', 'sla_met_count',
+    'resolution_hours_sum', 'resolution_hours_count',
+    'backlog_count', 'reopen_count',
+    'csat_responses', 'csat_score_sum', 'csat_high_count', 'csat_low_count',
+]
+
+# Column order of kpi_monthly_summary.csv (after the key columns)
+KPI_COLUMNS = [
+    'total_tickets',
+    'tickets_critical', 'tickets_high', 'tickets_medium', 'tickets_low',
+    'tickets_email', 'tickets_portal', 'tickets_phone', 'tickets_chat',
+    'sla_total_evaluated', 'sla_met_count', 'sla_compliance_pct',
+    'avg_resolution_time_hours',
+    'backlog_count', 'reopen_count', 'reopen_rate_pct',
+    'csat_responses', 'csat_avg_score',
+    'csat_high_count', 'csat_high_pct',
+    'csat_low_count', 'csat_low_pct',
+]
+
+# ============================================================================
+# GROUP KEY ENCODING
+# ============================================================================
+
+def encode_group_keys(tickets_df, keys):
+    """Integer-code the group keys.
+
+    Returns (codes, uniques) where codes is one int64 code per row (-1 when any
+    key is missing) and uniques holds the sorted distinct values of each key.
+    Codes sort in the same order as the (sorted) key tuples.
+    """
+    codes = np.zeros(len(tickets_df), dtype=np.int64)
+    missing = np.zeros(len(tickets_df), dtype=bool)
+    uniques = []
+
+    for key in keys:
+        key_codes, key_uniques = pd.factorize(tickets_df[key], sort=True)
+        codes = codes * len(key_uniques) + key_codes
+        missing |= key_codes < 0
+        uniques.append(key_uniques)
+
+    codes[missing] = -1
+    return codes, uniques
+
+
+def decode_group_keys(codes, uniques, keys):
+    """Turn combined group codes back into a DataFrame of key columns"""
+    columns = {}
+    remaining = np.asarray(codes, dtype=np.int64)
+
+    for key, key_uniques in reversed(list(zip(keys, uniques))):
+        remaining, key_codes = np.divmod(remaining, len(key_uniques))
+        columns[key] = key_uniques.take(key_codes)
+
+    return pd.DataFrame({key: columns[key] for key in keys})
+
+# ============================================================================
+# KPI COMPUTATION
+# ============================================================================
+
+def one_hot_counts(series, values):
+    """0/1 int8 column per value, comparing integer codes instead of strings"""
+    codes, uniques = pd.factorize(series)
+    lookup = {value: position for position, value in enumerate(uniques)}
+
+    return {
+        f'tickets_{value.lower()}': (codes == lookup.get(value, -2)).astype(np.int8)
+        for value in values
+    }
+
+
+def build_kpi_inputs(tickets_df):
+    """Precompute one numeric column per additive counter.
+
+    Expects the enriched ticket columns added by transforms.prepare_tickets.
+    """
+    lap = lap_timer('kpi_inputs', rows_in=len(tickets_df), rows_out=len(tickets_df))
+    sla_met = tickets_df['sla_met']
+    resolution = tickets_df['resolution_time_hours']
+    csat_has_score = tickets_df['csat_has_score'].astype(bool)
+
+    inputs = {'total_tickets': np.ones(len(tickets_df), dtype=np.int8)}
+    inputs.update(one_hot_counts(tickets_df['priority'], PRIORITIES))
+    lap('priority')
+    inputs.update(one_hot_counts(tickets_df['channel'], CHANNELS))
+    lap('channel')
+
+    inputs['sla_total_evaluated'] = sla_met.notna().to_numpy(np.int8)
+    inputs['sla_met_count'] = (sla_met == True).to_numpy(np.int8)  # noqa: E712 - NaN-safe
+    lap('sla')
+
+    inputs['resolution_hours_sum'] = resolution.fillna(0).to_numpy(np.float64)
+    inputs['resolution_hours_count'] = resolution.notna().to_numpy(np.int8)
+    lap('resolution')
+
+    inputs['backlog_count'] = tickets_df['is_backlog'].to_numpy(np.int8)
+    inputs['reopen_count'] = tickets_df['was_reopened'].to_numpy(np.int8)
+    lap('backlog_reopen')
+
+    inputs['csat_responses'] = csat_has_score.to_numpy(np.int8)
+    inputs['csat_score_sum'] = tickets_df['csat_score'].where(csat_has_score, 0).fillna(0).to_numpy(np.float64)
+    inputs['csat_high_count'] = tickets_df['csat_high'].to_numpy(np.int8)
+    inputs['csat_low_count'] = tickets_df['csat_low'].to_numpy(np.int8)
+    lap('csat')
+
+    return pd.DataFrame(inputs, index=tickets_df.index)
+
+
+def compute_kpi_partials(tickets_df, keys=KPI_KEYS):
+    """Additive KPI counters per group in a single groupby-sum.
+
+    Returns one row per observed group (sorted by keys) with the key columns
+    followed by PARTIAL_COLUMNS. Integer counters stay int64.
+    """
+    lap = lap_timer('kpi_partials', rows_in=len(tickets_df))
+    codes, uniques = encode_group_keys(tickets_df, keys)
+    lap('encode_keys', rows=len(tickets_df))
+    inputs = build_kpi_inputs(tickets_df)  # split further into kpi_inputs.* metrics
+    lap('counter_columns', rows=len(tickets_df))
+
+    valid = codes >= 0
+    sums = inputs[valid].groupby(codes[valid], sort=True).sum()
+    lap('groupby_sum', rows=len(sums))
+
+    partials = decode_group_keys(sums.index.to_numpy(), uniques, keys)
+    for column in PARTIAL_COLUMNS:
+        values = sums[column].to_numpy()
+        if column not in ('resolution_hours_sum', 'csat_score_sum'):
+            values = values.astype(np.int64)
+        partials[column] = values
+    lap('decode_groups', rows=len(partials))
+
+    return partials
+
+
+def finalize_kpis(partials, keys=KPI_KEYS):
+    """Derive the kpi_monthly_summary columns from additive counters"""
+    lap = lap_timer('kpi_finalize', rows_in=len(partials), rows_out=len(partials))
+    kpis = partials[keys].copy()
+    for column in PARTIAL_COLUMNS:
+        if column in KPI_COLUMNS:
+            kpis[column] = partials[column]
+    lap('counters')
+
+    def pct(numerator, denominator):
+        # 0 (not NaN) when nothing was evaluated, as in the original report
+        result = numerator / denominator.where(denominator > 0) * 100
+        return result.fillna(0).astype(np.float64)
+
+    kpis['sla_compliance_pct'] = pct(partials['sla_met_count'], partials['sla_total_evaluated'])
+    lap('sla_compliance_pct')
+    kpis['avg_resolution_time_hours'] = (
+        partials['resolution_hours_sum'] / partials['resolution_hours_count'].where(partials['resolution_hours_count'] > 0)
+    ).astype(np.float64)
+    lap('avg_resolution_time_hours')
+    kpis['reopen_rate_pct'] = pct(partials['reopen_count'], partials['total_tickets'])
+    lap('reopen_rate_pct')
+    kpis['csat_avg_score'] = (
+        partials['csat_score_sum'] / partials['csat_responses'].where(partials['csat_responses'] > 0)
+    ).astype(np.float64)
+    lap('csat_avg_score')
+    kpis['csat_high_pct'] = pct(partials['csat_high_count'], partials['csat_responses'])
+    kpis['csat_low_pct'] = pct(partials['csat_low_count'], partials['csat_responses'])
+    lap('csat_high_low_pct')
+
+    kpis = kpis[list(keys) + KPI_COLUMNS]
+
+    # Format
+    if 'year_month' in kpis.columns:
+        kpis['year_month'] = kpis['year_month'].astype(str)
+    numeric_cols = kpis.select_dtypes(include=['float64']).columns
+    kpis[numeric_cols] = kpis[numeric_cols].round(2)
+    lap('format')
+
+    return kpis.reset_index(drop=True)
+
+
+def compute_kpi_summary(tickets_df):
+    """kpi_monthly_summary for enriched tickets (vectorized engine)"""
+    return finalize_kpis(compute_kpi_partials(tickets_df))
+
+
+def merge_kpi_partials(partials_list, keys=KPI_KEYS):
+    """Add up KPI partials computed on separate batches of tickets"""
+    partials = pd.concat(partials_list, ignore_index=True)
+    merged = partials.groupby(keys, sort=True, observed=True)[PARTIAL_COLUMNS].sum()
+    return merged.reset_index()
+
+
+def summarize_partials(partials):
+    """Overall summary figures (STEP 5) from KPI partials alone"""
+    totals = partials[PARTIAL_COLUMNS].sum()
+    hub_totals = partials.groupby('hub', observed=True)['total_tickets'].sum()
+
+    return {
+        'Total Tickets': int(totals['total_tickets']),
+        'Hub A Tickets': int(hub_totals.get('A', 0)),
+        'Hub B Tickets': int(hub_totals.get('B', 0)),
+        'Current Backlog': int(totals['backlog_count']),
+        'Avg Resolution Time (hrs)': totals['resolution_hours_sum'] / totals['resolution_hours_count'],
+        'Overall SLA Compliance': f"{totals['sla_met_count'] / totals['sla_total_evaluated'] * 100:.1f}%",
+        'Avg CSAT Score': f"{totals['csat_score_sum'] / totals['csat_responses']:.2f}/5"
+    }
+
+# ============================================================================
+# LEGACY IMPLEMENTATION (kept for equivalence checks and benchmarks)
+# ============================================================================
+
+def legacy_kpi_summary(tickets_df):
+    """Original per-metric groupby.apply implementation of STEP 3"""
+    kpi_groups = tickets_df.groupby(['year_month', 'hub', 'function'])
+
+    kpi_summary = pd.DataFrame({
+        # Volume metrics
+        'total_tickets': kpi_groups.size(),
+        'tickets_critical': kpi_groups.apply(lambda x: (x['priority'] == 'Critical').sum(), include_groups=False),
+        'tickets_high': kpi_groups.apply(lambda x: (x['priority'] == 'High').sum(), include_groups=False),
+        'tickets_medium': kpi_groups.apply(lambda x: (x['priority'] == 'Medium').sum(), include_groups=False),
+        'tickets_low': kpi_groups.apply(lambda x: (x['priority'] == 'Low').sum(), include_groups=False),
+
+        # Channel breakdown
+        'tickets_email': kpi_groups.apply(lambda x: (x['channel'] == 'Email').sum(), include_groups=False),
+        'tickets_portal': kpi_groups.apply(lambda x: (x['channel'] == 'Portal').sum(), include_groups=False),
+        'tickets_phone': kpi_groups.apply(lambda x: (x['channel'] == 'Phone').sum(), include_groups=False),
+        'tickets_chat': kpi_groups.apply(lambda x: (x['channel'] == 'Chat').sum(), include_groups=False),
+
+        # SLA metrics
+        'sla_total_evaluated': kpi_groups.apply(lambda x: x['sla_met'].notna().sum(), include_groups=False),
+        'sla_met_count': kpi_groups.apply(lambda x: (x['sla_met'] == True).sum(), include_groups=False),
+        'sla_compliance_pct': kpi_groups.apply(
+            lambda x: (x['sla_met'] == True).sum() / x['sla_met'].notna().sum() * 100 if x['sla_met'].notna().sum() > 0 else 0,
+            include_groups=False
+        ),
+        'avg_resolution_time_hours': kpi_groups['resolution_time_hours'].mean(),
+
+        # Backlog and reopen
+        'backlog_count': kpi_groups['is_backlog'].sum(),
+        'reopen_count': kpi_groups['was_reopened'].sum(),
+        'reopen_rate_pct': kpi_groups.apply(
+            lambda x: x['was_reopened'].sum() / len(x) * 100 if len(x) > 0 else 0,
+            include_groups=False
+        ),
+
+        # CSAT metrics
+        'csat_responses': kpi_groups['csat_has_score'].sum(),
+        'csat_avg_score': kpi_groups.apply(
+            lambda x: x.loc[x['csat_has_score'], 'csat_score'].mean(),
+            include_groups=False
+        ),
+        'csat_high_count': kpi_groups['csat_high'].sum(),
+        'csat_high_pct': kpi_groups.apply(
+            lambda x: (x['csat_high']).sum() / x['csat_has_score'].sum() * 100 if x['csat_has_score'].sum() > 0 else 0,
+            include_groups=False
+        ),
+        'csat_low_count': kpi_groups['csat_low'].sum(),
+        'csat_low_pct': kpi_groups.apply(
+            lambda x: (x['csat_low']).sum() / x['csat_has_score'].sum() * 100 if x['csat_has_score'].sum() > 0 else 0,
+            include_groups=False
+        ),
+    }).reset_index()
+
+    # Format
+    kpi_summary['year_month'] = kpi_summary['year_month'].astype(str)
+    numeric_cols = kpi_summary.select_dtypes(include=['float64']).columns
+    kpi_summary[numeric_cols] = kpi_summary[numeric_cols].round(2)
+
+    return kpi_summary
+
+# ============================================================================
+# TIMING COMPARISON
+# ============================================================================
+
+def make_benchmark_tickets(source_path, rows, months=24, seed=42):
+    """Resample the sample ticket file to `rows` tickets spread over `months`"""
+    rng = np.random.default_rng(seed)
+    source = pd.read_csv(source_path)
+
+    tickets = source.iloc[rng.integers(0, len(source), rows)].reset_index(drop=True)
+    tickets['ticket_id'] = [f"TCK-{i}" for i in range(rows)]
+
+    # Shift each ticket by a whole number of months so groups span the history
+    shift = pd.to_timedelta(rng.integers(0, months, rows) * 30, unit='D')
+    tickets['created_datetime'] = pd.to_datetime(tickets['created_datetime']) - shift
+    tickets['resolved_datetime'] = pd.to_datetime(tickets['resolved_datetime']) - shift
+
+    return tickets
+
+
+def run_benchmark(rows, source_path):
+    from transforms import prepare_tickets
+
+    print(f"Building {rows:,} benchmark tickets from {source_path} ...")
+    tickets = prepare_tickets(make_benchmark_tickets(source_path, rows))
+    groups = tickets.groupby(KPI_KEYS).ngroups
+    print(f"[OK] {len(tickets):,} tickets in {groups} month/hub/function groups")
+
+    start = time.perf_counter()
+    legacy = legacy_kpi_summary(tickets)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine = compute_kpi_summary(tickets)
+    engine_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(engine, legacy)
+    identical_csv = engine.to_csv(index=False) == legacy.to_csv(index=False)
+
+    print(f"  {'Legacy groupby.apply':.<40} {legacy_seconds:.3f}s")
+    print(f"  {'Vectorized engine':.<40} {engine_seconds:.3f}s")
+    print(f"  {'Speedup':.<40} {legacy_seconds / engine_seconds:.1f}x")
+    print(f"  {'Identical CSV output':.<40} {identical_csv}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the vectorized KPI engine with the legacy STEP 3")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="number of tickets to benchmark with")
+    parser.add_argument('--source', default="data/tickets 1.csv", help="ticket file to resample")
+    args = parser.parse_args()
+
+    run_benchmark(args.rows, args.source)
@@ -1,236 +1,384 @@
 """
 Main Entry Point for Support Operations Reporting System
 Run this file to process all data and generate reports
+
+The pipeline steps live in pipeline.py; this module only parses arguments,
+prints progress and writes the outputs, and does nothing when imported.
 """
 
-import pandas as pd
+import argparse
 import os
-from datetime import datetime
+
+import pandas as pd
+
+from incremental import run_incremental, LOOKBACK_DAYS
+from columnar_store import PARQUET_AVAILABLE, store_path
+from streaming import run_streaming, DEFAULT_CHUNK_SIZE
+from parallel import run_parallel
+from rollup_cube import CUBE_FILE
+from quantile_sketch import SKETCH_FILE
+from backlog_timeline import TIMELINE_FILE
+from business_hours import SLA_CLOCKS
+from validation import write_quarantine, reason_counts, QUARANTINE_FILE
+from analytics_db import build_analytics_db, remove_analytics_db
+from excel_export import write_management_packs, XLSX_AVAILABLE
+from event_log import ingest_events, latest_tickets, changed_since_acknowledged, acknowledge, log_dir
+from output_manifest import write_manifest, MANIFEST_FILE
+from run_report import RunReport, activate, REPORT_FILE, PROFILE_DIR
+from pipeline import (
+    INPUT_TICKETS, INPUT_EFFORT, OUTPUT_DIR,
+    load_inputs, validate_inputs, transform_tickets, calculate_kpis, calculate_agent_performance,
+    summarize_tickets, write_outputs,
+)
 
 # ============================================================================
-# CONFIGURATION
+# HELPER FUNCTIONS
 # ============================================================================
 
-print("\n")
-print("=" * 80)
-print(" " * 20 + "SUPPORT OPERATIONS REPORTING SYSTEM")
-print(" " * 25 + "OrionEdge Corp - 2025")
-print("=" * 80)
-print("\n")
+def record_manifest(args, report):
+    """Write the output manifest once every output file is complete, then the run report"""
+    if args.analytics_db:
+        # Built from the written outputs, so it is listed in the same manifest
+        with report.step('analytics_db') as step:
+            db = build_analytics_db(OUTPUT_DIR)
+            step['rows_out'] = db['tickets']
+        print(f"[OK] Saved: {db['path']} ({db['engine']}, {db['tickets']} tickets indexed by year_month/hub/function)")
+    else:
+        remove_analytics_db(OUTPUT_DIR)
+
+    if args.excel_packs is not None and not XLSX_AVAILABLE:
+        print("[SKIP] xlsxwriter not installed - Excel packs not written")
+    elif args.excel_packs is not None:
+        with report.step('excel') as step:
+            export = write_management_packs(OUTPUT_DIR, args.excel_packs or None)
+            step['rows_out'] = sum(export['tickets'].values())
+        for month, path in export['paths'].items():
+            print(f"[OK] Saved: {path} ({export['tickets'][month]:,} tickets)")
+        for month in export['unknown']:
+            print(f"[WARNING] No tickets for {month} - no pack written")
+
+    with report.step('manifest') as step:
+        manifest, changed = write_manifest(OUTPUT_DIR)
+        step['rows_out'] = len(manifest['files'])
+    print(f"[OK] Saved: {OUTPUT_DIR}/{MANIFEST_FILE} (generation {manifest['generation']}, "
+          f"{len(changed)} of {len(manifest['files'])} files changed)")
+
+    path = report.write()
+    print(f"[OK] Saved: {path} ({len(report.steps)} steps, {report.to_dict()['wall_seconds']:.1f}s)")
+    if report.profile:
+        print(f"[OK] Saved: {OUTPUT_DIR}/{PROFILE_DIR}/ (cProfile and tracemalloc dumps per step)")
+
+def print_quarantine(checked, quarantined, reasons):
+    """Print how many tickets failed validation, and why"""
+    print(f"[OK] Validated {checked} tickets: {quarantined} quarantined in {OUTPUT_DIR}/{QUARANTINE_FILE}")
+    for reason, count in reasons.items():
+        print(f"  {reason:.<40} {count}")
+
+def print_summary_report(summary_stats):
+    """Print the STEP 5 summary figures and the list of generated outputs"""
+    print()
+    for key, value in summary_stats.items():
+        print(f"  {key:.<40} {value}")
+
+    print()
+    print("=" * 80)
+    print(" " * 25 + "PROCESSING COMPLETE!")
+    print("=" * 80)
+    print()
+    print("OUTPUT FILES GENERATED:")
+    print(f"  1. {OUTPUT_DIR}/tickets_master.csv         - Clean ticket data with enrichments")
+    print(f"  2. {OUTPUT_DIR}/kpi_monthly_summary.csv    - KPI metrics by month/hub/function")
+    print(f"  3. {OUTPUT_DIR}/agent_performance.csv      - Agent workload and efficiency")
+    print(f"  4. {OUTPUT_DIR}/{CUBE_FILE}        - KPI counters with month/hub/function rollups")
+    print(f"  5. {OUTPUT_DIR}/{MANIFEST_FILE}             - Checksums, row counts and generation number")
+    print(f"  6. {OUTPUT_DIR}/{REPORT_FILE}           - Time, CPU, memory and rows per step and KPI metric")
+    print(f"  7. {OUTPUT_DIR}/{QUARANTINE_FILE}   - Tickets that failed validation, with reasons")
+    print()
+    print("NEXT STEPS:")
+    print("  • Open output files in Excel for analysis")
+    print("  • Run: streamlit run streamlit_app.py (for interactive dashboard)")
+    print("  • Review KPI trends and hub comparisons")
+    print()
+    print("=" * 80)
+    print()
 
-INPUT_TICKETS = "data/tickets 1.csv"
-INPUT_EFFORT = "data/effort 1.csv"
-OUTPUT_DIR = "outputs"
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
 
-# Create output directory
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Support operations reporting pipeline")
+    parser.add_argument('--incremental', action='store_true',
+                        help="recompute only the month/hub/function partitions touched by new or changed tickets")
+    parser.add_argument('--lookback-days', type=int, default=LOOKBACK_DAYS,
+                        help="incremental mode: days before the created_datetime watermark that are re-checked")
+    parser.add_argument('--full-refresh', action='store_true',
+                        help="incremental mode: discard the stored state and rebuild it from scratch "
+                             "(with --events, the event log too)")
+    parser.add_argument('--events', metavar='PATH',
+                        help="read tickets from an append-only change-record file through the compacted "
+                             "event log instead of a full export; a record ending in an extra 'delete' "
+                             "field (or with op=delete) removes its ticket (see event_log.py)")
+    parser.add_argument('--stream', action='store_true',
+                        help="process tickets in chunks with bounded memory (for exports that do not fit in RAM)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="streaming mode: tickets per chunk (sets peak memory)")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="run STEPS 2-4 in this many processes, one shard per hub/month (1 = serial)")
+    parser.add_argument('--sla-clock', choices=SLA_CLOCKS, default='wall',
+                        help="measure resolution time and SLA in elapsed hours (wall) or in working hours "
+                             "of each hub's calendar (business, see business_hours.py)")
+    parser.add_argument('--analytics-db', action='store_true',
+                        help="also load the outputs into an embedded DuckDB (or SQLite) file that the dashboard "
+                             "queries with its filters pushed down (see analytics_db.py)")
+    parser.add_argument('--excel-packs', nargs='*', metavar='MONTH',
+                        help="also write a formatted Excel management pack per month (all months when none are "
+                             "given) to outputs/exports/ (see excel_export.py)")
+    parser.add_argument('--profile', action='store_true',
+                        help=f"also dump cProfile stats and tracemalloc allocation sites per step to {OUTPUT_DIR}/{PROFILE_DIR}/")
+    args = parser.parse_args(argv)
+    if args.events and args.stream:
+        parser.error("--events cannot be combined with --stream")
+    return args
 
 # ============================================================================
-# STEP 1: LOAD DATA
+# EVENT LOG: STEP 1 FROM TICKET CHANGE RECORDS
 # ============================================================================
 
-print("[STEP 1/5] LOADING DATA")
-print("-" * 80)
+def load_event_inputs(args, report):
+    """Ingest the new change records, then read the latest state of every ticket"""
+    with report.step('ingest') as step:
+        ingest = ingest_events(args.events, OUTPUT_DIR, full_refresh=args.full_refresh)
+        step['rows_in'], step['rows_out'] = ingest['records'], ingest['live_tickets']
 
-tickets_df = pd.read_csv(INPUT_TICKETS)
-effort_df = pd.read_csv(INPUT_EFFORT)
+    print(f"[OK] Ingested {ingest['records']} change records from {args.events} "
+          f"({ingest['upserts']} upserts, {ingest['deletes']} deletes, {ingest['new_tickets']} new tickets)")
+    if ingest['compacted']:
+        print(f"[OK] Compacted {log_dir(OUTPUT_DIR)}/ into {ingest['live_tickets']} tickets")
+    else:
+        print(f"[OK] Event log: {ingest['live_tickets']} tickets, {ingest['segments']} segments since compaction")
 
-print(f"[OK] Loaded {len(tickets_df)} tickets")
-print(f"[OK] Loaded {len(effort_df)} effort records")
-print()
+    with report.step('load') as step:
+        tickets_df, effort_df = latest_tickets(OUTPUT_DIR), pd.read_csv(INPUT_EFFORT)
+        step['rows_out'] = len(tickets_df)
+    return tickets_df, effort_df
 
 # ============================================================================
-# STEP 2: CLEAN AND TRANSFORM DATA
+# STREAMING MODE: STEPS 1-4 IN BOUNDED-MEMORY CHUNKS
 # ============================================================================
 
-print("[STEP 2/5] CLEANING AND TRANSFORMING DATA")
-print("-" * 80)
-
-# Parse dates
-tickets_df['created_datetime'] = pd.to_datetime(tickets_df['created_datetime'])
-tickets_df['resolved_datetime'] = pd.to_datetime(tickets_df['resolved_datetime'])
+def run_stream_mode(args, report):
+    print(f"[STEP 1-4/5] STREAMING PIPELINE ({args.chunk_size:,} tickets per chunk)")
+    print("-" * 80)
+
+    with report.step('stream') as step:
+        effort_df = pd.read_csv(INPUT_EFFORT)
+        run = run_streaming(INPUT_TICKETS, effort_df, OUTPUT_DIR, chunk_size=args.chunk_size,
+                            sla_clock=args.sla_clock)
+        step['rows_in'], step['rows_out'] = run['rows'], run['kpi_rows']
+
+    print(f"[OK] Streamed {run['rows']} tickets in {run['chunks']} chunks")
+    print_quarantine(run['rows'] + run['quarantined'], run['quarantined'], run['quarantine_reasons'])
+    print(f"[OK] Calculated KPIs for {run['kpi_rows']} month/hub/function combinations")
+    print(f"[OK] Calculated metrics for {run['agent_rows']} agent-months")
+    print(f"[OK] Saved: {OUTPUT_DIR}/tickets_master.csv, kpi_monthly_summary.csv, agent_performance.csv")
+    if run['store']:
+        print(f"[OK] Saved: {store_path(OUTPUT_DIR)}/ (partitioned by year_month/hub)")
+    if run['peak_rss_mb'] is not None:
+        print(f"[OK] Peak memory: {run['peak_rss_mb']:.0f} MB")
+    record_manifest(args, report)
+    print()
+
+    return run['summary']
 
-# Add time features
-tickets_df['year_month'] = tickets_df['created_datetime'].dt.to_period('M')
-tickets_df['month_name'] = tickets_df['created_datetime'].dt.strftime('%B %Y')
-
-# Calculate resolution time
-tickets_df['resolution_time_hours'] = (
-    tickets_df['resolved_datetime'] - tickets_df['created_datetime']
-).dt.total_seconds() / 3600
-
-# SLA compliance
-tickets_df['sla_met'] = tickets_df['resolution_time_hours'] <= tickets_df['sla_target_hours']
-tickets_df.loc[tickets_df['status'].isin(['Open', 'In Progress']), 'sla_met'] = None
+# ============================================================================
+# INCREMENTAL MODE: STEPS 2-4 FOR TOUCHED PARTITIONS ONLY
+# ============================================================================
 
-# CSAT categories
-tickets_df['csat_score_clean'] = tickets_df['csat_score'].fillna(0)
-tickets_df['csat_high'] = tickets_df['csat_score'] >= 4
-tickets_df['csat_low'] = tickets_df['csat_score'] <= 2
-tickets_df['csat_has_score'] = tickets_df['csat_score'].notna()
+def run_incremental_mode(args, report, tickets_df, effort_df, changed_ids=None):
+    print("[STEP 2-4/5] INCREMENTAL RECOMPUTATION")
+    print("-" * 80)
 
-# Backlog flag
-tickets_df['is_backlog'] = tickets_df['status'].isin(['Open', 'In Progress'])
-tickets_df['was_reopened'] = tickets_df['reopened_flag'] == 1
+    with report.step('incremental', rows_in=len(tickets_df)) as step:
+        run = run_incremental(tickets_df, effort_df, OUTPUT_DIR,
+                              lookback_days=args.lookback_days, full_refresh=args.full_refresh,
+                              sla_clock=args.sla_clock, changed_ids=changed_ids)
+        step['rows_out'] = run['changed_tickets']
 
-print(f"[OK] Parsed {tickets_df['created_datetime'].notna().sum()} dates")
-print(f"[OK] Calculated resolution times for {tickets_df['resolution_time_hours'].notna().sum()} tickets")
-print(f"[OK] Identified {tickets_df['is_backlog'].sum()} backlog tickets")
-print()
+    print(f"[OK] Mode: {run['mode']}")
+    print(f"[OK] {run['changed_tickets']} new/changed and {run['deleted_tickets']} deleted tickets")
+    print(f"[OK] Recomputed {run['touched_partitions']} month/hub/function partitions")
+    print(f"[OK] Saved: {OUTPUT_DIR}/tickets_master.csv, kpi_monthly_summary.csv, agent_performance.csv")
+    if run['store']:
+        print(f"[OK] Parquet store {run['store']}: {store_path(OUTPUT_DIR)}/")
+    record_manifest(args, report)
+    print()
 
-# Save master file
-tickets_df.to_csv(f"{OUTPUT_DIR}/tickets_master.csv", index=False)
-print(f"[OK] Saved: {OUTPUT_DIR}/tickets_master.csv")
-print()
+    return run['summary']
 
 # ============================================================================
-# STEP 3: CALCULATE KPIs
+# PARALLEL MODE: STEPS 2-4 SHARDED ACROSS WORKER PROCESSES
 # ============================================================================
 
-print("[STEP 3/5] CALCULATING KPIs")
-print("-" * 80)
+def run_parallel_mode(args, report, tickets_df, effort_df):
+    print(f"[STEP 2-4/5] PARALLEL PIPELINE ({args.workers} worker processes)")
+    print("-" * 80)
 
-# Group by month, hub, function
-kpi_groups = tickets_df.groupby(['year_month', 'hub', 'function'])
+    with report.step('parallel', rows_in=len(tickets_df)) as step:
+        run = run_parallel(tickets_df, effort_df, OUTPUT_DIR, workers=args.workers, sla_clock=args.sla_clock)
+        step['rows_out'] = run['kpi_rows']
 
-kpi_summary = pd.DataFrame({
-    # Volume metrics
-    'total_tickets': kpi_groups.size(),
-    'tickets_critical': kpi_groups.apply(lambda x: (x['priority'] == 'Critical').sum(), include_groups=False),
-    'tickets_high': kpi_groups.apply(lambda x: (x['priority'] == 'High').sum(), include_groups=False),
-    'tickets_medium': kpi_groups.apply(lambda x: (x['priority'] == 'Medium').sum(), include_groups=False),
-    'tickets_low': kpi_groups.apply(lambda x: (x['priority'] == 'Low').sum(), include_groups=False),
+    print(f"[OK] Processed {run['shards']} hub/month shards")
+    print(f"[OK] Calculated KPIs for {run['kpi_rows']} month/hub/function combinations")
+    print(f"[OK] Calculated metrics for {run['agent_rows']} agent-months")
+    print(f"[OK] Saved: {OUTPUT_DIR}/tickets_master.csv, kpi_monthly_summary.csv, agent_performance.csv")
+    if run['store']:
+        print(f"[OK] Saved: {store_path(OUTPUT_DIR)}/ (partitioned by year_month/hub)")
+    record_manifest(args, report)
+    print()
 
-    # Channel breakdown
-    'tickets_email': kpi_groups.apply(lambda x: (x['channel'] == 'Email').sum(), include_groups=False),
-    'tickets_portal': kpi_groups.apply(lambda x: (x['channel'] == 'Portal').sum(), include_groups=False),
-    'tickets_phone': kpi_groups.apply(lambda x: (x['channel'] == 'Phone').sum(), include_groups=False),
-    'tickets_chat': kpi_groups.apply(lambda x: (x['channel'] == 'Chat').sum(), include_groups=False),
+    return run['summary']
 
-    # SLA metrics
-    'sla_total_evaluated': kpi_groups.apply(lambda x: x['sla_met'].notna().sum(), include_groups=False),
-    'sla_met_count': kpi_groups.apply(lambda x: (x['sla_met'] == True).sum(), include_groups=False),
-    'sla_compliance_pct': kpi_groups.apply(
-        lambda x: (x['sla_met'] == True).sum() / x['sla_met'].notna().sum() * 100 if x['sla_met'].notna().sum() > 0 else 0,
-        include_groups=False
-    ),
-    'avg_resolution_time_hours': kpi_groups['resolution_time_hours'].mean(),
+# ============================================================================
+# STEPS 2-4: SINGLE IN-MEMORY RUN
+# ============================================================================
 
-    # Backlog and reopen
-    'backlog_count': kpi_groups['is_backlog'].sum(),
-    'reopen_count': kpi_groups['was_reopened'].sum(),
-    'reopen_rate_pct': kpi_groups.apply(
-        lambda x: x['was_reopened'].sum() / len(x) * 100 if len(x) > 0 else 0,
-        include_groups=False
-    ),
+def run_default_mode(args, report, tickets_df, effort_df):
+    # STEP 2: CLEAN AND TRANSFORM DATA
+    print("[STEP 2/5] CLEANING AND TRANSFORMING DATA")
+    print("-" * 80)
+
+    with report.step('transform', rows_in=len(tickets_df)) as step:
+        tickets_df = transform_tickets(tickets_df, args.sla_clock)
+        step['rows_out'] = len(tickets_df)
+
+    print(f"[OK] Parsed {tickets_df['created_datetime'].notna().sum()} dates")
+    clock = "working-hour" if args.sla_clock == 'business' else "elapsed"
+    print(f"[OK] Calculated {clock} resolution times for {tickets_df['resolution_time_hours'].notna().sum()} tickets")
+    print(f"[OK] Identified {tickets_df['is_backlog'].sum()} backlog tickets")
+    print()
+
+    # STEP 3: CALCULATE KPIs (single grouped pass, plus every month/hub/function rollup)
+    print("[STEP 3/5] CALCULATING KPIs")
+    print("-" * 80)
+
+    with report.step('kpi', rows_in=len(tickets_df)) as step:
+        kpis = calculate_kpis(tickets_df)
+        step['rows_out'] = len(kpis['kpi_summary'])
+
+    print(f"[OK] Calculated KPIs for {len(kpis['kpi_summary'])} month/hub/function combinations")
+    print(f"[OK] Built {CUBE_FILE} ({len(kpis['kpi_cube'])} rollup rows)")
+    print(f"[OK] Built {SKETCH_FILE} ({len(kpis['resolution_sketches'])} resolution-time buckets)")
+    print(f"[OK] Built {TIMELINE_FILE} ({kpis['backlog_timeline']['date'].nunique()} days of open-ticket counts)")
+    print()
+
+    # STEP 4: CALCULATE AGENT PERFORMANCE
+    print("[STEP 4/5] CALCULATING AGENT PERFORMANCE")
+    print("-" * 80)
+
+    with report.step('agent', rows_in=len(effort_df)) as step:
+        agent_performance = calculate_agent_performance(tickets_df, effort_df)
+        step['rows_out'] = len(agent_performance)
+
+    print(f"[OK] Calculated metrics for {agent_performance['agent_id'].nunique()} agents")
+    print()
+
+    # Save all outputs, then the manifest that marks them complete
+    result = {'tickets': tickets_df, **kpis, 'agent_performance': agent_performance}
+    with report.step('write', rows_in=len(tickets_df)) as step:
+        paths = write_outputs(result, OUTPUT_DIR)
+        step['rows_out'] = len(paths)
+
+    for name in ('tickets', 'kpi_summary', 'kpi_cube', 'resolution_sketches', 'backlog_timeline', 'agent_performance'):
+        print(f"[OK] Saved: {paths[name]}")
+    if 'store' in paths:
+        # Typed, partitioned Parquet copy of all outputs for fast dashboard loads
+        print(f"[OK] Saved: {store_path(OUTPUT_DIR)}/ (partitioned by year_month/hub)")
+    elif not PARQUET_AVAILABLE:
+        print("[SKIP] pyarrow not installed - Parquet store not written")
+
+    with report.step('summary', rows_in=len(tickets_df)) as step:
+        summary_stats = summarize_tickets(tickets_df)
+        step['rows_out'] = len(summary_stats)
+
+    # Checksums, row counts and generation number for hot reloads in the dashboard
+    record_manifest(args, report)
+    print()
+
+    return summary_stats
 
-    # CSAT metrics
-    'csat_responses': kpi_groups['csat_has_score'].sum(),
-    'csat_avg_score': kpi_groups.apply(
-        lambda x: x.loc[x['csat_has_score'], 'csat_score'].mean(),
-        include_groups=False
-    ),
-    'csat_high_count': kpi_groups['csat_high'].sum(),
-    'csat_high_pct': kpi_groups.apply(
-        lambda x: (x['csat_high']).sum() / x['csat_has_score'].sum() * 100 if x['csat_has_score'].sum() > 0 else 0,
-        include_groups=False
-    ),
-    'csat_low_count': kpi_groups['csat_low'].sum(),
-    'csat_low_pct': kpi_groups.apply(
-        lambda x: (x['csat_low']).sum() / x['csat_has_score'].sum() * 100 if x['csat_has_score'].sum() > 0 else 0,
-        include_groups=False
-    ),
-}).reset_index()
-
-# Format
-kpi_summary['year_month'] = kpi_summary['year_month'].astype(str)
-numeric_cols = kpi_summary.select_dtypes(include=['float64']).columns
-kpi_summary[numeric_cols] = kpi_summary[numeric_cols].round(2)
-
-# Save KPI summary
-kpi_summary.to_csv(f"{OUTPUT_DIR}/kpi_monthly_summary.csv", index=False)
-
-print(f"[OK] Calculated KPIs for {len(kpi_summary)} month/hub/function combinations")
-print(f"[OK] Saved: {OUTPUT_DIR}/kpi_monthly_summary.csv")
-print()
-
-# ============================================================================
-# STEP 4: CALCULATE AGENT PERFORMANCE
-# ============================================================================
-
-print("[STEP 4/5] CALCULATING AGENT PERFORMANCE")
-print("-" * 80)
-
-# Count tickets per agent per month
-tickets_df['month'] = tickets_df['created_datetime'].dt.to_period('M').astype(str)
-agent_ticket_counts = tickets_df.groupby(['assigned_agent_id', 'hub', 'function', 'month']).size().reset_index(name='tickets_handled')
-
-# Merge with effort data
-agent_performance = effort_df.merge(
-    agent_ticket_counts,
-    left_on=['agent_id', 'hub', 'function', 'month'],
-    right_on=['assigned_agent_id', 'hub', 'function', 'month'],
-    how='left'
-)
+# ============================================================================
+# MAIN
+# ============================================================================
 
-agent_performance['tickets_handled'] = agent_performance['tickets_handled'].fillna(0)
-agent_performance['utilization_pct'] = (
-    agent_performance['ticket_work_hours'] / agent_performance['total_working_hours'] * 100
-).round(2)
-agent_performance['avg_hours_per_ticket'] = (
-    agent_performance['ticket_work_hours'] / agent_performance['tickets_handled']
-).replace([float('inf')], 0).round(2)
-
-# Select columns
-agent_performance = agent_performance[[
-    'agent_id', 'hub', 'function', 'month',
-    'tickets_handled', 'total_working_hours', 'ticket_work_hours',
-    'utilization_pct', 'avg_hours_per_ticket'
-]]
-
-agent_performance.to_csv(f"{OUTPUT_DIR}/agent_performance.csv", index=False)
-
-print(f"[OK] Calculated metrics for {agent_performance['agent_id'].nunique()} agents")
-print(f"[OK] Saved: {OUTPUT_DIR}/agent_performance.csv")
-print()
-
-# ============================================================================
-# STEP 5: GENERATE SUMMARY REPORT
-# ============================================================================
-
-print("[STEP 5/5] GENERATING SUMMARY REPORT")
-print("-" * 80)
-
-summary_stats = {
-    'Total Tickets': len(tickets_df),
-    'Date Range': f"{tickets_df['created_datetime'].min().date()} to {tickets_df['created_datetime'].max().date()}",
-    'Hub A Tickets': (tickets_df['hub'] == 'A').sum(),
-    'Hub B Tickets': (tickets_df['hub'] == 'B').sum(),
-    'Unique Agents': tickets_df['assigned_agent_id'].nunique(),
-    'Current Backlog': tickets_df['is_backlog'].sum(),
-    'Avg Resolution Time (hrs)': tickets_df['resolution_time_hours'].mean(),
-    'Overall SLA Compliance': f"{(tickets_df['sla_met'] == True).sum() / tickets_df['sla_met'].notna().sum() * 100:.1f}%",
-    'Avg CSAT Score': f"{tickets_df.loc[tickets_df['csat_has_score'], 'csat_score'].mean():.2f}/5"
-}
-
-print()
-for key, value in summary_stats.items():
-    print(f"  {key:.<40} {value}")
-
-print()
-print("=" * 80)
-print(" " * 25 + "PROCESSING COMPLETE!")
-print("=" * 80)
-print()
-print("OUTPUT FILES GENERATED:")
-print(f"  1. {OUTPUT_DIR}/tickets_master.csv         - Clean ticket data with enrichments")
-print(f"  2. {OUTPUT_DIR}/kpi_monthly_summary.csv    - KPI metrics by month/hub/function")
-print(f"  3. {OUTPUT_DIR}/agent_performance.csv      - Agent workload and efficiency")
-print()
-print("NEXT STEPS:")
-print("  • Open output files in Excel for analysis")
-print("  • Run: streamlit run streamlit_app.py (for interactive dashboard)")
-print("  • Review KPI trends and hub comparisons")
-print()
-print("=" * 80)
-print()
+def main(argv=None):
+    args = parse_args(argv)
+
+    mode = ('stream' if args.stream else 'incremental' if args.incremental
+            else 'parallel' if args.workers > 1 else 'default')
+    report = RunReport(mode, profile=args.profile, output_dir=OUTPUT_DIR)
+
+    print("\n")
+    print("=" * 80)
+    print(" " * 20 + "SUPPORT OPERATIONS REPORTING SYSTEM")
+    print(" " * 25 + "OrionEdge Corp - 2025")
+    print("=" * 80)
+    print("\n")
+
+    # Create output directory
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+    # Steps, KPI metric laps (kpi_engine) and optional profiles go to the run report
+    activate(report)
+
+    if args.stream:
+        summary_stats = run_stream_mode(args, report)
+    else:
+        # STEP 1: LOAD DATA
+        print("[STEP 1/5] LOADING DATA")
+        print("-" * 80)
+
+        if args.events:
+            tickets_df, effort_df = load_event_inputs(args, report)
+            # Tickets the log changed since the last completed run
+            changed_ids, log_seq = changed_since_acknowledged(OUTPUT_DIR)
+        else:
+            # Categorical text columns and narrow integers from the start
+            with report.step('load') as step:
+                tickets_df, effort_df = load_inputs(INPUT_TICKETS, INPUT_EFFORT)
+                step['rows_out'] = len(tickets_df)
+            changed_ids = None
+
+        print(f"[OK] Loaded {len(tickets_df)} tickets")
+        print(f"[OK] Loaded {len(effort_df)} effort records")
+
+        # Malformed tickets are set aside before they reach any KPI
+        checked = len(tickets_df)
+        with report.step('validate', rows_in=checked) as step:
+            tickets_df, quarantine = validate_inputs(tickets_df)
+            write_quarantine(OUTPUT_DIR, quarantine)
+            step['rows_out'] = len(tickets_df)
+
+        print_quarantine(checked, len(quarantine), reason_counts(quarantine))
+        print()
+
+        if args.incremental:
+            summary_stats = run_incremental_mode(args, report, tickets_df, effort_df, changed_ids)
+        elif args.workers > 1:
+            summary_stats = run_parallel_mode(args, report, tickets_df, effort_df)
+        else:
+            summary_stats = run_default_mode(args, report, tickets_df, effort_df)
+
+        if args.events:
+            acknowledge(OUTPUT_DIR, log_seq)
+
+    activate(None)
+
+    # STEP 5: GENERATE SUMMARY REPORT
+    print("[STEP 5/5] GENERATING SUMMARY REPORT")
+    print("-" * 80)
+    print_summary_report(summary_stats)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Output Manifest for Support Operations Reporting System
+Checksums, row counts and a generation number for every pipeline output file
+
+After each run main.py records every file under outputs/ (CSVs, the rollup
+cube and the Parquet store) in outputs/_manifest.json:
+
+    {"generation": 7, "written_at": "...",
+     "files": {"tickets_master.csv": {"sha256": "...", "bytes": ..., "mtime_ns": ..., "rows": ...}, ...}}
+
+The manifest is replaced atomically and written last, so it always describes
+one complete run. Files whose size and mtime are unchanged since the previous
+manifest keep their recorded checksum, so a run only hashes what it rewrote.
+
+Readers (app.py) fingerprint each artifact by the checksums of its files:
+an unchanged fingerprint means the cached copy is still current, and a file
+that no longer matches the manifest is being rewritten and is not read.
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+from datetime import datetime
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+from run_report import REPORT_FILE
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+MANIFEST_FILE = "_manifest.json"
+
+MANIFEST_VERSION = 1
+
+# Read size for checksums
+BLOCK_SIZE = 1024 * 1024
+
+
+class ManifestMismatchError(Exception):
+    """An output file differs from the manifest (a pipeline run is rewriting it)"""
+
+# ============================================================================
+# FILE SUMMARIES
+# ============================================================================
+
+def list_output_files(output_dir):
+    """Relative paths ('/'-separated) of all output files.
+
+    Pipeline state (.incremental/, .profile/), staging files (*.tmp), the run
+    report and the manifest itself are excluded.
+    """
+    paths = []
+    for root, dirs, files in os.walk(output_dir):
+        dirs[:] = sorted(d for d in dirs if not d.startswith('.') and not d.endswith('.tmp'))
+        for name in sorted(files):
+            path = os.path.relpath(os.path.join(root, name), output_dir).replace(os.sep, '/')
+            if path not in (MANIFEST_FILE, REPORT_FILE) and not name.startswith('.') and not name.endswith('.tmp'):
+                paths.append(path)
+    return paths
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def count_rows(path):
+    """Data rows of a CSV (quoted newlines respected) or Parquet file; None otherwise"""
+    if path.endswith('.csv'):
+        with open(path, newline='') as f:
+            return max(sum(1 for _ in csv.reader(f)) - 1, 0)
+    if path.endswith('.parquet') and pq is not None:
+        return pq.read_metadata(path).num_rows
+    return None
+
+
+def describe_file(output_dir, relative_path, previous=None):
+    """Manifest entry for one file; reuses `previous` when size and mtime match"""
+    path = os.path.join(output_dir, relative_path)
+    stat = os.stat(path)
+    if previous and previous['bytes'] == stat.st_size and previous['mtime_ns'] == stat.st_mtime_ns:
+        return previous
+    return {
+        'sha256': file_sha256(path),
+        'bytes': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'rows': count_rows(path),
+    }
+
+# ============================================================================
+# WRITING / READING
+# ============================================================================
+
+def read_manifest(output_dir):
+    """The current manifest, or None if there is none (or it is unreadable)"""
+    try:
+        with open(os.path.join(output_dir, MANIFEST_FILE)) as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+
+def write_manifest(output_dir):
+    """Record the current output files as the next generation.
+
+    Returns (manifest, changed) where changed lists the files that are new or
+    differ from the previous generation.
+    """
+    previous = read_manifest(output_dir) or {'generation': 0, 'files': {}}
+
+    files = {
+        path: describe_file(output_dir, path, previous['files'].get(path))
+        for path in list_output_files(output_dir)
+    }
+    changed = [
+        path for path, entry in files.items()
+        if previous['files'].get(path, {}).get('sha256') != entry['sha256']
+    ]
+
+    manifest = {
+        'version': MANIFEST_VERSION,
+        'generation': previous['generation'] + 1,
+        'written_at': datetime.now().isoformat(timespec='seconds'),
+        'files': files,
+    }
+
+    # Write-then-rename, so readers never see a partial manifest
+    path = os.path.join(output_dir, MANIFEST_FILE)
+    with open(path + '.tmp', 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(path + '.tmp', path)
+
+    return manifest, changed
+
+# ============================================================================
+# READER HELPERS
+# ============================================================================
+
+def _entries(manifest, prefix):
+    """Manifest entries for one file, or for every file below a directory"""
+    return {
+        path: entry for path, entry in manifest['files'].items()
+        if path == prefix or path.startswith(prefix + '/')
+    }
+
+
+def artifact_fingerprint(manifest, prefix):
+    """Content fingerprint of a file or directory of outputs (None without a manifest).
+
+    Equal fingerprints mean identical content, whatever the generation.
+    """
+    if manifest is None:
+        return None
+    digest = hashlib.sha256()
+    for path, entry in sorted(_entries(manifest, prefix).items()):
+        digest.update(f"{path}:{entry['sha256']}\n".encode())
+    return digest.hexdigest()
+
+
+def files_match(output_dir, manifest):
+    """Cheap check (size and mtime) that every file is as the manifest recorded"""
+    for path, entry in manifest['files'].items():
+        try:
+            stat = os.stat(os.path.join(output_dir, path))
+        except FileNotFoundError:
+            return False
+        if stat.st_size != entry['bytes'] or stat.st_mtime_ns != entry['mtime_ns']:
+            return False
+    return True
+
+
+def verify_artifact(output_dir, manifest, prefix):
+    """Raise ManifestMismatchError unless the artifact's files are as recorded"""
+    if manifest is None:
+        return
+    entries = _entries(manifest, prefix)
+    if not entries or not files_match(output_dir, {'files': entries}):
+        raise ManifestMismatchError(f"{prefix} does not match manifest generation {manifest['generation']}")
+
+
+def read_verified(output_dir, manifest, relative_path):
+    """File contents as a buffer, checked against the manifest checksum.
+
+    The file is read once; without a manifest it is returned unchecked.
+    """
+    with open(os.path.join(output_dir, relative_path), 'rb') as f:
+        data = f.read()
+    if manifest is not None:
+        entry = manifest['files'].get(relative_path)
+        if entry is None or hashlib.sha256(data).hexdigest() != entry['sha256']:
+            raise ManifestMismatchError(
+                f"{relative_path} does not match manifest generation {manifest['generation']}"
+            )
+    return io.BytesIO(data)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or rewrite the output manifest")
+    parser.add_argument('--output-dir', default="outputs", help="pipeline output directory")
+    parser.add_argument('--write', action='store_true', help="record the current files as a new generation")
+    args = parser.parse_args()
+
+    if args.write:
+        manifest, changed = write_manifest(args.output_dir)
+        print(f"[OK] Generation {manifest['generation']}: {len(changed)} of {len(manifest['files'])} files changed")
+    else:
+        manifest = read_manifest(args.output_dir)
+        if manifest is None:
+            print(f"No manifest in {args.output_dir}/ - run main.py first")
+        else:
+            print(f"Generation {manifest['generation']} written {manifest['written_at']}")
+            for path, entry in manifest['files'].items():
+                rows = '' if entry['rows'] is None else f"{entry['rows']:>10,} rows"
+                print(f"  {path:<70} {entry['sha256'][:12]} {rows}")
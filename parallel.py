@@ -0,0 +1,213 @@
+"""
+Process-Pool Sharded Pipeline for Support Operations Reporting System
+Runs STEPS 2-4 in parallel, one shard per (hub, year_month)
+
+The loaded tickets are split into shards by hub and creation month. Each shard
+is enriched, aggregated into KPI partials, resolution-time sketches, backlog
+events and agent ticket counts, formatted as tickets_master CSV lines and written to its own
+Parquet partition inside a worker process. Shards never share a (year_month, hub) group, so the parent
+merges the partial results by concatenation in sorted shard order and
+restores the export's row order. The output is identical for any number of
+workers.
+
+Run directly for a scaling report:
+    python parallel.py --rows 2000000 --workers 1 2 4 8 16
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from transforms import prepare_tickets
+from kpi_engine import KPI_KEYS, compute_kpi_partials, finalize_kpis, summarize_partials
+from agent_metrics import count_agent_tickets, compute_agent_performance
+from rollup_cube import write_rollup_cube
+from quantile_sketch import SKETCH_KEYS, compute_sketch_partials, write_sketches
+from backlog_timeline import BACKLOG_EVENT_KEYS, compute_backlog_events, write_backlog_timeline
+from columnar_store import PARQUET_AVAILABLE, begin_store, write_store_chunk, finish_store
+
+# ============================================================================
+# SHARDING
+# ============================================================================
+
+def shard_tickets(tickets_raw):
+    """Split raw tickets into shards keyed by (hub, year_month), in sorted order.
+
+    Each shard keeps a `_row` column with its rows' positions in the export.
+    """
+    created = pd.to_datetime(tickets_raw['created_datetime'])
+    month = created.dt.to_period('M').astype(str).where(created.notna(), '')
+    shards = tickets_raw.assign(_row=np.arange(len(tickets_raw)))
+
+    return [
+        (key, shard)
+        for key, shard in shards.groupby([tickets_raw['hub'].astype(str), month], sort=True)
+    ]
+
+
+def process_shard(shard, staging=None, sla_clock='wall'):
+    """STEPS 2-4 for one shard (runs in a worker process)"""
+    rows = shard.pop('_row').to_numpy()
+    tickets = prepare_tickets(shard, sla_clock)
+
+    partials = compute_kpi_partials(tickets)
+    partials['year_month'] = partials['year_month'].astype(str)
+
+    if staging is not None:
+        write_store_chunk(staging, tickets)
+
+    # One CSV line per ticket; quoted fields with embedded newlines need row-wise formatting
+    lines = tickets.to_csv(index=False, header=False, lineterminator='\n').split('\n')[:-1]
+    if len(lines) != len(tickets):
+        lines = [
+            tickets.iloc[[i]].to_csv(index=False, header=False, lineterminator='\n')[:-1]
+            for i in range(len(tickets))
+        ]
+
+    return {
+        'partials': partials,
+        'sketches': compute_sketch_partials(tickets),
+        'backlog_events': compute_backlog_events(tickets),
+        'agent_counts': count_agent_tickets(tickets),
+        'master_lines': lines,
+        'master_header': tickets.iloc[:0].to_csv(index=False, lineterminator='\n'),
+        'rows': rows,
+        'created_min': tickets['created_datetime'].min(),
+        'created_max': tickets['created_datetime'].max(),
+    }
+
+# ============================================================================
+# PARALLEL RUN
+# ============================================================================
+
+def run_parallel(tickets_raw, effort_df, output_dir, workers=os.cpu_count(), write_parquet=True, sla_clock='wall'):
+    """Run STEPS 2-4 over `tickets_raw` with a pool of `workers` processes.
+
+    Returns a dict with run statistics and the summary figures for STEP 5.
+    """
+    shards = shard_tickets(tickets_raw)
+    staging = begin_store(output_dir) if (write_parquet and PARQUET_AVAILABLE) else None
+
+    if workers <= 1:
+        results = [process_shard(shard, staging, sla_clock) for _, shard in shards]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            # map() yields in submission order, which keeps the merge deterministic
+            results = list(pool.map(
+                process_shard, [shard for _, shard in shards], [staging] * len(shards), [sla_clock] * len(shards)
+            ))
+
+    # Merge: shards are disjoint on (year_month, hub), so concatenation is exact
+    partials = pd.concat([r['partials'] for r in results], ignore_index=True)
+    partials = partials.sort_values(KPI_KEYS, ignore_index=True)
+    sketches = pd.concat([r['sketches'] for r in results], ignore_index=True)
+    sketches = sketches.sort_values(SKETCH_KEYS + ['bucket'], ignore_index=True)
+    backlog_events = pd.concat([r['backlog_events'] for r in results], ignore_index=True)
+    backlog_events = backlog_events.sort_values(BACKLOG_EVENT_KEYS, ignore_index=True)
+    agent_counts = pd.concat([r['agent_counts'] for r in results], ignore_index=True)
+
+    # Restore the export's row order for tickets_master.csv
+    lines = np.array([line for r in results for line in r['master_lines']], dtype=object)
+    rows = np.concatenate([r['rows'] for r in results])
+    with open(f"{output_dir}/tickets_master.csv", 'w', newline='') as f:
+        f.write(results[0]['master_header'])
+        f.writelines(line + '\n' for line in lines[np.argsort(rows, kind='stable')])
+
+    kpi_summary = finalize_kpis(partials)
+    kpi_summary.to_csv(f"{output_dir}/kpi_monthly_summary.csv", index=False)
+    write_rollup_cube(output_dir, partials)
+    write_sketches(output_dir, sketches)
+    write_backlog_timeline(output_dir, backlog_events)
+
+    agent_performance = compute_agent_performance(effort_df, agent_counts)
+    agent_performance.to_csv(f"{output_dir}/agent_performance.csv", index=False)
+
+    created_min = min(r['created_min'] for r in results)
+    created_max = max(r['created_max'] for r in results)
+    if staging is not None:
+        finish_store(output_dir, staging, kpi_summary, agent_performance, created_min, created_max)
+
+    totals = summarize_partials(partials)
+    summary = {
+        'Total Tickets': len(tickets_raw),
+        'Date Range': f"{created_min.date()} to {created_max.date()}",
+        'Hub A Tickets': totals.pop('Hub A Tickets'),
+        'Hub B Tickets': totals.pop('Hub B Tickets'),
+        'Unique Agents': agent_counts['assigned_agent_id'].nunique(),
+        **{key: value for key, value in totals.items() if key != 'Total Tickets'},
+    }
+
+    return {
+        'shards': len(shards),
+        'workers': workers,
+        'kpi_rows': len(kpi_summary),
+        'agent_rows': len(agent_performance),
+        'store': staging is not None,
+        'summary': summary,
+    }
+
+# ============================================================================
+# SCALING REPORT
+# ============================================================================
+
+def run_scaling_report(rows, worker_counts, source_path, effort_path, report_path=None):
+    from kpi_engine import make_benchmark_tickets
+
+    print(f"Building {rows:,} benchmark tickets from {source_path} ...")
+    tickets = make_benchmark_tickets(source_path, rows)
+    effort_df = pd.read_csv(effort_path)
+    print(f"[OK] {len(tickets):,} tickets on a host with {os.cpu_count()} CPUs")
+    print()
+
+    report = []
+    reference = None
+    for workers in worker_counts:
+        output_dir = tempfile.mkdtemp(prefix=f"parallel_{workers}_")
+        try:
+            start = time.perf_counter()
+            run = run_parallel(tickets.copy(), effort_df, output_dir, workers=workers, write_parquet=False)
+            seconds = time.perf_counter() - start
+
+            outputs = {
+                name: open(os.path.join(output_dir, name)).read()
+                for name in ('tickets_master.csv', 'kpi_monthly_summary.csv', 'agent_performance.csv')
+            }
+        finally:
+            shutil.rmtree(output_dir, ignore_errors=True)
+
+        reference = reference or outputs
+        report.append({
+            'workers': workers,
+            'shards': run['shards'],
+            'seconds': round(seconds, 3),
+            'tickets_per_second': round(rows / seconds),
+            'speedup': round(report[0]['seconds'] / seconds, 2) if report else 1.0,
+            'identical_output': outputs == reference,
+        })
+        print(f"  {workers:>3} workers {'.' * 20} {seconds:8.3f}s  "
+              f"{rows / seconds:>12,.0f} tickets/s  identical={outputs == reference}")
+
+    report = pd.DataFrame(report)
+    if report_path:
+        report.to_csv(report_path, index=False)
+        print(f"\n[OK] Saved: {report_path}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Scaling report for the process-pool pipeline")
+    parser.add_argument('--rows', type=int, default=2_000_000, help="number of tickets to benchmark with")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8, 16],
+                        help="worker counts to measure")
+    parser.add_argument('--source', default="data/tickets 1.csv", help="ticket file to resample")
+    parser.add_argument('--effort', default="data/effort 1.csv", help="effort file")
+    parser.add_argument('--report', help="optional CSV path for the scaling report")
+    args = parser.parse_args()
+
+    run_scaling_report(args.rows, args.workers, args.source, args.effort, args.report)
@@ -0,0 +1,150 @@
+"""
+In-Process Pipeline API for Support Operations Reporting System
+STEPS 1-5 as importable functions that return DataFrames instead of files
+
+main.py is a command-line wrapper around these functions. The dashboard,
+tests and schedulers can call run_pipeline() and use the returned frames
+directly, with no CSV write and re-parse in between. Nothing here prints or
+writes to disk; write_outputs() is the only function that touches outputs/.
+
+    from pipeline import run_pipeline, write_outputs
+
+    result = run_pipeline()                  # or run_pipeline(tickets_df, effort_df)
+    result['kpi_summary']                    # typed frames, dates already parsed
+    result['quarantine']                     # rows that failed validation, with reasons
+    write_outputs(result, "outputs")         # optional: the files main.py writes
+"""
+
+import os
+
+import pandas as pd
+
+from transforms import prepare_tickets
+from validation import validate_tickets, write_quarantine
+from kpi_engine import compute_kpi_partials, finalize_kpis
+from agent_metrics import count_agent_tickets, compute_agent_performance
+from rollup_cube import build_rollup_cube, CUBE_FILE
+from quantile_sketch import compute_sketch_partials, SKETCH_FILE
+from backlog_timeline import compute_backlog_events, build_backlog_timeline, TIMELINE_FILE
+from columnar_store import PARQUET_AVAILABLE, write_store
+from compact_schema import load_tickets
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+INPUT_TICKETS = "data/tickets 1.csv"
+INPUT_EFFORT = "data/effort 1.csv"
+OUTPUT_DIR = "outputs"
+
+# ============================================================================
+# PIPELINE STEPS
+# ============================================================================
+
+def load_inputs(tickets_path=INPUT_TICKETS, effort_path=INPUT_EFFORT):
+    """STEP 1: raw ticket export (categorical text, narrow integers) and effort records"""
+    return load_tickets(tickets_path), pd.read_csv(effort_path)
+
+
+def validate_inputs(tickets_raw):
+    """Between STEPS 1 and 2: (valid tickets, quarantined tickets with reasons)"""
+    return validate_tickets(tickets_raw)
+
+
+def transform_tickets(tickets_raw, sla_clock='wall'):
+    """STEP 2: parsed dates and enrichment columns (tickets_raw is modified in place).
+
+    sla_clock: 'wall' (elapsed hours) or 'business' (working hours per hub
+    calendar) for resolution_time_hours and sla_met.
+    """
+    return prepare_tickets(tickets_raw, sla_clock)
+
+
+def calculate_kpis(tickets_df):
+    """STEP 3: additive KPI partials, kpi_monthly_summary, the rollup cube,
+    resolution-time sketches and the daily backlog timeline"""
+    kpi_partials = compute_kpi_partials(tickets_df)
+    return {
+        'kpi_partials': kpi_partials,
+        'kpi_summary': finalize_kpis(kpi_partials),
+        'kpi_cube': build_rollup_cube(kpi_partials),
+        'resolution_sketches': compute_sketch_partials(tickets_df),
+        'backlog_timeline': build_backlog_timeline(compute_backlog_events(tickets_df)),
+    }
+
+
+def calculate_agent_performance(tickets_df, effort_df):
+    """STEP 4: tickets handled per agent-month merged with effort data"""
+    return compute_agent_performance(effort_df, count_agent_tickets(tickets_df))
+
+
+def summarize_tickets(tickets_df):
+    """STEP 5: overall summary figures for the report"""
+    return {
+        'Total Tickets': len(tickets_df),
+        'Date Range': f"{tickets_df['created_datetime'].min().date()} to {tickets_df['created_datetime'].max().date()}",
+        'Hub A Tickets': (tickets_df['hub'] == 'A').sum(),
+        'Hub B Tickets': (tickets_df['hub'] == 'B').sum(),
+        'Unique Agents': tickets_df['assigned_agent_id'].nunique(),
+        'Current Backlog': tickets_df['is_backlog'].sum(),
+        'Avg Resolution Time (hrs)': tickets_df['resolution_time_hours'].mean(),
+        'Overall SLA Compliance': f"{(tickets_df['sla_met'] == True).sum() / tickets_df['sla_met'].notna().sum() * 100:.1f}%",
+        'Avg CSAT Score': f"{tickets_df.loc[tickets_df['csat_has_score'], 'csat_score'].mean():.2f}/5"
+    }
+
+# ============================================================================
+# FULL RUN
+# ============================================================================
+
+def run_pipeline(tickets=INPUT_TICKETS, effort=INPUT_EFFORT, sla_clock='wall'):
+    """Run STEPS 1-5 in memory.
+
+    tickets/effort: file paths, or already-loaded DataFrames (tickets as read
+    from the export, not yet enriched; when every ticket passes validation
+    the frame is enriched in place).
+    sla_clock: 'wall' or 'business' resolution times (see transform_tickets).
+
+    Returns a dict with 'tickets' (enriched), 'quarantine', 'kpi_partials',
+    'kpi_summary', 'kpi_cube', 'resolution_sketches', 'backlog_timeline',
+    'agent_performance' and 'summary'.
+    """
+    tickets_raw = load_tickets(tickets) if isinstance(tickets, (str, os.PathLike)) else tickets
+    effort_df = pd.read_csv(effort) if isinstance(effort, (str, os.PathLike)) else effort
+
+    tickets_valid, quarantine = validate_inputs(tickets_raw)
+    tickets_df = transform_tickets(tickets_valid, sla_clock)
+    return {
+        'tickets': tickets_df,
+        'quarantine': quarantine,
+        **calculate_kpis(tickets_df),
+        'agent_performance': calculate_agent_performance(tickets_df, effort_df),
+        'summary': summarize_tickets(tickets_df),
+    }
+
+
+def write_outputs(result, output_dir=OUTPUT_DIR, write_parquet=True):
+    """Write a run_pipeline() result as main.py does (CSVs, cube, quarantine, Parquet store).
+
+    Returns the paths written. The output manifest is left to the caller
+    (output_manifest.write_manifest), as it must be written last.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+
+    paths = {
+        'tickets': f"{output_dir}/tickets_master.csv",
+        'kpi_summary': f"{output_dir}/kpi_monthly_summary.csv",
+        'kpi_cube': f"{output_dir}/{CUBE_FILE}",
+        'resolution_sketches': f"{output_dir}/{SKETCH_FILE}",
+        'backlog_timeline': f"{output_dir}/{TIMELINE_FILE}",
+        'agent_performance': f"{output_dir}/agent_performance.csv",
+    }
+    for name, path in paths.items():
+        result[name].to_csv(path, index=False)
+
+    if 'quarantine' in result:
+        paths['quarantine'] = write_quarantine(output_dir, result['quarantine'])
+
+    if write_parquet and PARQUET_AVAILABLE:
+        paths['store'] = write_store(output_dir, result['tickets'], result['kpi_summary'], result['agent_performance'])
+
+    return paths
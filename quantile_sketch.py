@@ -0,0 +1,191 @@
+"""
+Resolution-Time Quantile Sketches for Support Operations Reporting System
+Mergeable p50/p90/p99 of resolution_time_hours for any month/hub/function/priority selection
+
+avg_resolution_time_hours is a mean; percentiles cannot be added up like the
+KPI counters, and exact ones would need every resolved ticket of a selection.
+Instead each (year_month, hub, function, priority) cell keeps a DDSketch-style
+histogram: resolution times are counted in logarithmic buckets whose bounds
+grow by a factor GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY).
+Bucket counts are additive, so sketches built per chunk, shard or partition
+merge exactly by summing counts. For the dashboard the cells are rolled up
+into every "All" level at load time (like kpi_rollup_cube.csv), so any
+selection is one row lookup plus a cumulative sum over a few hundred buckets.
+
+Error bound: for a quantile q over n resolved tickets, the returned value is
+within RELATIVE_ACCURACY (1%) of the exact value at rank floor(q * (n - 1))
+of the sorted resolution times (numpy's method='lower'). Times below
+MIN_VALUE hours, negative ones included, share one bucket reported as 0.
+
+Output: outputs/resolution_sketches.csv (one row per non-empty bucket of a cell)
+"""
+
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from kpi_engine import KPI_KEYS
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SKETCH_KEYS = KPI_KEYS + ['priority']
+SKETCH_FILE = "resolution_sketches.csv"
+
+ROLLUP_ALL = 'All'
+
+# Relative error of every reported quantile
+RELATIVE_ACCURACY = 0.01
+
+# Smallest resolution time (hours) with its own bucket; smaller ones count as 0
+MIN_VALUE = 0.01
+
+QUANTILES = [0.5, 0.9, 0.99]
+
+GAMMA = (1 + RELATIVE_ACCURACY) / (1 - RELATIVE_ACCURACY)
+LOG_GAMMA = np.log(GAMMA)
+
+# Bucket k holds values in (GAMMA^(k-1), GAMMA^k]; the zero bucket sits just below MIN_VALUE's
+ZERO_BUCKET = int(np.ceil(np.log(MIN_VALUE) / LOG_GAMMA)) - 1
+
+# ============================================================================
+# BUCKETS
+# ============================================================================
+
+def bucket_index(values):
+    """Bucket of each value (ZERO_BUCKET below MIN_VALUE)"""
+    values = np.asarray(values, dtype=np.float64)
+    safe = np.maximum(values, MIN_VALUE)
+    return np.where(values < MIN_VALUE, ZERO_BUCKET, np.ceil(np.log(safe) / LOG_GAMMA)).astype(np.int64)
+
+
+def bucket_value(buckets):
+    """Value reported for each bucket: within RELATIVE_ACCURACY of everything in it"""
+    buckets = np.asarray(buckets, dtype=np.int64)
+    return np.where(buckets == ZERO_BUCKET, 0.0, 2 * GAMMA ** buckets.astype(np.float64) / (GAMMA + 1))
+
+# ============================================================================
+# BUILDING AND MERGING
+# ============================================================================
+
+def compute_sketch_partials(tickets_df, keys=SKETCH_KEYS):
+    """Bucket counts of resolution_time_hours per cell of `keys`.
+
+    Returns the key columns (as str), 'bucket' and 'count', one row per
+    non-empty bucket, sorted. Unresolved tickets and tickets without a
+    creation month are left out, as in the KPI counters.
+    """
+    resolution = tickets_df['resolution_time_hours']
+    resolved = tickets_df.loc[resolution.notna(), keys]
+    buckets = bucket_index(resolution[resolution.notna()])
+
+    counts = resolved.groupby([resolved[key] for key in keys] + [buckets], sort=True, observed=True).size()
+    partials = counts.rename('count').reset_index()
+    partials.columns = list(keys) + ['bucket', 'count']
+    for key in keys:
+        partials[key] = partials[key].astype(str)
+    partials['count'] = partials['count'].astype(np.int64)
+    # Categorical keys group in category order; every engine writes string order
+    return partials.sort_values(list(keys) + ['bucket'], ignore_index=True)
+
+
+def merge_sketch_partials(partials_list, keys=SKETCH_KEYS):
+    """Add up sketch partials computed on separate batches of tickets"""
+    partials = pd.concat(partials_list, ignore_index=True)
+    merged = partials.groupby(list(keys) + ['bucket'], sort=True)['count'].sum()
+    return merged.reset_index()
+
+
+def write_sketches(output_dir, partials):
+    """Save sketch partials next to the other outputs"""
+    partials.to_csv(f"{output_dir}/{SKETCH_FILE}", index=False)
+    return partials
+
+# ============================================================================
+# LOOKUPS
+# ============================================================================
+
+def index_sketches(partials, keys=SKETCH_KEYS):
+    """Dense bucket counts for every grouping set of `keys`, "All" levels included.
+
+    As in the KPI rollup cube, every selection is then a single row: returns
+    a dict with 'rows' (key tuple, "All" for rolled-up levels -> row),
+    'labels' (per key: sorted values), 'counts' (rows x buckets) and
+    'values' (reported value of every bucket column).
+    """
+    first = int(partials['bucket'].min()) if len(partials) else ZERO_BUCKET
+    width = int(partials['bucket'].max()) - first + 1 if len(partials) else 1
+    wide = partials.pivot_table(index=list(keys), columns='bucket', values='count', aggfunc='sum', fill_value=0)
+    wide = wide.reindex(columns=range(first, first + width), fill_value=0)
+    cells = wide.index.to_frame(index=False)
+
+    levels, level_keys = [], []
+    for kept in product([True, False], repeat=len(keys)):
+        group_keys = [key for key, keep in zip(keys, kept) if keep]
+        if group_keys:
+            level = wide.groupby([cells[key].to_numpy() for key in group_keys], sort=True).sum()
+            level_index = level.index.to_frame(index=False).to_numpy()
+        else:
+            level = wide.sum().to_frame().T
+            level_index = np.empty((1, 0), dtype=object)
+        for values in level_index:
+            given = dict(zip(group_keys, values))
+            level_keys.append(tuple(given.get(key, ROLLUP_ALL) for key in keys))
+        levels.append(level.to_numpy(np.int64))
+
+    return {
+        'rows': {key: row for row, key in enumerate(level_keys)},
+        'labels': {key: sorted(cells[key].unique()) for key in keys},
+        'counts': np.concatenate(levels) if levels else np.zeros((0, width), dtype=np.int64),
+        'values': bucket_value(np.arange(first, first + width)),
+    }
+
+
+def read_sketches(output_dir, buffer=None):
+    """Load the saved sketches (or their already-read contents), indexed for lookups"""
+    source = f"{output_dir}/{SKETCH_FILE}" if buffer is None else buffer
+    partials = pd.read_csv(source, dtype={key: str for key in SKETCH_KEYS}, keep_default_na=False)
+    return index_sketches(partials)
+
+
+def sketch_quantiles(index, year_month=ROLLUP_ALL, hub=ROLLUP_ALL, function=ROLLUP_ALL, priority=ROLLUP_ALL,
+                     by=None, quantiles=QUANTILES):
+    """Resolution-time quantiles for one selection, straight from the sketch index.
+
+    year_month/hub/function/priority: selected value or "All"
+    by: optional key to break the result down by; its selected value is
+        ignored and one row is returned per value of that key with resolved
+        tickets, in sorted order.
+    Returns a DataFrame with the `by` column (if any), 'resolved' (ticket
+    count) and one 'pNN' column per quantile (hours, NaN without tickets).
+    """
+    selection = {'year_month': year_month, 'hub': hub, 'function': function, 'priority': priority}
+    if by is None:
+        labels = [None]
+        lookups = [tuple(selection[key] for key in SKETCH_KEYS)]
+    else:
+        labels = index['labels'][by]
+        lookups = [tuple(label if key == by else selection[key] for key in SKETCH_KEYS) for label in labels]
+    rows = [index['rows'].get(lookup) for lookup in lookups]
+
+    merged = np.zeros((len(rows), index['counts'].shape[1]), dtype=np.int64)
+    found = [i for i, row in enumerate(rows) if row is not None]
+    merged[found] = index['counts'][[rows[i] for i in found]]
+
+    # Rank floor(q * (n - 1)) falls in the first bucket whose running count exceeds it
+    totals = merged.sum(axis=1)
+    ranks = np.floor(np.outer(np.maximum(totals - 1, 0), quantiles))
+    running = np.cumsum(merged, axis=1)
+    position = np.array([np.searchsorted(running[i], ranks[i], side='right') for i in range(len(rows))])
+    values = index['values'][np.minimum(position, merged.shape[1] - 1)].reshape(len(rows), len(quantiles))
+    values[totals == 0] = np.nan
+
+    columns = {} if by is None else {by: labels}
+    columns['resolved'] = totals
+    columns.update((f"p{round(q * 100):d}", values[:, i]) for i, q in enumerate(quantiles))
+    result = pd.DataFrame(columns)
+    if by is None:
+        return result
+    return result[result['resolved'] > 0].reset_index(drop=True)
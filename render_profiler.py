@@ -0,0 +1,195 @@
+"""
+Render Profiler for the Support Operations Dashboard
+Opt-in timings of one dashboard rerun, with a rolling history across reruns
+
+When the sidebar "Performance profiler" box is ticked, app.py records for
+the current rerun:
+
+    load        reading outputs (load_data, ticket filter, rollup cube)
+    filter      the filtered ticket selection
+    aggregate   cube lookups and each view's data preparation
+    chart       every Plotly figure: build time (since the previous record),
+                JSON serialization time and payload size, and st.plotly_chart
+
+Each rerun's records are appended to a history in st.session_state (the
+last HISTORY_LENGTH reruns), shown in the sidebar and exportable as JSON or
+CSV, so latency can be attributed to views and charts across reruns.
+When the profiler is off, sections are empty context managers and charts go
+straight to st.plotly_chart. Either way every figure first passes through
+the optional prepare_figure hook (app.py uses chart_reduction.limit_points).
+"""
+
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+ENABLED_KEY = "render_profiler_enabled"
+HISTORY_KEY = "render_profiler_history"
+
+# Reruns kept in the session history
+HISTORY_LENGTH = 50
+
+RECORD_COLUMNS = [
+    'category', 'name', 'view', 'seconds', 'build_seconds', 'serialize_seconds',
+    'render_seconds', 'payload_bytes',
+]
+
+# ============================================================================
+# PROFILER
+# ============================================================================
+
+class RenderProfiler:
+    """Records of one dashboard rerun (all methods are pass-throughs when disabled)"""
+
+    def __init__(self, enabled=False, prepare_figure=None):
+        self.enabled = enabled
+        self.prepare_figure = prepare_figure
+        self.records = []
+        self.view = None
+        self.started = time.perf_counter()
+        self._last = self.started
+
+    @classmethod
+    def from_session(cls, prepare_figure=None):
+        """Profiler for this rerun, enabled by the sidebar checkbox's session state"""
+        return cls(enabled=bool(st.session_state.get(ENABLED_KEY, False)), prepare_figure=prepare_figure)
+
+    def _record(self, category, name, seconds, **fields):
+        self.records.append({'category': category, 'name': name, 'view': self.view, 'seconds': seconds, **fields})
+        self._last = time.perf_counter()
+
+    @contextmanager
+    def section(self, category, name):
+        """Time the enclosed block as one load/filter/aggregate record"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(category, name, time.perf_counter() - start)
+
+    def plotly_chart(self, fig, **kwargs):
+        """st.plotly_chart, recording build, serialization and render time and payload size"""
+        if not self.enabled:
+            if self.prepare_figure is not None:
+                fig = self.prepare_figure(fig)
+            return st.plotly_chart(fig, **kwargs)
+
+        start = time.perf_counter()
+        build = start - self._last
+        if self.prepare_figure is not None:
+            fig = self.prepare_figure(fig)
+        payload = fig.to_json()
+        serialized = time.perf_counter()
+        result = st.plotly_chart(fig, **kwargs)
+        rendered = time.perf_counter()
+
+        charts = sum(1 for r in self.records if r['category'] == 'chart' and r['view'] == self.view)
+        name = fig.layout.title.text or f"chart {charts + 1}"
+        self._record(
+            'chart', name, rendered - self._last,
+            build_seconds=build, serialize_seconds=serialized - start,
+            render_seconds=rendered - serialized, payload_bytes=len(payload.encode()),
+        )
+        return result
+
+    def finish(self):
+        """Append this rerun to the session history; returns the rerun summary (None when disabled)"""
+        if not self.enabled:
+            return None
+        frame = self.frame()
+        rerun = {
+            'rerun_at': datetime.now().isoformat(timespec='seconds'),
+            'view': self.view,
+            'total_seconds': time.perf_counter() - self.started,
+            'charts': int((frame['category'] == 'chart').sum()),
+            'payload_bytes': int(frame['payload_bytes'].sum()),
+            'records': self.records,
+        }
+        history = st.session_state.setdefault(HISTORY_KEY, [])
+        history.append(rerun)
+        del history[:-HISTORY_LENGTH]
+        return rerun
+
+    def frame(self):
+        return pd.DataFrame(self.records, columns=RECORD_COLUMNS)
+
+# ============================================================================
+# HISTORY EXPORT
+# ============================================================================
+
+def history_frame(history):
+    """One row per record of every rerun in the history"""
+    rows = [
+        {'rerun': number, 'rerun_at': rerun['rerun_at'], **record}
+        for number, rerun in enumerate(history, start=1)
+        for record in rerun['records']
+    ]
+    return pd.DataFrame(rows, columns=['rerun', 'rerun_at'] + RECORD_COLUMNS)
+
+
+def history_summary(history):
+    """One row per rerun: view, total time, chart count and payload"""
+    return pd.DataFrame([
+        {
+            'Rerun': number,
+            'At': rerun['rerun_at'][11:],
+            'View': rerun['view'],
+            'Total (ms)': round(rerun['total_seconds'] * 1000, 1),
+            'Charts': rerun['charts'],
+            'Payload (KB)': round(rerun['payload_bytes'] / 1024, 1),
+        }
+        for number, rerun in enumerate(history, start=1)
+    ])
+
+# ============================================================================
+# SIDEBAR PANEL
+# ============================================================================
+
+def render_panel(profiler):
+    """Sidebar checkbox and, when enabled, this rerun's timings and the history.
+
+    Call last in the script, so every record of the rerun is included.
+    """
+    st.sidebar.markdown("---")
+    st.sidebar.checkbox("⏱️ Performance profiler", key=ENABLED_KEY,
+                        help="Time data loading, filtering, aggregations and each chart on every rerun")
+
+    rerun = profiler.finish()
+    if rerun is None:
+        return
+
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        st.metric("This rerun", f"{rerun['total_seconds'] * 1000:.0f} ms",
+                  f"{rerun['charts']} charts, {rerun['payload_bytes'] / 1024:.0f} KB")
+
+        frame = profiler.frame()
+        by_category = frame.groupby('category', sort=False)['seconds'].sum() * 1000
+        st.dataframe(by_category.round(1).rename('ms'), use_container_width=True)
+
+        slowest = frame.assign(ms=(frame['seconds'] * 1000).round(1), KB=(frame['payload_bytes'] / 1024).round(1))
+        st.dataframe(
+            slowest.sort_values('ms', ascending=False)[['category', 'name', 'ms', 'KB']].head(15),
+            use_container_width=True, hide_index=True
+        )
+
+        history = st.session_state[HISTORY_KEY]
+        st.markdown(f"**Last {len(history)} reruns**")
+        st.dataframe(history_summary(history), use_container_width=True, hide_index=True)
+
+        st.download_button("Export history (JSON)", json.dumps(history, indent=2, default=float),
+                           file_name="render_profile.json", mime="application/json")
+        st.download_button("Export history (CSV)", history_frame(history).to_csv(index=False),
+                           file_name="render_profile.csv", mime="text/csv")
+        if st.button("Clear history"):
+            st.session_state[HISTORY_KEY] = []
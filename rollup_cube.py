@@ -0,0 +1,100 @@
+"""
+KPI Rollup Cube for Support Operations Reporting System
+Additive KPI counters for every month/hub/function combination, "All" levels included
+
+kpi_monthly_summary.csv holds one row per (year_month, hub, function). Views
+that need a total across months, hubs or functions used to re-aggregate it
+with a groupby on every dashboard rerun, averaging percentages across groups
+of different sizes on the way. The cube stores the additive numerators and
+denominators (kpi_engine.PARTIAL_COLUMNS) for all 2^3 grouping sets, with
+rolled-up levels set to "All", so any sidebar selection is a single indexed
+lookup and every percentage is derived from summed counters.
+
+Output: outputs/kpi_rollup_cube.csv
+"""
+
+from itertools import product
+
+import pandas as pd
+
+from kpi_engine import KPI_KEYS, PARTIAL_COLUMNS, finalize_kpis
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+ROLLUP_ALL = 'All'
+CUBE_FILE = "kpi_rollup_cube.csv"
+
+# ============================================================================
+# BUILDING
+# ============================================================================
+
+def build_rollup_cube(partials, keys=KPI_KEYS):
+    """Sum KPI partials over every grouping set of `keys`.
+
+    Returns the key columns (as str, "All" for rolled-up levels) followed by
+    PARTIAL_COLUMNS, sorted by key.
+    """
+    base = partials[list(keys) + PARTIAL_COLUMNS].copy()
+    for key in keys:
+        base[key] = base[key].astype(str)
+
+    levels = []
+    for kept in product([True, False], repeat=len(keys)):
+        group_keys = [key for key, keep in zip(keys, kept) if keep]
+        if group_keys:
+            level = base.groupby(group_keys, sort=False)[PARTIAL_COLUMNS].sum().reset_index()
+        else:
+            level = base[PARTIAL_COLUMNS].sum().to_frame().T.astype(base[PARTIAL_COLUMNS].dtypes)
+        for key, keep in zip(keys, kept):
+            if not keep:
+                level[key] = ROLLUP_ALL
+        levels.append(level[list(keys) + PARTIAL_COLUMNS])
+
+    cube = pd.concat(levels, ignore_index=True)
+    return index_cube(cube).reset_index()
+
+
+def write_rollup_cube(output_dir, partials):
+    """Build the cube from KPI partials and save it next to the other outputs"""
+    cube = build_rollup_cube(partials)
+    cube.to_csv(f"{output_dir}/{CUBE_FILE}", index=False)
+    return cube
+
+# ============================================================================
+# LOOKUPS
+# ============================================================================
+
+def index_cube(cube, keys=KPI_KEYS):
+    """Index the cube by its key columns (sorted, so partial-key lookups are fast)"""
+    return cube.set_index(list(keys)).sort_index()
+
+
+def read_rollup_cube(output_dir, buffer=None):
+    """Load the saved cube (or its already-read contents), indexed for lookups"""
+    source = f"{output_dir}/{CUBE_FILE}" if buffer is None else buffer
+    cube = pd.read_csv(source, dtype={key: str for key in KPI_KEYS}, keep_default_na=False)
+    return index_cube(cube)
+
+
+def cube_lookup(cube, year_month=ROLLUP_ALL, hub=ROLLUP_ALL, function=ROLLUP_ALL, by=None):
+    """Finalized KPIs for one filter selection, straight from the indexed cube.
+
+    year_month/hub/function: selected value or "All"
+    by: optional key to break the result down by ("year_month", "hub" or
+        "function"); its selected value is ignored and one row is returned per
+        actual value of that key, in sorted order.
+    """
+    selection = {'year_month': [year_month], 'hub': [hub], 'function': [function]}
+    if by is not None:
+        selection[by] = slice(None)
+
+    try:
+        rows = cube.loc[tuple(selection[key] for key in KPI_KEYS), :]
+    except KeyError:
+        rows = cube.iloc[:0]
+    if by is not None:
+        rows = rows[rows.index.get_level_values(by) != ROLLUP_ALL]
+
+    return finalize_kpis(rows.reset_index())
@@ -0,0 +1,220 @@
+"""
+Run Report for Support Operations Reporting System
+Wall time, CPU time, memory and row counts per pipeline step and KPI metric
+
+main.py wraps each step in RunReport.step() and writes the result to
+outputs/_run_report.json after the run:
+
+    {"mode": "default", "wall_seconds": ..., "peak_rss_mb": ...,
+     "steps": [{"name": "load", "wall_seconds": ..., "cpu_seconds": ...,
+                "peak_rss_mb": ..., "rss_mb": ..., "rows_in": ..., "rows_out": ...}, ...],
+     "metrics": {"kpi.sla": {"wall_seconds": ..., "cpu_seconds": ..., "calls": ..., ...}, ...}}
+
+Per-metric figures come from lap timers inside the KPI engine; they are
+summed over calls (one per chunk in streaming mode). Both cost a few clock
+reads per step or metric. With --profile, each step also runs under cProfile
+and tracemalloc and dumps to outputs/.profile/<step>.prof (pstats) and
+<step>.tracemalloc.txt (top allocation sites).
+"""
+
+import cProfile
+import json
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+REPORT_FILE = "_run_report.json"
+PROFILE_DIR = ".profile"
+
+REPORT_VERSION = 1
+
+# Allocation sites listed per step in the tracemalloc dump
+TRACEMALLOC_TOP = 25
+
+# ============================================================================
+# MEMORY
+# ============================================================================
+
+def peak_rss_mb():
+    """Peak resident set size of this process in MB (None if unavailable)"""
+    if resource is None:
+        return None
+    # ru_maxrss is reported in KB on Linux and in bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def current_rss_mb():
+    """Current resident set size in MB (Linux only, None elsewhere)"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf('SC_PAGE_SIZE') / 1024 / 1024
+
+
+def _mb(value):
+    return None if value is None else round(value, 1)
+
+# ============================================================================
+# RUN REPORT
+# ============================================================================
+
+class RunReport:
+    """Per-step and per-metric measurements of one pipeline run"""
+
+    def __init__(self, mode=None, profile=False, output_dir="outputs"):
+        self.mode = mode
+        self.profile = profile
+        self.output_dir = output_dir
+        self.steps = []
+        self.metrics = {}
+        self.started_at = datetime.now().isoformat(timespec='seconds')
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def step(self, name, rows_in=None):
+        """Measure the enclosed block; set rows_in/rows_out on the yielded dict"""
+        info = {'rows_in': rows_in, 'rows_out': None}
+        profiler = self._start_profiling() if self.profile else None
+
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield info
+        finally:
+            wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+            entry = {
+                'name': name,
+                'wall_seconds': round(wall, 4),
+                'cpu_seconds': round(cpu, 4),
+                'peak_rss_mb': _mb(peak_rss_mb()),
+                'rss_mb': _mb(current_rss_mb()),
+                'rows_in': info['rows_in'],
+                'rows_out': info['rows_out'],
+            }
+            if profiler is not None:
+                entry.update(self._stop_profiling(name, profiler))
+            self.steps.append(entry)
+
+    def lap_timer(self, group, rows_in=None, rows_out=None):
+        """mark(name) records the time since the previous mark as metric group.name"""
+        last = [time.perf_counter(), time.process_time()]
+
+        def mark(name, rows=None):
+            wall, cpu = time.perf_counter(), time.process_time()
+            metric = self.metrics.setdefault(f"{group}.{name}", {
+                'wall_seconds': 0.0, 'cpu_seconds': 0.0, 'calls': 0,
+                'rows_in': 0, 'rows_out': 0, 'peak_rss_mb': None,
+            })
+            metric['wall_seconds'] += wall - last[0]
+            metric['cpu_seconds'] += cpu - last[1]
+            metric['calls'] += 1
+            metric['rows_in'] += rows_in or 0
+            metric['rows_out'] += (rows if rows is not None else rows_out) or 0
+            metric['peak_rss_mb'] = _mb(peak_rss_mb())
+            last[0], last[1] = time.perf_counter(), time.process_time()
+
+        return mark
+
+    # ------------------------------------------------------------------------
+    # Profiling (--profile only)
+    # ------------------------------------------------------------------------
+
+    def _start_profiling(self):
+        tracemalloc.start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+
+    def _stop_profiling(self, name, profiler):
+        profiler.disable()
+        snapshot = tracemalloc.take_snapshot()
+        traced_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        profile_dir = os.path.join(self.output_dir, PROFILE_DIR)
+        os.makedirs(profile_dir, exist_ok=True)
+        profile_path = os.path.join(profile_dir, f"{name}.prof")
+        tracemalloc_path = os.path.join(profile_dir, f"{name}.tracemalloc.txt")
+
+        profiler.dump_stats(profile_path)
+        with open(tracemalloc_path, 'w') as f:
+            f.write(f"Peak traced allocation: {traced_peak / 1024 / 1024:.1f} MB\n")
+            f.write(f"Top {TRACEMALLOC_TOP} allocation sites still held at the end of '{name}':\n")
+            for stat in snapshot.statistics('lineno')[:TRACEMALLOC_TOP]:
+                f.write(f"  {stat}\n")
+
+        return {
+            'traced_peak_mb': _mb(traced_peak / 1024 / 1024),
+            'cprofile': profile_path,
+            'tracemalloc': tracemalloc_path,
+        }
+
+    # ------------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------------
+
+    def to_dict(self):
+        metrics = {
+            name: {**metric, 'wall_seconds': round(metric['wall_seconds'], 4),
+                   'cpu_seconds': round(metric['cpu_seconds'], 4)}
+            for name, metric in self.metrics.items()
+        }
+        return {
+            'version': REPORT_VERSION,
+            'mode': self.mode,
+            'argv': sys.argv[1:],
+            'started_at': self.started_at,
+            'finished_at': datetime.now().isoformat(timespec='seconds'),
+            'wall_seconds': round(time.perf_counter() - self._wall_start, 4),
+            'cpu_seconds': round(time.process_time() - self._cpu_start, 4),
+            'peak_rss_mb': _mb(peak_rss_mb()),
+            'profile': self.profile,
+            'steps': self.steps,
+            'metrics': metrics,
+        }
+
+    def write(self):
+        """Write the report atomically next to the outputs; returns its path"""
+        path = os.path.join(self.output_dir, REPORT_FILE)
+        with open(path + '.tmp', 'w') as f:
+            json.dump(self.to_dict(), f, indent=2, default=int)
+        os.replace(path + '.tmp', path)
+        return path
+
+# ============================================================================
+# ACTIVE REPORT (for lap timers deep inside the pipeline)
+# ============================================================================
+
+_active_report = None
+
+
+def _no_lap(name, rows=None):
+    pass
+
+
+def activate(report):
+    """Make `report` receive lap_timer() metrics (None to stop recording)"""
+    global _active_report
+    _active_report = report
+
+
+def lap_timer(group, rows_in=None, rows_out=None):
+    """Lap timer on the active report, or a no-op when none is active"""
+    if _active_report is None:
+        return _no_lap
+    return _active_report.lap_timer(group, rows_in, rows_out)
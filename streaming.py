@@ -0,0 +1,135 @@
+"""
+Chunked Streaming Pipeline for Support Operations Reporting System
+Runs STEPS 1-4 over ticket exports too large to load into memory at once
+
+Tickets are read chunk_size rows at a time. Each chunk is enriched on its own
+(STEP 2 is row-local), streamed out to tickets_master.csv (and the Parquet
+store), and folded into running accumulators: KPI partials per
+(year_month, hub, function), resolution-time sketch buckets and backlog
+event deltas per (year_month, hub, function, priority) and ticket counts per
+agent/hub/function/month. All are additive, so after the last chunk they finalize to the same
+kpi_monthly_summary.csv and agent_performance.csv as a full in-memory run.
+Peak memory is set by chunk_size and the number of groups, not by file size.
+Each chunk is validated first; its failing rows are appended to
+quarantined_tickets.csv and left out of everything else.
+"""
+
+import os
+
+import pandas as pd
+
+from transforms import prepare_tickets
+from validation import CHECKS, validate_tickets, reason_counts, QUARANTINE_FILE
+from compact_schema import TICKET_LOAD_DTYPES, downcast_integers
+from kpi_engine import compute_kpi_partials, merge_kpi_partials, finalize_kpis, summarize_partials
+from agent_metrics import count_agent_tickets, merge_agent_counts, compute_agent_performance
+from rollup_cube import write_rollup_cube
+from quantile_sketch import compute_sketch_partials, merge_sketch_partials, write_sketches
+from backlog_timeline import compute_backlog_events, merge_backlog_events, write_backlog_timeline
+from columnar_store import PARQUET_AVAILABLE, begin_store, write_store_chunk, finish_store
+from run_report import peak_rss_mb
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+DEFAULT_CHUNK_SIZE = 250_000
+
+# ============================================================================
+# STREAMING RUN
+# ============================================================================
+
+def run_streaming(tickets_path, effort_df, output_dir, chunk_size=DEFAULT_CHUNK_SIZE, write_parquet=True,
+                  sla_clock='wall'):
+    """Stream `tickets_path` through STEPS 2-4 in chunks of `chunk_size` rows.
+
+    Returns a dict with run statistics and the summary figures for STEP 5.
+    """
+    master_path = f"{output_dir}/tickets_master.csv"
+    master_tmp = master_path + ".tmp"
+    quarantine_path = f"{output_dir}/{QUARANTINE_FILE}"
+    quarantine_tmp = quarantine_path + ".tmp"
+
+    kpi_partials = None
+    sketch_partials = None
+    backlog_events = None
+    agent_counts = None
+    created_min = created_max = None
+    rows = chunks = quarantined = 0
+    reasons = {}
+
+    staging = begin_store(output_dir) if (write_parquet and PARQUET_AVAILABLE) else None
+    schema = None
+
+    with open(master_tmp, 'w', newline='') as master_file, open(quarantine_tmp, 'w', newline='') as quarantine_file:
+        for chunk in pd.read_csv(tickets_path, chunksize=chunk_size, dtype=TICKET_LOAD_DTYPES):
+            chunk, rejected = validate_tickets(downcast_integers(chunk))
+            rejected.to_csv(quarantine_file, index=False, header=(quarantine_file.tell() == 0))
+            quarantined += len(rejected)
+            for reason, count in reason_counts(rejected).items():
+                reasons[reason] = reasons.get(reason, 0) + count
+            if len(chunk) == 0:
+                continue
+
+            chunk = prepare_tickets(chunk, sla_clock)
+
+            # Stream the enriched rows straight out
+            chunk.to_csv(master_file, index=False, header=(chunks == 0))
+            if staging is not None:
+                schema = write_store_chunk(staging, chunk, part=chunks, schema=schema)
+
+            # Fold the chunk into the running accumulators
+            partials = compute_kpi_partials(chunk)
+            partials['year_month'] = partials['year_month'].astype(str)
+            sketches = compute_sketch_partials(chunk)
+            events = compute_backlog_events(chunk)
+            counts = count_agent_tickets(chunk)
+            kpi_partials = partials if kpi_partials is None else merge_kpi_partials([kpi_partials, partials])
+            sketch_partials = sketches if sketch_partials is None else merge_sketch_partials([sketch_partials, sketches])
+            backlog_events = events if backlog_events is None else merge_backlog_events([backlog_events, events])
+            agent_counts = counts if agent_counts is None else merge_agent_counts([agent_counts, counts])
+
+            chunk_min, chunk_max = chunk['created_datetime'].min(), chunk['created_datetime'].max()
+            created_min = chunk_min if created_min is None else min(created_min, chunk_min)
+            created_max = chunk_max if created_max is None else max(created_max, chunk_max)
+
+            rows += len(chunk)
+            chunks += 1
+
+    # Only replace the previous master once the whole export went through
+    os.replace(master_tmp, master_path)
+    os.replace(quarantine_tmp, quarantine_path)
+
+    kpi_summary = finalize_kpis(kpi_partials)
+    kpi_summary.to_csv(f"{output_dir}/kpi_monthly_summary.csv", index=False)
+    write_rollup_cube(output_dir, kpi_partials)
+    write_sketches(output_dir, sketch_partials)
+    write_backlog_timeline(output_dir, backlog_events)
+
+    agent_performance = compute_agent_performance(effort_df, agent_counts)
+    agent_performance.to_csv(f"{output_dir}/agent_performance.csv", index=False)
+
+    if staging is not None:
+        finish_store(output_dir, staging, kpi_summary, agent_performance, created_min, created_max)
+
+    totals = summarize_partials(kpi_partials)
+    summary = {
+        'Total Tickets': rows,
+        'Date Range': f"{created_min.date()} to {created_max.date()}",
+        'Hub A Tickets': totals.pop('Hub A Tickets'),
+        'Hub B Tickets': totals.pop('Hub B Tickets'),
+        'Unique Agents': agent_counts['assigned_agent_id'].nunique(),
+        **{key: value for key, value in totals.items() if key != 'Total Tickets'},
+    }
+
+    return {
+        'rows': rows,
+        'chunks': chunks,
+        'quarantined': quarantined,
+        'quarantine_reasons': {reason: reasons[reason] for reason in CHECKS if reason in reasons},
+        'kpi_rows': len(kpi_summary),
+        'agent_rows': len(agent_performance),
+        'store': staging is not None,
+        'peak_rss_mb': peak_rss_mb(),
+        'summary': summary,
+    }
@@ -0,0 +1,334 @@
+"""
+Synthetic Data Generator for Support Operations Reporting System
+Ticket and effort files of any size, with the sample files' distributions
+
+The distributions are learned from the sample exports (data/tickets 1.csv and
+data/effort 1.csv):
+
+    hub x function x channel   joint mix of the three
+    category                   per function
+    requester_department       overall mix
+    priority -> sla target     priority mix, SLA hours per priority
+    status                     overall mix (Open/In Progress tickets stay unresolved)
+    resolution time            empirical hours per priority
+    csat / reopened_flag       response rate, score mix and reopen rate per status
+    created_datetime           hour-of-day and quarter-hour mix, days spread evenly
+    agents                     agents per hub/function, scaled so each agent
+                               handles as many tickets a month as in the sample
+    effort                     working hours and ticket-work utilization mix
+
+Tickets are generated and written in chunks with vectorized numpy sampling,
+so memory stays bounded whatever the row count. Output is deterministic for
+a given seed and chunk size.
+
+Usage:
+    python synthetic_data.py --rows 1M
+    python synthetic_data.py --rows 50M --seed 7 --out-dir data/synthetic
+"""
+
+import argparse
+import math
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+SOURCE_TICKETS = "data/tickets 1.csv"
+SOURCE_EFFORT = "data/effort 1.csv"
+OUTPUT_DIR = "data/synthetic"
+
+DEFAULT_SEED = 42
+DEFAULT_MONTHS = 24
+DEFAULT_START_MONTH = "2024-01"
+DEFAULT_CHUNK_SIZE = 1_000_000
+
+TICKET_COLUMNS = [
+    'ticket_id', 'hub', 'function', 'channel', 'created_datetime', 'resolved_datetime',
+    'status', 'priority', 'sla_target_hours', 'assigned_agent_id', 'requester_department',
+    'category', 'csat_score', 'reopened_flag',
+]
+
+# Statuses without a resolution (as in transforms.BACKLOG_STATUSES)
+OPEN_STATUSES = ['Open', 'In Progress']
+
+ROW_SUFFIXES = {'k': 1_000, 'm': 1_000_000, 'b': 1_000_000_000}
+
+# ============================================================================
+# LEARNING THE DISTRIBUTIONS
+# ============================================================================
+
+def parse_rows(text):
+    """'10k', '1M', '50M' or a plain number -> int"""
+    text = str(text).strip().lower().replace('_', '').replace(',', '')
+    if text and text[-1] in ROW_SUFFIXES:
+        return int(float(text[:-1]) * ROW_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def _distribution(series):
+    """(values, probabilities) of a column, most frequent first"""
+    counts = series.value_counts()
+    return counts.index.to_numpy(), (counts / counts.sum()).to_numpy()
+
+
+def fit_model(tickets_df, effort_df):
+    """Learn the generator's distributions from a ticket and an effort sample"""
+    created = pd.to_datetime(tickets_df['created_datetime'])
+    resolved = pd.to_datetime(tickets_df['resolved_datetime'])
+    hours = (resolved - created).dt.total_seconds() / 3600
+    months = max(created.dt.to_period('M').nunique(), 1)
+
+    combos = tickets_df.groupby(['hub', 'function', 'channel']).size()
+    agents = tickets_df.groupby(['hub', 'function'])['assigned_agent_id'].nunique()
+
+    model = {
+        'combos': (combos.index.to_list(), (combos / combos.sum()).to_numpy()),
+        'category': {f: _distribution(g['category']) for f, g in tickets_df.groupby('function')},
+        'department': _distribution(tickets_df['requester_department']),
+        'priority': _distribution(tickets_df['priority']),
+        'sla_hours': tickets_df.groupby('priority')['sla_target_hours'].agg(lambda s: s.mode().iloc[0]).to_dict(),
+        'status': _distribution(tickets_df['status']),
+        'resolution_hours': {p: h.dropna().to_numpy() for p, h in hours.groupby(tickets_df['priority'])},
+        'all_resolution_hours': hours.dropna().to_numpy(),
+        'csat_rate': tickets_df['csat_score'].notna().groupby(tickets_df['status']).mean().to_dict(),
+        'csat': {s: _distribution(g['csat_score'].dropna().astype(int))
+                 for s, g in tickets_df.groupby('status') if g['csat_score'].notna().any()},
+        'reopen_rate': tickets_df['reopened_flag'].groupby(tickets_df['status']).mean().to_dict(),
+        'hour': _distribution(created.dt.hour),
+        'minute': _distribution(created.dt.minute),
+        'agents': agents.to_dict(),
+        'tickets_per_agent_month': len(tickets_df) / months / agents.sum(),
+        'working_hours': effort_df['total_working_hours'].to_numpy(),
+        'utilization': (effort_df['ticket_work_hours'] / effort_df['total_working_hours']).to_numpy(),
+    }
+    return model
+
+
+def load_model(tickets_path=SOURCE_TICKETS, effort_path=SOURCE_EFFORT):
+    return fit_model(pd.read_csv(tickets_path), pd.read_csv(effort_path))
+
+# ============================================================================
+# SAMPLING HELPERS
+# ============================================================================
+
+def _choice(rng, probabilities, n):
+    """n indices drawn from a discrete distribution (inverse CDF)"""
+    cumulative = np.cumsum(probabilities)
+    return np.minimum(np.searchsorted(cumulative, rng.random(n) * cumulative[-1], side='right'),
+                      len(probabilities) - 1)
+
+
+def _format_datetimes(values):
+    """'YYYY-MM-DD HH:MM' text (blank for NaT) without per-value strftime"""
+    text = np.datetime_as_string(values, unit='m')
+    text.view(np.uint32).reshape(len(text), -1)[:, 10] = ord(' ')
+    text[np.isnat(values)] = ''
+    return text
+
+
+def _format_ids(prefix, numbers, width):
+    """Zero-padded ids such as TCK-0001 or AG-001"""
+    return (prefix + pd.Series(numbers).astype(str).str.zfill(width)).to_numpy()
+
+# ============================================================================
+# ROSTER AND EFFORT
+# ============================================================================
+
+def build_roster(model, rows, months):
+    """Agents per hub/function, scaled to keep the sample's tickets per agent-month.
+
+    Returns agent_id, hub, function sorted by (hub, function); each group's
+    agents are contiguous so tickets can pick one by offset.
+    """
+    needed = rows / max(months, 1) / model['tickets_per_agent_month']
+    scale = max(1, math.ceil(needed / sum(model['agents'].values())))
+
+    groups = sorted(model['agents'].items())
+    total = sum(count * scale for _, count in groups)
+
+    roster = pd.DataFrame(
+        [(hub, function) for (hub, function), count in groups for _ in range(count * scale)],
+        columns=['hub', 'function']
+    )
+    roster.insert(0, 'agent_id', _format_ids('AG-', np.arange(1, total + 1), max(3, len(str(total)))))
+    return roster
+
+
+def generate_effort(model, roster, month_labels, rng):
+    """One effort row per agent and month, hours resampled from the sample"""
+    n = len(roster) * len(month_labels)
+    working = rng.choice(model['working_hours'], n)
+    utilization = rng.choice(model['utilization'], n)
+
+    return pd.DataFrame({
+        'agent_id': np.tile(roster['agent_id'].to_numpy(), len(month_labels)),
+        'hub': np.tile(roster['hub'].to_numpy(), len(month_labels)),
+        'function': np.tile(roster['function'].to_numpy(), len(month_labels)),
+        'month': np.repeat(month_labels, len(roster)),
+        'total_working_hours': working,
+        'ticket_work_hours': np.round(working * utilization).astype(np.int64),
+    })
+
+# ============================================================================
+# TICKETS
+# ============================================================================
+
+def generate_tickets(model, roster, n, first_number, id_width, start, days, rng):
+    """One chunk of n tickets numbered from first_number"""
+    combos, combo_probs = model['combos']
+    combo = _choice(rng, combo_probs, n)
+    hub = np.array([c[0] for c in combos], dtype=object)[combo]
+    function = np.array([c[1] for c in combos], dtype=object)[combo]
+    channel = np.array([c[2] for c in combos], dtype=object)[combo]
+
+    # Category depends on the function
+    category = np.empty(n, dtype=object)
+    for value, (categories, probs) in model['category'].items():
+        rows = np.flatnonzero(function == value)
+        category[rows] = categories[_choice(rng, probs, len(rows))]
+
+    departments, department_probs = model['department']
+    department = departments[_choice(rng, department_probs, n)]
+
+    priorities, priority_probs = model['priority']
+    priority = priorities[_choice(rng, priority_probs, n)]
+    sla_hours = pd.Series(priority).map(model['sla_hours']).to_numpy(dtype=np.int64)
+
+    statuses, status_probs = model['status']
+    status = statuses[_choice(rng, status_probs, n)]
+    is_open = np.isin(status, OPEN_STATUSES)
+
+    # Created: even spread over the days, sample hour-of-day and quarter-hour mix
+    hours, hour_probs = model['hour']
+    minutes, minute_probs = model['minute']
+    offset_minutes = (
+        rng.integers(0, days, n) * 1440
+        + hours[_choice(rng, hour_probs, n)].astype(np.int64) * 60
+        + minutes[_choice(rng, minute_probs, n)].astype(np.int64)
+    )
+    created = start + offset_minutes.astype('timedelta64[m]')
+
+    # Resolution hours resampled per priority; open tickets stay unresolved
+    resolution = np.empty(n)
+    for value in priorities:
+        rows = np.flatnonzero(priority == value)
+        pool = model['resolution_hours'].get(value)
+        pool = pool if pool is not None and len(pool) else model['all_resolution_hours']
+        resolution[rows] = rng.choice(pool, len(rows))
+    resolved = created + (resolution * 60).round().astype('timedelta64[m]')
+    resolved[is_open] = np.datetime64('NaT')
+
+    # CSAT responses and reopens by status
+    csat = pd.array(np.full(n, pd.NA), dtype='Int64')
+    reopened = np.zeros(n, dtype=np.int64)
+    draws = rng.random(n)
+    for value in statuses:
+        rows = np.flatnonzero(status == value)
+        responded = rows[draws[rows] < model['csat_rate'].get(value, 0)]
+        if value in model['csat'] and len(responded):
+            scores, score_probs = model['csat'][value]
+            csat[responded] = scores[_choice(rng, score_probs, len(responded))]
+        reopened[rows] = rng.random(len(rows)) < model['reopen_rate'].get(value, 0)
+
+    # Agent: uniform among the roster's agents of the ticket's hub/function
+    group_keys = list(zip(roster['hub'], roster['function']))
+    group_start = {key: group_keys.index(key) for key in set(group_keys)}
+    group_size = {key: group_keys.count(key) for key in set(group_keys)}
+    combo_start = np.array([group_start[(c[0], c[1])] for c in combos])[combo]
+    combo_size = np.array([group_size[(c[0], c[1])] for c in combos])[combo]
+    agent = roster['agent_id'].to_numpy()[combo_start + (rng.random(n) * combo_size).astype(np.int64)]
+
+    return pd.DataFrame({
+        'ticket_id': _format_ids('TCK-', np.arange(first_number, first_number + n), id_width),
+        'hub': hub,
+        'function': function,
+        'channel': channel,
+        'created_datetime': _format_datetimes(created),
+        'resolved_datetime': _format_datetimes(resolved),
+        'status': status,
+        'priority': priority,
+        'sla_target_hours': sla_hours,
+        'assigned_agent_id': agent,
+        'requester_department': department,
+        'category': category,
+        'csat_score': csat,
+        'reopened_flag': reopened,
+    })[TICKET_COLUMNS]
+
+# ============================================================================
+# FILE GENERATION
+# ============================================================================
+
+def generate_files(rows, tickets_path, effort_path, months=DEFAULT_MONTHS, start_month=DEFAULT_START_MONTH,
+                   seed=DEFAULT_SEED, chunk_size=DEFAULT_CHUNK_SIZE, model=None):
+    """Write `rows` tickets and the matching effort file; returns run statistics"""
+    model = model or load_model()
+    start = pd.Period(start_month, 'M')
+    month_labels = np.array([str(start + i) for i in range(months)])
+    first_day = np.datetime64(start.start_time.date(), 'm')
+    days = ((start + months).start_time - start.start_time).days
+
+    roster = build_roster(model, rows, months)
+    id_width = max(4, len(str(rows)))
+
+    for path in (tickets_path, effort_path):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+
+    chunks = 0
+    with open(tickets_path, 'w', newline='') as f:
+        for first in range(0, rows, chunk_size):
+            # One generator per chunk: same seed and chunk size -> same files
+            rng = np.random.default_rng([seed, 1, chunks])
+            tickets = generate_tickets(
+                model, roster, min(chunk_size, rows - first), first + 1, id_width, first_day, days, rng
+            )
+            tickets.to_csv(f, index=False, header=(chunks == 0))
+            chunks += 1
+        if rows == 0:
+            pd.DataFrame(columns=TICKET_COLUMNS).to_csv(f, index=False)
+
+    effort = generate_effort(model, roster, month_labels, np.random.default_rng([seed, 0]))
+    effort.to_csv(effort_path, index=False)
+
+    return {
+        'rows': rows,
+        'chunks': chunks,
+        'agents': len(roster),
+        'effort_rows': len(effort),
+        'months': f"{month_labels[0]} to {month_labels[-1]}" if months else '',
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic ticket and effort files for load testing")
+    parser.add_argument('--rows', default='1M', help="number of tickets, e.g. 10k, 1M, 50M")
+    parser.add_argument('--months', type=int, default=DEFAULT_MONTHS, help="months of history to spread tickets over")
+    parser.add_argument('--start-month', default=DEFAULT_START_MONTH, help="first month (YYYY-MM)")
+    parser.add_argument('--seed', type=int, default=DEFAULT_SEED, help="random seed")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE,
+                        help="tickets generated and written per chunk (sets peak memory)")
+    parser.add_argument('--source-tickets', default=SOURCE_TICKETS, help="sample ticket file to learn from")
+    parser.add_argument('--source-effort', default=SOURCE_EFFORT, help="sample effort file to learn from")
+    parser.add_argument('--out-dir', default=OUTPUT_DIR, help="directory for the generated files")
+    args = parser.parse_args()
+
+    rows = parse_rows(args.rows)
+    tickets_path = os.path.join(args.out_dir, f"tickets_{args.rows}.csv")
+    effort_path = os.path.join(args.out_dir, f"effort_{args.rows}.csv")
+
+    print(f"Generating {rows:,} tickets from the distributions of {args.source_tickets} ...")
+    start = time.perf_counter()
+    run = generate_files(
+        rows, tickets_path, effort_path, months=args.months, start_month=args.start_month,
+        seed=args.seed, chunk_size=args.chunk_size, model=load_model(args.source_tickets, args.source_effort)
+    )
+    seconds = time.perf_counter() - start
+
+    print(f"[OK] {run['rows']:,} tickets in {run['chunks']} chunks ({run['months']}): {tickets_path}")
+    print(f"[OK] {run['effort_rows']:,} effort rows for {run['agents']:,} agents: {effort_path}")
+    print(f"[OK] {seconds:.1f}s ({rows / max(seconds, 1e-9):,.0f} tickets/s)")
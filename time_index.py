@@ -0,0 +1,54 @@
+"""
+Sorted Time Index for Support Operations Reporting System
+Date-range filtering by binary search over created_datetime
+
+Tickets are kept sorted by created_datetime, so any date range is one
+contiguous block of rows. Its bounds are found with np.searchsorted over the
+int64 timestamps (O(log n)) instead of comparing a Python date per row, and
+further masks (hub, function, ...) only need to look at the rows in the block.
+The int64 array is built once per ticket frame (created_index), not per lookup.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def sort_by_created(tickets_df):
+    """Tickets ordered by created_datetime (stable; missing dates last), fresh RangeIndex"""
+    return tickets_df.sort_values('created_datetime', kind='stable', na_position='last', ignore_index=True)
+
+
+def created_index(tickets_df):
+    """int64 created_datetime of the dated prefix of tickets sorted with sort_by_created.
+
+    Computed once per ticket frame (e.g. by TicketFilter) and searched by
+    created_bounds. NaT is the smallest int64 but sorts last, so the trailing
+    undated tickets are left out.
+    """
+    created = tickets_df['created_datetime'].to_numpy(dtype='datetime64[ns]').view(np.int64)
+    dated = len(created) - int(tickets_df['created_datetime'].isna().sum())
+    return created[:dated]
+
+
+def created_bounds(created, n_rows, start_date=None, end_date=None):
+    """Row positions [start, stop) of the tickets created within the inclusive date range.
+
+    created: created_index of the tickets, n_rows: their number (dated or not).
+    None leaves that end open; tickets without a created_datetime fall outside
+    every bounded range. Two binary searches, no pass over the tickets.
+    """
+    start = 0
+    stop = len(created) if (start_date is not None or end_date is not None) else n_rows
+    if start_date is not None:
+        start = int(np.searchsorted(created, pd.Timestamp(start_date).value, side='left'))
+    if end_date is not None:
+        end = pd.Timestamp(end_date) + pd.Timedelta(days=1)
+        stop = int(np.searchsorted(created, end.value, side='left'))
+
+    return start, max(start, stop)
+
+
+def created_slice(tickets_df, start_date=None, end_date=None):
+    """Tickets created within the inclusive date range, as a positional slice (one-off lookups)"""
+    start, stop = created_bounds(created_index(tickets_df), len(tickets_df), start_date, end_date)
+    return tickets_df.iloc[start:stop]
@@ -0,0 +1,55 @@
+"""
+Ticket Transformations for Support Operations Reporting System
+STEP 2 of the pipeline: parse dates and derive the enrichment columns
+"""
+
+import pandas as pd
+
+from business_hours import business_hours_between
+
+# Statuses that count as open work (no SLA verdict yet)
+BACKLOG_STATUSES = ['Open', 'In Progress']
+
+
+def prepare_tickets(tickets_df, sla_clock='wall'):
+    """Parse dates and add the derived ticket columns (in place).
+
+    sla_clock: 'wall' measures resolution_time_hours (and so sla_met) as
+    elapsed time, 'business' as working hours of each hub's calendar
+    (business_hours.HUB_CALENDARS).
+    Returns the same DataFrame so calls can be chained.
+    """
+    # Parse dates
+    tickets_df['created_datetime'] = pd.to_datetime(tickets_df['created_datetime'])
+    tickets_df['resolved_datetime'] = pd.to_datetime(tickets_df['resolved_datetime'])
+
+    # Add time features
+    tickets_df['year_month'] = tickets_df['created_datetime'].dt.to_period('M')
+    tickets_df['month_name'] = tickets_df['created_datetime'].dt.strftime('%B %Y')
+
+    # Calculate resolution time
+    if sla_clock == 'business':
+        tickets_df['resolution_time_hours'] = business_hours_between(
+            tickets_df['created_datetime'], tickets_df['resolved_datetime'], tickets_df['hub']
+        )
+    else:
+        tickets_df['resolution_time_hours'] = (
+            tickets_df['resolved_datetime'] - tickets_df['created_datetime']
+        ).dt.total_seconds() / 3600
+
+    # SLA compliance
+    tickets_df['sla_met'] = tickets_df['resolution_time_hours'] <= tickets_df['sla_target_hours']
+    tickets_df['sla_met'] = tickets_df['sla_met'].astype(object)
+    tickets_df.loc[tickets_df['status'].isin(BACKLOG_STATUSES), 'sla_met'] = None
+
+    # CSAT categories
+    tickets_df['csat_score_clean'] = tickets_df['csat_score'].fillna(0)
+    tickets_df['csat_high'] = tickets_df['csat_score'] >= 4
+    tickets_df['csat_low'] = tickets_df['csat_score'] <= 2
+    tickets_df['csat_has_score'] = tickets_df['csat_score'].notna()
+
+    # Backlog flag
+    tickets_df['is_backlog'] = tickets_df['status'].isin(BACKLOG_STATUSES)
+    tickets_df['was_reopened'] = tickets_df['reopened_flag'] == 1
+
+    return tickets_df
@@ -0,0 +1,195 @@
+"""
+Ticket Validation for Support Operations Reporting System
+Column-wise schema checks that quarantine malformed tickets before STEP 2
+
+One malformed ticket (an unparseable created_datetime, an unknown priority, a
+resolution before creation) silently skews every KPI it lands in. Each check
+below is a single vectorized test over a whole column, and every failing
+check sets one bit of a per-row reason mask. Tickets with no bit set go on to
+STEP 2. The others go to outputs/quarantined_tickets.csv with their raw values
+and a `quarantine_reasons` column ("unknown_priority;csat_out_of_range"), and
+are left out of every output. Checking a million tickets takes well under a
+second. Nothing is validated row by row.
+
+    types       created/resolved datetimes parse, numeric columns are numbers
+                (text in csat_score, sla_target_hours or reopened_flag)
+    enums       hub, function, channel, status and priority (ALLOWED_VALUES)
+    ranges      csat_score in CSAT_RANGE (or missing), sla_target_hours > 0,
+                reopened_flag 0 or 1
+    temporal    resolved at or after created, a resolved_datetime exactly
+                when the status is not open
+
+Checks are row-local, so chunks, shards and partitions validate independently.
+A column with text in any row is read as strings, so the numeric columns of
+the valid tickets are converted back to numbers once the failing rows are gone.
+That also fixes their dtypes: csat_score is float64 whether or not the rows
+read together had a missing score.
+"""
+
+import numpy as np
+import pandas as pd
+
+from transforms import BACKLOG_STATUSES
+from compact_schema import drop_unused_categories, downcast_integers
+
+# ============================================================================
+# CONFIGURATION
+# ============================================================================
+
+QUARANTINE_FILE = "quarantined_tickets.csv"
+REASON_COLUMN = 'quarantine_reasons'
+
+# Accepted values of the enumerated columns (missing values are rejected)
+ALLOWED_VALUES = {
+    'hub': ['A', 'B'],
+    'function': ['IT', 'HR', 'Finance'],
+    'channel': ['Phone', 'Email', 'Chat', 'Portal'],
+    'status': BACKLOG_STATUSES + ['Resolved', 'Closed'],
+    'priority': ['Critical', 'High', 'Medium', 'Low'],
+}
+
+# Inclusive bounds of a CSAT score
+CSAT_RANGE = (1, 5)
+
+# Numeric columns checked below, and the dtype the valid rows go on with
+# ('integer': the narrowest integer type, see downcast_integers)
+NUMERIC_DTYPES = {'sla_target_hours': 'integer', 'reopened_flag': 'integer', 'csat_score': 'float64'}
+
+# Reason codes, in the order they are listed in quarantine_reasons
+CHECKS = [
+    'missing_ticket_id',
+    *[f"unknown_{column}" for column in ALLOWED_VALUES],
+    'bad_created_datetime',
+    'bad_resolved_datetime',
+    'resolved_before_created',
+    'open_with_resolved_datetime',
+    'closed_without_resolved_datetime',
+    'bad_sla_target_hours',
+    'csat_out_of_range',
+    'bad_reopened_flag',
+]
+
+# ============================================================================
+# COLUMN CHECKS
+# ============================================================================
+
+def _in_allowed(series, allowed):
+    """Boolean array: value is one of `allowed` (categoricals test each category once)"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        ok = np.append(series.cat.categories.isin(allowed), False)
+        return ok[series.cat.codes.to_numpy()]
+    return series.isin(allowed).to_numpy()
+
+
+def _as_numbers(series):
+    """float64 values of a column; text that is not a number becomes NaN"""
+    if pd.api.types.is_numeric_dtype(series.dtype):
+        return series.to_numpy(np.float64)
+    return pd.to_numeric(series.astype(object), errors='coerce').to_numpy(np.float64)
+
+
+def _as_datetimes(series):
+    """datetime64 values of a column; unparseable values become NaT"""
+    return pd.to_datetime(series, errors='coerce').to_numpy('datetime64[ns]')
+
+
+def check_tickets(tickets_df):
+    """Failing checks of every ticket as a uint32 bit mask (bit i = CHECKS[i], 0 = valid)"""
+    failures = {}
+
+    failures['missing_ticket_id'] = tickets_df['ticket_id'].isna().to_numpy()
+    for column, allowed in ALLOWED_VALUES.items():
+        failures[f"unknown_{column}"] = ~_in_allowed(tickets_df[column], allowed)
+
+    created = _as_datetimes(tickets_df['created_datetime'])
+    resolved = _as_datetimes(tickets_df['resolved_datetime'])
+    has_resolved = np.asarray(tickets_df['resolved_datetime'].notna())
+    failures['bad_created_datetime'] = np.isnat(created)
+    failures['bad_resolved_datetime'] = has_resolved & np.isnat(resolved)
+    # NaT compares False, so only two parsed timestamps can fail
+    failures['resolved_before_created'] = resolved < created
+
+    is_open = _in_allowed(tickets_df['status'], BACKLOG_STATUSES)
+    is_closed = _in_allowed(tickets_df['status'], ALLOWED_VALUES['status']) & ~is_open
+    failures['open_with_resolved_datetime'] = is_open & has_resolved
+    failures['closed_without_resolved_datetime'] = is_closed & ~has_resolved
+
+    sla_target = _as_numbers(tickets_df['sla_target_hours'])
+    csat = _as_numbers(tickets_df['csat_score'])
+    reopened = _as_numbers(tickets_df['reopened_flag'])
+    low, high = CSAT_RANGE
+    failures['bad_sla_target_hours'] = ~(sla_target > 0)
+    # Text that is not a number fails; a missing score is fine
+    failures['csat_out_of_range'] = (
+        (np.isnan(csat) & np.asarray(tickets_df['csat_score'].notna())) | (csat < low) | (csat > high)
+    )
+    failures['bad_reopened_flag'] = ~np.isin(reopened, [0, 1])
+
+    mask = np.zeros(len(tickets_df), dtype=np.uint32)
+    for bit, name in enumerate(CHECKS):
+        mask |= failures[name].astype(np.uint32) << bit
+    return mask
+
+
+def describe_failures(mask):
+    """quarantine_reasons text of each bit mask (each distinct mask is spelled out once)"""
+    codes, uniques = pd.factorize(mask)
+    labels = np.array(
+        [';'.join(name for bit, name in enumerate(CHECKS) if value >> bit & 1) for value in uniques],
+        dtype=object
+    )
+    return labels[codes]
+
+def to_numbers(tickets_df):
+    """Validated tickets with their numeric columns as numbers (tickets_df is not modified).
+
+    A column holding text anywhere is read as strings, also in the rows that
+    pass ("1" == 1 is False). Once the failing rows are gone every value
+    parses, so integer columns become (narrow) integers again and csat_score
+    float64. Columns that are already numbers are left as they are.
+    """
+    converted = {}
+    for column, dtype in NUMERIC_DTYPES.items():
+        series = tickets_df[column]
+        if dtype == 'integer' and not pd.api.types.is_numeric_dtype(series.dtype):
+            values = _as_numbers(series)
+            converted[column] = values.astype(np.int64) if np.array_equal(values, np.round(values)) else values
+        elif dtype != 'integer' and series.dtype != dtype:
+            converted[column] = _as_numbers(series).astype(dtype)
+    return downcast_integers(tickets_df.assign(**converted)) if converted else tickets_df
+
+# ============================================================================
+# QUARANTINE
+# ============================================================================
+
+def validate_tickets(tickets_df):
+    """Split a raw ticket export into valid tickets and quarantined ones.
+
+    Returns (valid, quarantine). valid holds the passing rows with their
+    numeric columns converted (to_numbers) and, when some ticket failed,
+    unused categories dropped; tickets_df itself is not modified. quarantine
+    holds the failing rows, unchanged, plus REASON_COLUMN.
+    """
+    mask = check_tickets(tickets_df)
+    failed = mask != 0
+
+    quarantine = tickets_df[failed].copy()
+    quarantine[REASON_COLUMN] = describe_failures(mask[failed])
+    if not failed.any():
+        return to_numbers(tickets_df), quarantine
+
+    # Rejected labels (an unknown hub, say) must not linger as empty categories
+    return to_numbers(drop_unused_categories(tickets_df[~failed])), quarantine
+
+
+def reason_counts(quarantine):
+    """Quarantined tickets per reason code, in CHECKS order (reasons that occur only)"""
+    reasons = quarantine[REASON_COLUMN].str.split(';').explode()
+    return reasons.value_counts().reindex(CHECKS).dropna().astype(int).to_dict()
+
+
+def write_quarantine(output_dir, quarantine):
+    """Save quarantined tickets next to the outputs (header only when there are none)"""
+    path = f"{output_dir}/{QUARANTINE_FILE}"
+    quarantine.to_csv(path, index=False)
+    return path